@@ -0,0 +1,132 @@
+"""
+Admin helpers for tables with millions of rows.
+
+LargeTableAdminMixin swaps in:
+
+- a paginator that takes the row count of unfiltered changelists from the
+  planner statistics (pg_class.reltuples) instead of COUNT(*), and bounds
+  filtered counts with a statement timeout, falling back to the planner's
+  row estimate;
+- a queryset whose date hierarchy lookups (the DISTINCT date_trunc scans
+  behind date_hierarchy) are cached.
+"""
+
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import OperationalError, connections, transaction
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Planner estimate of a table's row count, including its partitions.
+    Returns None when the table has never been analyzed.
+    """
+    table = model._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT sum(reltuples) FILTER (WHERE reltuples >= 0)::bigint
+            FROM pg_class
+            WHERE oid = %s::regclass
+               OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)
+            """,
+            [table, table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def planned_row_count(queryset):
+    """
+    Row count the planner expects a queryset to return.
+    """
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs an unbounded COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= settings.ADMIN_EXACT_COUNT_LIMIT:
+                return estimate
+
+        try:
+            with transaction.atomic(using=queryset.db), \
+                    connections[queryset.db].cursor() as cursor:
+                cursor.execute(
+                    'SELECT set_config(%s, %s, true)',
+                    ['statement_timeout', f'{settings.ADMIN_COUNT_TIMEOUT_MS}ms'],
+                )
+                return queryset.count()
+        except OperationalError:
+            logger.info(f'Admin count on {queryset.model.__name__} timed out; using planner estimate')
+            return planned_row_count(queryset)
+
+
+class CachedDatesQuerySet(QuerySet):
+    """
+    QuerySet whose dates()/datetimes() results are cached per query.
+    Only meant for the admin changelist, where date_hierarchy calls them.
+    """
+
+    def _cached_dates(self, method, field_name, kind, *args, **kwargs):
+        sql, params = self.query.get_compiler(using=self.db).as_sql()
+        digest = hashlib.sha1(
+            f'{method}|{field_name}|{kind}|{sql}|{params!r}'.encode('utf-8')
+        ).hexdigest()
+        key = f'admin-dates:{self.model._meta.label_lower}:{digest}'
+        values = cache.get(key)
+        if values is None:
+            values = list(getattr(super(), method)(field_name, kind, *args, **kwargs))
+            cache.set(key, values, settings.ADMIN_DATE_HIERARCHY_CACHE_SECONDS)
+        return values
+
+    def dates(self, field_name, kind, order='ASC'):
+        return self._cached_dates('dates', field_name, kind, order)
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None, is_dst=None):
+        kwargs = {'order': order, 'tzinfo': tzinfo}
+        if is_dst is not None:
+            kwargs['is_dst'] = is_dst
+        return self._cached_dates('datetimes', field_name, kind, **kwargs)
+
+
+class LargeTableAdminMixin:
+    """
+    ModelAdmin mixin for changelists over very large tables.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return CachedDatesQuerySet(
+            model=queryset.model,
+            query=queryset.query,
+            using=queryset._db,
+            hints=queryset._hints,
+        )
@@ -0,0 +1,199 @@
+"""
+Read-replica routing.
+
+Replicas are the DATABASES entries named replica_N (see DB_REPLICA_HOSTS).
+Writes always go to the primary ('default'), and so do reads unless the
+current context allows replica reads. ReplicaReadMiddleware allows them
+for GET and HEAD requests under REPLICA_READ_PATH_PREFIXES (the API, not
+the admin). The ingestion coordinator and management commands never set
+it, so they stay on the primary.
+
+ReplicaLagMonitor measures each replica's replay lag at most every
+REPLICA_LAG_CHECK_SECONDS. Replicas lagging more than
+REPLICA_MAX_LAG_SECONDS, or failing the check, are skipped until a later
+check finds them healthy; with none healthy, reads fall back to the
+primary. Responses computed from a replica may be up to that lag behind;
+the response cache computes misses on recently written regions on the
+primary so it does not keep them that way.
+
+Raw SQL read paths use read_connection() rather than
+django.db.connection, which is always the primary.
+"""
+
+import contextvars
+import itertools
+import logging
+import threading
+import time as time_module
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_PREFIX = 'replica_'
+
+# Seconds of replay lag; 0 on a primary or a replica that has replayed
+# everything it received, NULL when nothing has been replayed yet
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+def replica_aliases() -> List[str]:
+    return sorted(alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX))
+
+
+class ReplicaLagMonitor:
+    """
+    Periodically measured replication lag of each replica.
+    """
+
+    def __init__(self, aliases: List[str] = None, max_lag: float = None, check_interval: float = None):
+        self.aliases = replica_aliases() if aliases is None else aliases
+        self.max_lag = settings.REPLICA_MAX_LAG_SECONDS if max_lag is None else max_lag
+        self.check_interval = (
+            settings.REPLICA_LAG_CHECK_SECONDS if check_interval is None else check_interval
+        )
+        # alias -> (lag in seconds or None if unusable, checked_at)
+        self._lag: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+
+    def lag(self, alias: str) -> Optional[float]:
+        """
+        Last measured lag of a replica, re-measured once it is older than
+        check_interval. None when the replica could not be checked.
+        """
+        now = time_module.monotonic()
+        with self._lock:
+            cached = self._lag.get(alias)
+        if cached is not None and now - cached[1] < self.check_interval:
+            return cached[0]
+
+        lag = self.measure(alias)
+        with self._lock:
+            self._lag[alias] = (lag, now)
+        if lag is None or lag > self.max_lag:
+            logger.warning(
+                f'Replica {alias} is unusable (lag: {lag}), reading from the primary',
+                extra={'replica': alias, 'lag': lag},
+            )
+        return lag
+
+    def measure(self, alias: str) -> Optional[float]:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                value = cursor.fetchone()[0]
+        except DatabaseError:
+            logger.warning(f'Replica {alias} lag check failed', exc_info=True)
+            connections[alias].close()
+            return None
+        return None if value is None else float(value)
+
+    def healthy(self) -> List[str]:
+        healthy = []
+        for alias in self.aliases:
+            lag = self.lag(alias)
+            if lag is not None and lag <= self.max_lag:
+                healthy.append(alias)
+        return healthy
+
+    def pick(self) -> str:
+        """
+        A healthy replica, in turn, or the primary if there is none.
+        """
+        healthy = self.healthy()
+        if not healthy:
+            return DEFAULT_DB_ALIAS
+        return healthy[next(self._turn) % len(healthy)]
+
+    def reset(self):
+        with self._lock:
+            self._lag.clear()
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_monitor() -> ReplicaLagMonitor:
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = ReplicaLagMonitor()
+    return _monitor
+
+
+@contextmanager
+def replica_reads(allowed: bool = True):
+    """
+    Allow (or with allowed=False, forbid) replica reads in this context.
+    """
+    token = _replica_reads.set(allowed)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_alias() -> str:
+    """
+    Database alias reads should use in the current context.
+    """
+    if not _replica_reads.get():
+        return DEFAULT_DB_ALIAS
+    monitor = get_monitor()
+    if not monitor.aliases:
+        return DEFAULT_DB_ALIAS
+    return monitor.pick()
+
+
+def read_connection():
+    """
+    Connection for raw SQL reads in the current context.
+    """
+    return connections[read_alias()]
+
+
+class ReplicaRouter:
+    """
+    Sends reads to a healthy replica where allowed, everything else to the
+    primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+
+class ReplicaReadMiddleware:
+    """
+    Allows replica reads for safe requests to the read API.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        allowed = request.method in ('GET', 'HEAD') and request.path.startswith(
+            tuple(settings.REPLICA_READ_PATH_PREFIXES)
+        )
+        with replica_reads(allowed):
+            return self.get_response(request)
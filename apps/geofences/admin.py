@@ -0,0 +1,51 @@
+from django.contrib import admin
+from django.contrib.gis import admin as gis_admin
+
+from apps.admin_utils import LargeTableAdminMixin
+from .models import Geofence, GeofenceMatch
+
+
+@gis_admin.register(Geofence)
+class GeofenceAdmin(gis_admin.GISModelAdmin):
+    list_display = [
+        'name',
+        'owner',
+        'signal_types',
+        'active',
+        'updated_at',
+    ]
+    list_filter = [
+        'active',
+    ]
+    list_select_related = ['owner']
+    search_fields = [
+        'name',
+        '^owner__username',
+    ]
+    readonly_fields = [
+        'created_at',
+        'updated_at',
+    ]
+
+
+@admin.register(GeofenceMatch)
+class GeofenceMatchAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = [
+        'geofence',
+        'signal_id',
+        'signal_type',
+        'occurred_at',
+        'created_at',
+        'notified_at',
+    ]
+    list_filter = [
+        'signal_type',
+    ]
+    list_select_related = ['geofence']
+    date_hierarchy = 'created_at'
+    search_fields = [
+        '=signal_id',
+    ]
+    readonly_fields = [
+        'created_at',
+    ]
@@ -0,0 +1,219 @@
+"""
+In-memory matching of signals against geofences.
+
+GeofenceIndex splits the map into square cells of GEOFENCE_CELL_DEGREES.
+Each fence is registered in the cells its area touches, either as
+covering the whole cell (every point in it matches, nothing to test) or
+as crossing it, with a prepared geometry for the exact point test. A
+point therefore only visits the fences of its own cell, and most of those
+without any geometry test. Fences too large for
+GEOFENCE_MAX_CELLS_PER_FENCE cells are kept aside and tested directly.
+
+GeofenceMatcher keeps an index per process in step with the database: a
+refresh re-reads only fences changed since the last one (by updated_at)
+and drops those deleted or deactivated, at most every
+GEOFENCE_REFRESH_SECONDS.
+"""
+
+import logging
+import math
+import threading
+import time as time_module
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.contrib.gis.geos import Point, Polygon
+
+from apps.geofences.models import Geofence, GeofenceMatch
+
+logger = logging.getLogger(__name__)
+
+# Cell entry kinds
+_COVERS = 0
+_CROSSES = 1
+
+# updated_at comes from each writer's clock and commits land late, so
+# refreshes look back this far past the newest fence already seen
+_SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class GeofenceIndex:
+    """
+    Grid of prepared fence geometries.
+    """
+
+    def __init__(self, cell_degrees: float = None, max_cells: int = None):
+        self.cell = cell_degrees or settings.GEOFENCE_CELL_DEGREES
+        self.max_cells = max_cells or settings.GEOFENCE_MAX_CELLS_PER_FENCE
+        # (col, row) -> {fence_id: (kind, types, prepared)}
+        self._cells: Dict[Tuple[int, int], Dict] = defaultdict(dict)
+        # fence_id -> (types, prepared, cells)
+        self._fences = {}
+        self._large = {}
+
+    def __len__(self):
+        return len(self._fences)
+
+    def __contains__(self, fence_id):
+        return fence_id in self._fences
+
+    def fence_ids(self):
+        return set(self._fences)
+
+    def _cell_of(self, lon, lat):
+        return math.floor(lon / self.cell), math.floor(lat / self.cell)
+
+    def add(self, fence_id, area, signal_types=()):
+        """
+        Index a fence, replacing any earlier version of it.
+        """
+        self.remove(fence_id)
+        types = frozenset(signal_types)
+        prepared = area.prepared
+        min_lon, min_lat, max_lon, max_lat = area.extent
+        min_col, min_row = self._cell_of(min_lon, min_lat)
+        max_col, max_row = self._cell_of(max_lon, max_lat)
+
+        if (max_col - min_col + 1) * (max_row - min_row + 1) > self.max_cells:
+            self._large[fence_id] = (types, prepared)
+            self._fences[fence_id] = (types, prepared, ())
+            return
+
+        cells = []
+        for col in range(min_col, max_col + 1):
+            for row in range(min_row, max_row + 1):
+                box = Polygon.from_bbox((
+                    col * self.cell, row * self.cell,
+                    (col + 1) * self.cell, (row + 1) * self.cell,
+                ))
+                box.srid = area.srid
+                if prepared.contains(box):
+                    kind = _COVERS
+                elif prepared.intersects(box):
+                    kind = _CROSSES
+                else:
+                    continue
+                self._cells[(col, row)][fence_id] = (kind, types, prepared)
+                cells.append((col, row))
+        self._fences[fence_id] = (types, prepared, cells)
+
+    def remove(self, fence_id):
+        entry = self._fences.pop(fence_id, None)
+        if entry is None:
+            return
+        self._large.pop(fence_id, None)
+        for key in entry[2]:
+            fences = self._cells.get(key)
+            if fences is not None:
+                fences.pop(fence_id, None)
+                if not fences:
+                    del self._cells[key]
+
+    def match(self, signal_type, lon, lat) -> List:
+        """
+        Ids of the fences containing the point that accept signal_type.
+        """
+        candidates = self._cells.get(self._cell_of(lon, lat))
+        if not candidates and not self._large:
+            return []
+        point = None
+        matched = []
+        for fence_id, (kind, types, prepared) in (candidates or {}).items():
+            if types and signal_type not in types:
+                continue
+            if kind == _CROSSES:
+                if point is None:
+                    point = Point(lon, lat, srid=4326)
+                if not prepared.intersects(point):
+                    continue
+            matched.append(fence_id)
+        for fence_id, (types, prepared) in self._large.items():
+            if types and signal_type not in types:
+                continue
+            if point is None:
+                point = Point(lon, lat, srid=4326)
+            if prepared.intersects(point):
+                matched.append(fence_id)
+        return matched
+
+
+class GeofenceMatcher:
+    """
+    Matches stored signals against the active geofences and records the
+    matches.
+    """
+
+    def __init__(self, refresh_seconds: float = None):
+        self.refresh_seconds = (
+            settings.GEOFENCE_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self.index = GeofenceIndex()
+        self._synced_until = None
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """
+        Bring the index up to date with the active fences.
+        """
+        now = time_module.monotonic()
+        if not force and self._refreshed_at is not None and now - self._refreshed_at < self.refresh_seconds:
+            return
+        with self._lock:
+            active = Geofence.objects.filter(active=True)
+            changed = active
+            if self._synced_until is not None:
+                # Re-adding a fence already indexed is harmless
+                changed = changed.filter(updated_at__gte=self._synced_until - _SYNC_OVERLAP)
+            updated = 0
+            for fence in changed.only('id', 'area', 'signal_types', 'updated_at'):
+                self.index.add(fence.id, fence.area, fence.signal_types)
+                if self._synced_until is None or fence.updated_at > self._synced_until:
+                    self._synced_until = fence.updated_at
+                updated += 1
+
+            active_ids = set(active.values_list('id', flat=True))
+            removed = self.index.fence_ids() - active_ids
+            for fence_id in removed:
+                self.index.remove(fence_id)
+            self._refreshed_at = now
+
+        if updated or removed:
+            logger.debug(f'Geofence index refreshed: {updated} updated, {len(removed)} removed')
+
+    def match(self, signals: Iterable) -> List[Tuple]:
+        """
+        (fence_id, signal) for every fence each signal landed in.
+        """
+        self.refresh()
+        matches = []
+        for signal in signals:
+            if signal.location is None:
+                continue
+            signal_type = getattr(signal.signal_type, 'value', signal.signal_type)
+            for fence_id in self.index.match(signal_type, signal.location.x, signal.location.y):
+                matches.append((fence_id, signal))
+        return matches
+
+    def record(self, signals: Iterable) -> int:
+        """
+        Match a chunk of stored signals and store the matches.
+        Returns the number of matches.
+        """
+        matches = self.match(signals)
+        if matches:
+            GeofenceMatch.objects.bulk_create(
+                [
+                    GeofenceMatch(
+                        geofence_id=fence_id,
+                        signal_id=signal.id,
+                        signal_type=getattr(signal.signal_type, 'value', signal.signal_type),
+                        occurred_at=signal.occurred_at,
+                    )
+                    for fence_id, signal in matches
+                ],
+                ignore_conflicts=True,
+            )
+        return len(matches)
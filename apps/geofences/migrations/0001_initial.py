@@ -0,0 +1,61 @@
+# Generated by Django 4.2 on 2026-10-19 13:59
+
+from django.conf import settings
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Geofence',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('area', django.contrib.gis.db.models.fields.MultiPolygonField(srid=4326)),
+                ('signal_types', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(choices=[('robbery', 'Robbery'), ('assault', 'Assault'), ('burglary', 'Burglary'), ('vehicle_theft', 'Vehicle Theft'), ('harassment', 'Harassment'), ('other', 'Other')], max_length=50), blank=True, default=list, size=None)),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='geofences', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GeofenceMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signal_id', models.UUIDField()),
+                ('signal_type', models.CharField(choices=[('robbery', 'Robbery'), ('assault', 'Assault'), ('burglary', 'Burglary'), ('vehicle_theft', 'Vehicle Theft'), ('harassment', 'Harassment'), ('other', 'Other')], max_length=50)),
+                ('occurred_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('geofence', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='geofences.geofence')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='geofencematch',
+            index=models.Index(fields=['geofence', 'created_at'], name='geofences_g_geofenc_b00ed3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='geofencematch',
+            index=models.Index(condition=models.Q(('notified_at__isnull', True)), fields=['created_at'], name='geofence_match_unnotified'),
+        ),
+        migrations.AddConstraint(
+            model_name='geofencematch',
+            constraint=models.UniqueConstraint(fields=('geofence', 'signal_id'), name='uniq_geofence_match'),
+        ),
+        migrations.AddIndex(
+            model_name='geofence',
+            index=models.Index(fields=['owner', 'active'], name='geofences_g_owner_i_d849a5_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+import uuid
+
+from apps.signals.models import Signal
+
+
+class Geofence(models.Model):
+    """
+    An area a user wants alerts for.
+    """
+    id = models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='geofences',
+    )
+    name = models.CharField(max_length=100)
+    area = gis_models.MultiPolygonField(srid=4326)
+    # Empty means every signal type
+    signal_types = ArrayField(
+        models.CharField(max_length=50, choices=Signal.SIGNAL_TYPES),
+        blank=True,
+        default=list,
+    )
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Matchers pick up changed fences by updated_at
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'active']),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.owner})'
+
+
+class GeofenceMatch(models.Model):
+    """
+    A stored signal that landed inside a geofence.
+    """
+    geofence = models.ForeignKey(Geofence, on_delete=models.CASCADE, related_name='matches')
+    # Plain ids: the signal table is partitioned and cannot be referenced
+    signal_id = models.UUIDField()
+    signal_type = models.CharField(max_length=50, choices=Signal.SIGNAL_TYPES)
+    occurred_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['geofence', 'signal_id'], name='uniq_geofence_match'),
+        ]
+        indexes = [
+            models.Index(fields=['geofence', 'created_at']),
+            models.Index(
+                fields=['created_at'],
+                name='geofence_match_unnotified',
+                condition=models.Q(notified_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.signal_type} in {self.geofence_id} at {self.occurred_at}'
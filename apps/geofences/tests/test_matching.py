@@ -0,0 +1,125 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.geofences.matching import GeofenceIndex, GeofenceMatcher
+from apps.geofences.models import Geofence, GeofenceMatch
+from apps.signals.models import Signal
+from apps.sources.models import Source
+
+
+def square(lon, lat, size):
+    return MultiPolygon(Polygon.from_bbox((lon, lat, lon + size, lat + size)), srid=4326)
+
+
+def triangle(lon, lat, size):
+    return MultiPolygon(
+        Polygon(((lon, lat), (lon + size, lat), (lon, lat + size), (lon, lat))),
+        srid=4326,
+    )
+
+
+class GeofenceIndexTestCase(SimpleTestCase):
+    """
+    Test case for the GeofenceIndex grid.
+    """
+
+    def test_match_agrees_with_brute_force(self):
+        """
+        Test that index matches equal testing every fence, for fences of all sizes.
+        """
+        rng = random.Random(3)
+        index = GeofenceIndex(cell_degrees=0.05, max_cells=64)
+        fences = {}
+        for i in range(300):
+            shape = rng.choice([square, triangle])
+            area = shape(3.0 + rng.random(), 6.0 + rng.random(), rng.choice([0.01, 0.07, 0.3, 0.6]))
+            types = rng.choice([(), ('robbery',), ('assault', 'robbery')])
+            fences[i] = (area, types)
+            index.add(i, area, types)
+
+        for _ in range(500):
+            lon, lat = 3.0 + rng.random() * 1.2, 6.0 + rng.random() * 1.2
+            signal_type = rng.choice(['robbery', 'assault', 'other'])
+            point = Point(lon, lat, srid=4326)
+            expected = {
+                i for i, (area, types) in fences.items()
+                if (not types or signal_type in types) and area.intersects(point)
+            }
+            self.assertEqual(set(index.match(signal_type, lon, lat)), expected)
+
+    def test_add_replaces_and_remove_drops(self):
+        """
+        Test that re-adding a fence moves it and removing it stops matches.
+        """
+        index = GeofenceIndex(cell_degrees=0.05)
+        index.add('a', square(3.0, 6.0, 0.1))
+        self.assertEqual(index.match('robbery', 3.05, 6.05), ['a'])
+
+        index.add('a', square(4.0, 7.0, 0.1))
+        self.assertEqual(index.match('robbery', 3.05, 6.05), [])
+        self.assertEqual(index.match('robbery', 4.05, 7.05), ['a'])
+
+        index.remove('a')
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.match('robbery', 4.05, 7.05), [])
+
+
+class GeofenceMatcherTestCase(TestCase):
+    """
+    Test case for the GeofenceMatcher class.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('alice')
+        self.source = Source.objects.create(platform='test', external_identifier='matcher')
+        self.matcher = GeofenceMatcher(refresh_seconds=0)
+
+    def _signal(self, lon, lat, signal_type='robbery'):
+        return Signal.objects.create(
+            content='Signal',
+            signal_type=signal_type,
+            location=Point(lon, lat, srid=4326),
+            occurred_at=timezone.now(),
+            source=self.source,
+        )
+
+    def test_record_matches(self):
+        """
+        Test that stored signals inside a fence are recorded once per fence.
+        """
+        fence = Geofence.objects.create(owner=self.user, name='Home', area=square(3.0, 6.0, 0.1))
+        Geofence.objects.create(
+            owner=self.user, name='Assaults only', area=square(3.0, 6.0, 0.1), signal_types=['assault'],
+        )
+        inside, outside = self._signal(3.05, 6.05), self._signal(5.0, 5.0)
+
+        self.assertEqual(self.matcher.record([inside, outside]), 1)
+        self.assertEqual(self.matcher.record([inside]), 1)
+        match = GeofenceMatch.objects.get()
+        self.assertEqual((match.geofence_id, match.signal_id), (fence.id, inside.id))
+
+    def test_refresh_picks_up_changes(self):
+        """
+        Test that edited, deactivated and deleted fences are reflected after a refresh.
+        """
+        fence = Geofence.objects.create(owner=self.user, name='Home', area=square(3.0, 6.0, 0.1))
+        other = Geofence.objects.create(owner=self.user, name='Work', area=square(4.0, 7.0, 0.1))
+        self.matcher.refresh()
+        self.assertEqual(len(self.matcher.index), 2)
+
+        fence.area = square(5.0, 8.0, 0.1)
+        fence.save()
+        other.delete()
+        self.matcher.refresh()
+        self.assertEqual(self.matcher.index.match('robbery', 5.05, 8.05), [fence.id])
+        self.assertEqual(self.matcher.index.match('robbery', 3.05, 6.05), [])
+        self.assertNotIn(other.id, self.matcher.index)
+
+        Geofence.objects.filter(id=fence.id).update(active=False, updated_at=timezone.now() + timedelta(seconds=1))
+        self.matcher.refresh()
+        self.assertEqual(len(self.matcher.index), 0)
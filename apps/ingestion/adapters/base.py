@@ -4,6 +4,29 @@ from apps.ingestion.types import RawSignal, NormalizedSignal
 
 class SourceAdapter(ABC):
 
+    # Set by the coordinator (see apps/ingestion/fetch_guard.py)
+    fetch_guard = None
+
+    @property
+    def name(self) -> str:
+        """
+        Configured name (set by the adapter registry), or the class name.
+        """
+        return self.__dict__.get('_name') or self.__class__.__name__
+
+    @name.setter
+    def name(self, value: str):
+        self._name = value
+
+    def guarded_fetch(self, platform: str, identifier: str, url: str, fetch):
+        """
+        fetch() through the fetch guard, if any: skipped with CircuitOpen
+        while the source's breaker is open, and rate limited per host.
+        """
+        if self.fetch_guard is None:
+            return fetch()
+        return self.fetch_guard.call(platform, identifier, url, fetch)
+
     @abstractmethod
     def fetch_signals(self) -> List[RawSignal]:
         """
@@ -0,0 +1,144 @@
+"""
+Registry of configured source adapters.
+
+Adapters are configured by name in settings.INGESTION_ADAPTERS:
+
+    'rss': {
+        'BACKEND': 'apps.ingestion.adapters.rss.RssAdapter',
+        'OPTIONS': {'feed_urls': [...]},   # constructor keyword arguments
+        'ENABLED': True,                   # False: a template for Source rows only
+    }
+
+and per source in active Source rows whose metadata names one of them:
+
+    {'adapter': 'rss', 'adapter_options': {'feed_urls': ['https://...']}}
+
+Each Source row gets its own instance, named '<adapter>:<source id>', with
+the row's options over the configured ones.
+
+Adapter modules (and what they import, such as Faker or feedparser) are
+only imported when an adapter of that class is first built, so importing
+the coordinator or starting a command does not pay for adapters that are
+not in use.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AdapterSpec:
+    name: str
+    backend: str
+    options: Dict = field(default_factory=dict)
+    enabled: bool = True
+
+
+class AdapterRegistry:
+    """
+    Configured adapters, with their classes imported on first use.
+    """
+
+    def __init__(self, config: Dict = None):
+        config = settings.INGESTION_ADAPTERS if config is None else config
+        self._specs: Dict[str, AdapterSpec] = {}
+        self._classes = {}
+        self._lock = threading.Lock()
+        for name, entry in config.items():
+            if 'BACKEND' not in entry:
+                raise ImproperlyConfigured(f"INGESTION_ADAPTERS['{name}'] has no BACKEND")
+            self.register(name, entry['BACKEND'], entry.get('OPTIONS'), entry.get('ENABLED', True))
+
+    def register(self, name: str, backend: str, options: Dict = None, enabled: bool = True):
+        self._specs[name] = AdapterSpec(name, backend, dict(options or {}), enabled)
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def adapter_class(self, backend: str):
+        """
+        The adapter class at a dotted path, imported the first time.
+        """
+        cls = self._classes.get(backend)
+        if cls is None:
+            with self._lock:
+                cls = self._classes.get(backend)
+                if cls is None:
+                    cls = self._classes[backend] = import_string(backend)
+        return cls
+
+    def build(self, spec: AdapterSpec):
+        adapter = self.adapter_class(spec.backend)(**spec.options)
+        adapter.name = spec.name
+        return adapter
+
+    def source_specs(self) -> List[AdapterSpec]:
+        """
+        Specs of the active Source rows that configure an adapter.
+        """
+        from apps.sources.models import Source
+
+        specs = []
+        sources = Source.objects.filter(active=True, metadata__has_key='adapter').order_by('created_at')
+        for source in sources:
+            template = self._specs.get(source.metadata['adapter'])
+            if template is None:
+                logger.warning(
+                    f"Source {source} names unknown adapter {source.metadata['adapter']!r}",
+                    extra={'source_id': str(source.id)},
+                )
+                continue
+            specs.append(AdapterSpec(
+                name=f'{template.name}:{source.id}',
+                backend=template.backend,
+                options={**template.options, **(source.metadata.get('adapter_options') or {})},
+            ))
+        return specs
+
+    def specs(self, include_sources: bool = True) -> List[AdapterSpec]:
+        specs = [spec for spec in self._specs.values() if spec.enabled]
+        if include_sources:
+            specs.extend(self.source_specs())
+        return specs
+
+    def adapters(self, include_sources: bool = True) -> List:
+        """
+        An instance of every enabled adapter and of every adapter configured
+        by a Source row. One that cannot be built is logged and left out.
+        """
+        adapters = []
+        for spec in self.specs(include_sources):
+            try:
+                adapters.append(self.build(spec))
+            except Exception as e:
+                logger.error(
+                    f"Adapter {spec.name} could not be built",
+                    exc_info=True,
+                    extra={
+                        'adapter': spec.name,
+                        'error_type': type(e).__name__,
+                        'error_message': str(e)
+                    }
+                )
+        return adapters
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> AdapterRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = AdapterRegistry()
+    return _registry
@@ -1,97 +1,176 @@
 from .base import SourceAdapter
 import feedparser
 from typing import List
-import random
-from datetime import datetime
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.utils import timezone
+from apps.ingestion.classifier import get_classifier
+from apps.ingestion.fetch_guard import CircuitOpen
+from apps.ingestion.geocoder import get_geocoder
 from apps.ingestion.types import RawSignal, NormalizedSignal
+from apps.signals.models import Signal
 import logging
 
 logger = logging.getLogger(__name__)
 
+class FeedUnavailable(Exception):
+    """
+    Raised when a feed could not be fetched or parsed at all.
+    """
+
+
 class RssAdapter(SourceAdapter):
     """
     RSS adapter for fetching signals from RSS feeds.
+    Entries carry neither a signal type nor coordinates, so each feed's
+    entries are typed by the keyword classifier and located by the
+    offline geocoder, one batch each. Each feed is fetched through the
+    fetch guard as the source ('rss', url), so a dead feed is skipped
+    while its circuit breaker is open.
+
+    occurred_at is part of the dedup hash, so entries need a timestamp
+    that is the same on every fetch. Entries without a published date use
+    their updated or created date, and failing those the occurred_at of
+    the signal already stored for their link, so only the first fetch of
+    an undated entry is stamped with the current time.
     """
-    pass
-    # def __init__(self, feed_urls: List[str]):
-    #     """
-    #     Instantiates the RssAdapter with a list of RSS feed URLs.
-    #     """
-    #     self.feed_urls = feed_urls
-    
-    # def fetch_signals(self) -> RawSignal:
-    #     """
-    #     Fetch raw RSS entries and convert to RawSignal.
-    #     """
-    #     raw_signals = []
-
-    #     for urls in self.feed_urls:
-    #         logger.info(f"Fetching RSS feed: {urls}")
-    #         feed = feedparser.parse(urls)
-
-    #         # Track how many we get from this specific URL
-    #         count_before = len(raw_signals)
-
-    #         # Check if feedparser encountered a structural problem.
-    #         if feed.bozo:
-    #             logger.warning(f"Feed at {urls} might be malformed: {feed.bozo_exception}")
-
-    #         for entry in feed.entries:
-    #             try:
-    #                 published = getattr(entry, 'published_parsed', None)
-    #                 if published:
-    #                     # The '*' unpacks the tuple
-    #                     published_dt = datetime(*published[:6])
-    #                 else:
-    #                     published_dt = None
-    #                 raw = RawSignal(
-    #                     title=getattr(entry, "title", ""),
-    #                     description=getattr(entry, "description", ""),
-    #                     link=getattr(entry, "link", ""),
-    #                     published=published_dt,
-    #                     source_name=urls
-    #                 )
-    #                 raw_signals.append(raw)
-    #             except Exception as e:
-    #                 # Get a friendly name for the entry that failed.
-    #                 entry_label = getattr(
-    #                     entry, 'title',
-    #                     getattr(entry, 'link', 'Unknown Title')
-    #                 )
-    #                 logger.error(
-    #                     f"Failed to parse RSS entry: {entry_label} from {urls}",
-    #                     exc_info=True
-    #                 )
-    #                 continue
-            
-    #         # Track how many we get from this specific URL
-    #         count_after = len(raw_signals)
-    #         logger.info(f"Fetched {count_after - count_before} signals from {urls}")
-    #     return raw_signals
-    
-    # def normalize_signal(self, raw_signal: RawSignal) -> NormalizedSignal:
-    #     """
-    #     Normalize a raw RSS entry to a NormalizedSignal.
-    #     """
-    #     return NormalizedSignal(
-    #         signal_type=raw_signal.signal_type if raw_signal.signal_type else 'other',
-    #         description=raw_signal.description,
-    #         timestamp=raw_signal.published,
-    #         location_lat=raw_signal.location_lat if raw_signal.location_lat else None,
-    #         location_lon=raw_signal.location_lon if raw_signal.location_lon else None,
-    #         source_platform=raw_signal.source_platform,
-    #         source_identifier=raw_signal.source_identifier,
-    #         additional_data=raw_signal.additional_data
-    #     )
-
-# if __name__ == '__main__':
-#     feed_urls = [
-#     "https://www.vanguardngr.com/feed/",
-#     "https://www.punchng.com/feed/",
-#     ]
-#     adapter = RssAdapter(feed_urls)
-#     signals = adapter.fetch_signals()
-#     print(f"Fetched {len(signals)} signals")
-#     print(signals[0])
+    SOURCE_PLATFORM = 'rss'
+
+    def __init__(self, feed_urls: List[str] = None):
+        """
+        Instantiates the RssAdapter with a list of RSS feed URLs.
+        """
+        self.feed_urls = settings.RSS_FEED_URLS if feed_urls is None else feed_urls
+        self.classifier = get_classifier()
+        self.geocoder = get_geocoder()
+
+    def fetch_signals(self) -> List[RawSignal]:
+        """
+        Fetch raw RSS entries and convert to RawSignal.
+        """
+        raw_signals = []
+
+        for url in self.feed_urls:
+            logger.info(f"Fetching RSS feed: {url}")
+            try:
+                feed = self.guarded_fetch(self.SOURCE_PLATFORM, url, url, lambda: self._parse_feed(url))
+            except CircuitOpen as e:
+                logger.info(f"Skipped RSS feed {url}: {e}")
+                continue
+            except Exception:
+                logger.error(f"Failed to fetch RSS feed: {url}", exc_info=True)
+                continue
+
+            # Check if feedparser encountered a structural problem.
+            if feed.bozo:
+                logger.warning(f"Feed at {url} might be malformed: {feed.bozo_exception}")
+
+            entries = []
+            for entry in feed.entries:
+                try:
+                    entries.append(self._parse_entry(entry, url))
+                except Exception:
+                    # Get a friendly name for the entry that failed.
+                    entry_label = getattr(entry, 'title', getattr(entry, 'link', 'Unknown Title'))
+                    logger.error(f"Failed to parse RSS entry: {entry_label} from {url}", exc_info=True)
+            self._stamp_undated(entries, url)
+
+            texts = [(raw.title, raw.description) for raw in entries]
+            classifications = self.classifier.classify_batch(texts)
+            places = self.geocoder.resolve_batch(texts)
+            for raw, classification, place in zip(entries, classifications, places):
+                raw.signal_type = classification.signal_type
+                raw.type_confidence = classification.confidence
+                if place is not None:
+                    raw.location = Point(place.longitude, place.latitude, srid=4326)
+                    raw.place = place.name
+
+            # Signals must have a location to be stored; entries naming no
+            # known place are dropped
+            located = [raw for raw in entries if raw.location is not None]
+            if len(located) < len(entries):
+                logger.debug(f"Skipped {len(entries) - len(located)} entries without a location from {url}")
+            raw_signals.extend(located)
+            logger.info(f"Fetched {len(located)} signals from {url}")
+        return raw_signals
+
+    def normalize_signal(self, raw_signal: RawSignal) -> NormalizedSignal:
+        """
+        Normalize a raw RSS entry to a NormalizedSignal.
+        """
+        return NormalizedSignal(
+            title=raw_signal.title,
+            signal_type=raw_signal.signal_type,
+            description=raw_signal.description,
+            timestamp=raw_signal.published,
+            location=raw_signal.location,
+            source_platform=self.SOURCE_PLATFORM,
+            source_identifier=raw_signal.source_name,
+            additional_data={
+                'has_photo': raw_signal.has_photo,
+                'has_video': raw_signal.has_video,
+                'original_link': raw_signal.link,
+                'type_confidence': raw_signal.type_confidence,
+                'place': raw_signal.place,
+            }
+        )
+
+    @staticmethod
+    def _parse_feed(url):
+        """
+        Fetch and parse a feed. feedparser reports network errors as a
+        bozo feed rather than raising, so a bozo feed without entries is
+        raised as unavailable.
+        """
+        feed = feedparser.parse(url)
+        if feed.bozo and not feed.entries:
+            raise FeedUnavailable(f"{url}: {feed.bozo_exception}")
+        return feed
 
+    def _stamp_undated(self, entries: List[RawSignal], url):
+        """
+        Give undated entries the occurred_at already stored for their link,
+        or the current time on first sight.
+        """
+        undated = [raw for raw in entries if raw.published is None]
+        if not undated:
+            return
+        links = {raw.link for raw in undated if raw.link}
+        first_seen = {}
+        if links:
+            stored = Signal.objects.filter(
+                source__platform=self.SOURCE_PLATFORM,
+                source__external_identifier=url,
+                source_metadata__original_link__in=links,
+            ).order_by('occurred_at').values_list('source_metadata__original_link', 'occurred_at')
+            for link, occurred_at in stored:
+                first_seen.setdefault(link, occurred_at)
+        now = timezone.now()
+        for raw in undated:
+            raw.published = first_seen.get(raw.link, now)
 
+    @staticmethod
+    def _parse_entry(entry, url) -> RawSignal:
+        # Undated entries are left without one for _stamp_undated
+        published_dt = None
+        for field in ('published_parsed', 'updated_parsed', 'created_parsed'):
+            parsed = getattr(entry, field, None)
+            if parsed:
+                # feedparser normalises dates to UTC
+                published_dt = datetime(*parsed[:6], tzinfo=dt_timezone.utc)
+                break
+        media = getattr(entry, 'media_content', None) or []
+        enclosures = getattr(entry, 'enclosures', None) or []
+        media_types = [m.get('type', '') or m.get('medium', '') for m in [*media, *enclosures]]
+        return RawSignal(
+            title=getattr(entry, 'title', ''),
+            description=getattr(entry, 'description', ''),
+            signal_type=None,  # set by the classifier
+            link=getattr(entry, 'link', ''),
+            published=published_dt,
+            source_name=url,
+            location=None,
+            has_photo=any(t.startswith('image') for t in media_types),
+            has_video=any(t.startswith('video') for t in media_types),
+        )
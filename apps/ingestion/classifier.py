@@ -0,0 +1,197 @@
+"""
+Keyword classifier mapping feed entry text to a SignalType.
+
+Rules are weighted keyword phrases per signal type plus a list of negation
+cues, loaded from a JSON file (SIGNAL_CLASSIFIER_RULES, see
+classifier_rules.json). All phrases are compiled into one Aho-Corasick
+automaton over word tokens, so an entry is scanned once whatever the
+number of rules, and matches always fall on word boundaries.
+
+Every keyword occurrence adds its weight to its type's score; title
+matches count title_weight times. An occurrence starting within
+negation_window tokens after a negation cue ("no", "false alarm", ...) is
+ignored. Overlapping phrases all count, so "armed robbery" scores both
+phrases' weights.
+
+The best scoring type wins, with confidence
+
+    margin / (margin + confidence_scale)
+
+where margin is its lead over the runner-up, so a clear lead approaches 1
+and a tie gives 0. Entries with no positive score are OTHER with
+confidence 0.
+"""
+
+import json
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from django.conf import settings
+
+from apps.ingestion.types import SignalType
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Pattern kinds
+_KEYWORD = 0
+_NEGATION = 1
+
+
+@dataclass(frozen=True)
+class Classification:
+    signal_type: SignalType
+    confidence: float
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over word tokens. Each pattern is a tuple of
+    tokens with an opaque payload, reported as (end index, length, payload).
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[Sequence[str], object]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[List[Tuple[int, object]]] = [[]]
+
+        for tokens, payload in patterns:
+            if not tokens:
+                raise ValueError('Empty classifier pattern')
+            state = 0
+            for token in tokens:
+                nxt = self._goto[state].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][token] = nxt
+                    self._goto.append({})
+                    self._output.append([])
+                state = nxt
+            self._output[state].append((len(tokens), payload))
+
+        # Breadth-first failure links; outputs of the fallback state are
+        # merged in so matching never has to follow the chain
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(token, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def __len__(self):
+        return len(self._goto)
+
+    def matches(self, tokens: Sequence[str]):
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for i, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, payload in output[state]:
+                yield i, length, payload
+
+
+class KeywordClassifier:
+    """
+    Weighted keyword classifier with negation cues.
+    """
+
+    def __init__(self, rules: dict):
+        self.title_weight = float(rules.get('title_weight', 2.0))
+        self.confidence_scale = float(rules.get('confidence_scale', 3.0))
+        self.negation_window = int(rules.get('negation_window', 3))
+        self.types = []
+
+        patterns = []
+        for cue in rules.get('negations', []):
+            patterns.append((tokenize(cue), (_NEGATION, None, 0.0)))
+        for type_name, keywords in rules.get('types', {}).items():
+            try:
+                signal_type = SignalType(type_name)
+            except ValueError:
+                raise ValueError(f'Unknown signal type in classifier rules: {type_name}')
+            index = len(self.types)
+            self.types.append(signal_type)
+            for phrase, weight in keywords.items():
+                patterns.append((tokenize(phrase), (_KEYWORD, index, float(weight))))
+        self.automaton = KeywordAutomaton(patterns)
+
+    @classmethod
+    def from_file(cls, path) -> 'KeywordClassifier':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def scores(self, title: str, description: str = '') -> List[float]:
+        """
+        Score of each configured type, in rule file order.
+        """
+        scores = [0.0] * len(self.types)
+        self._score(tokenize(title), self.title_weight, scores)
+        self._score(tokenize(description), 1.0, scores)
+        return scores
+
+    def classify(self, title: str, description: str = '') -> Classification:
+        return self._decide(self.scores(title, description))
+
+    def classify_batch(self, entries: Iterable[Tuple[str, str]]) -> List[Classification]:
+        """
+        Classify (title, description) pairs. Feeds repeat entries across
+        runs and syndicated copies, so identical pairs are scored once.
+        """
+        seen = {}
+        results = []
+        for entry in entries:
+            result = seen.get(entry)
+            if result is None:
+                result = seen[entry] = self.classify(*entry)
+            results.append(result)
+        return results
+
+    def _score(self, tokens, weight, scores):
+        # Token index where the most recent negation cue ended, or far
+        # enough back to never apply
+        negated_until = -self.negation_window - 1
+        for end, length, (kind, index, keyword_weight) in self.automaton.matches(tokens):
+            if kind == _NEGATION:
+                negated_until = end
+                continue
+            start = end - length + 1
+            if negated_until < start <= negated_until + self.negation_window:
+                continue
+            scores[index] += keyword_weight * weight
+
+    def _decide(self, scores) -> Classification:
+        best = runner_up = 0.0
+        best_index = None
+        for index, score in enumerate(scores):
+            if score > best:
+                best, runner_up, best_index = score, best, index
+            elif score > runner_up:
+                runner_up = score
+        if best_index is None:
+            return Classification(SignalType.OTHER, 0.0)
+        margin = best - runner_up
+        return Classification(self.types[best_index], round(margin / (margin + self.confidence_scale), 3))
+
+
+@lru_cache(maxsize=None)
+def _load(path) -> KeywordClassifier:
+    return KeywordClassifier.from_file(path)
+
+
+def get_classifier() -> KeywordClassifier:
+    """
+    Process-wide classifier built from SIGNAL_CLASSIFIER_RULES.
+    """
+    return _load(str(settings.SIGNAL_CLASSIFIER_RULES))
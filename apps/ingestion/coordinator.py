@@ -3,16 +3,28 @@ This file orchestrates the ingestion process.
 """
 
 import logging
+from contextlib import nullcontext
+from functools import partial
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
-from apps.ingestion.adapters.rss import RssAdapter
-from apps.ingestion.adapters.mock import MockAdapter
-from apps.ingestion.trust import TrustCalculator
+from apps.ingestion.adapters.registry import get_registry
+from apps.ingestion.trust_rules import ChunkScorer, get_evaluator
 from apps.ingestion.dedup import DeduplicationService
+from apps.ingestion.fetch_guard import FetchGuard
+from apps.ingestion.quarantine import quarantine_signals, record_replay
+from apps.ingestion.queue import RAW_SIGNALS_TOPIC, decode_raw_signal, encode_raw_signal, get_queue
 
+from apps.geofences.matching import GeofenceMatcher
+
+from apps.signals.incidents import IncidentClusterer, assign_incident
 from apps.signals.models import Signal
+from apps.signals.response_cache import ResponseCache
+from apps.signals.rollups import increment_rollups
+from apps.signals.tiles import TileCache
 from apps.sources.models import Source
+from apps.sources.trust_history import record_trust_changes
 
 logger = logging.getLogger(__name__)
 
@@ -20,23 +32,38 @@ class IngestionCoordinator:
     """
     Orchestrates the ingestion process.
     """
-    def __init__(self):
-        # FIX #1: Changed RSSAdapter to RssAdapter (correct import name)
-        self.adapters = [MockAdapter()]
-        self.trust_calculator = TrustCalculator()
+    def __init__(self, adapters=None):
+        # Configured in settings.INGESTION_ADAPTERS and Source rows
+        self.adapters = get_registry().adapters() if adapters is None else adapters
+        # TrustCalculator's rules unless settings.TRUST_RULES_FILE replaces them
+        self.trust_evaluator = get_evaluator()
         self.deduplication_service = DeduplicationService()
+        self.incident_clusterer = IncidentClusterer()
+        self.geofence_matcher = GeofenceMatcher()
+        self.tile_cache = TileCache()
+        self.response_cache = ResponseCache()
+        self._adapters_by_name = {a.name: a for a in self.adapters}
+        self.fetch_guard = FetchGuard()
+        # Set by ingest_signals --profile (see apps/ingestion/profiling.py)
+        self.profiler = None
+        for adapter in self.adapters:
+            adapter.fetch_guard = self.fetch_guard
 
     def run(self):
         """
         Main ingestion loop with error isolation per source.
         """
         logger.info("Starting ingestion coordinator run")
+        totals = {'processed': 0, 'duplicates': 0, 'quarantined': 0}
+        self.fetch_guard.reset()
         
         for adapter in self.adapters:
-            adapter_name = adapter.__class__.__name__
+            adapter_name = adapter.name
             try:
                 logger.info(f"Processing source: {adapter_name}")
-                self._process_source(adapter)
+                summary = self._process_source(adapter)
+                for key in totals:
+                    totals[key] += summary[key]
                 logger.info(f"Successfully processed source: {adapter_name}")
             except Exception as e:
                 # Error isolation: log and continue with next source
@@ -51,75 +78,233 @@ class IngestionCoordinator:
                 )
                 # Continue with next source
         
-        logger.info("Ingestion coordinator run completed")
+        totals.update(self.fetch_guard.summary())
+        logger.info(
+            f"Ingestion coordinator run completed: {totals['processed']} stored, "
+            f"{totals['duplicates']} duplicates, {totals['quarantined']} quarantined, "
+            f"{totals['skipped_fetches']} fetches skipped by open breakers",
+            extra=totals,
+        )
+        self._log_breakers(totals['breakers'])
+        return totals
     
+    def publish(self, queue=None):
+        """
+        Fetch every source and publish its signals to the work queue in
+        batches, for store workers to process. Returns the number of
+        batches published.
+        """
+        queue = queue or get_queue()
+        batch_size = settings.INGESTION_QUEUE_BATCH_SIZE
+        published = 0
+        self.fetch_guard.reset()
+
+        for adapter in self.adapters:
+            adapter_name = adapter.name
+            try:
+                signals = self._fetch(adapter)
+                payloads = [
+                    {
+                        'adapter': adapter_name,
+                        'signals': [encode_raw_signal(raw) for raw in signals[i:i + batch_size]],
+                    }
+                    for i in range(0, len(signals), batch_size)
+                ]
+                queue.publish(RAW_SIGNALS_TOPIC, payloads)
+                published += len(payloads)
+                logger.info(
+                    f"[{adapter_name}] Published {len(signals)} signals in {len(payloads)} batches",
+                    extra={'adapter': adapter_name, 'signals': len(signals), 'batches': len(payloads)},
+                )
+            except Exception as e:
+                logger.error(
+                    f"Source failed: {adapter_name}",
+                    exc_info=True,
+                    extra={
+                        'adapter': adapter_name,
+                        'error_type': type(e).__name__,
+                        'error_message': str(e)
+                    }
+                )
+        fetches = self.fetch_guard.summary()
+        logger.info(
+            f"Published {published} batches, "
+            f"{fetches['skipped_fetches']} fetches skipped by open breakers",
+            extra={'published': published, **fetches},
+        )
+        self._log_breakers(fetches['breakers'])
+        return published
+
+    def _log_breakers(self, breakers):
+        for key, state in sorted(breakers.items()):
+            logger.warning(
+                f"Circuit breaker {state}: {key}",
+                extra={'source': key, 'breaker_state': state},
+            )
+
+    def process_message(self, message):
+        """
+        Store one published batch. Raises if the batch should be retried.
+        """
+        adapter_name = message.payload['adapter']
+        adapter = self._adapters_by_name.get(adapter_name)
+        if adapter is None:
+            raise ValueError(f"Unknown adapter in queued batch: {adapter_name}")
+        signals = [decode_raw_signal(data) for data in message.payload['signals']]
+        return self._process_signals(adapter, signals)
+
+    def replay_quarantined(self, rows):
+        """
+        Process quarantined signals again, deleting the rows that now store
+        and recording the new error of the others. Returns (resolved, failed).
+        """
+        by_adapter = {}
+        for row in rows:
+            by_adapter.setdefault(row.adapter, []).append(row)
+
+        resolved, failed = [], []
+        for adapter_name, group in by_adapter.items():
+            adapter = self._adapters_by_name.get(adapter_name)
+            if adapter is None:
+                error = ValueError(f"Unknown adapter: {adapter_name}")
+                failed.extend((row, error) for row in group)
+                continue
+            replayed, signals = [], []
+            for row in group:
+                try:
+                    signals.append(decode_raw_signal(row.payload))
+                    replayed.append(row)
+                except Exception as e:
+                    failed.append((row, e))
+            summary = self._process_signals(adapter, signals, quarantine=False)
+            errors = {id(signal): error for signal, error in summary['failures']}
+            for row, signal in zip(replayed, signals):
+                if id(signal) in errors:
+                    failed.append((row, errors[id(signal)]))
+                else:
+                    resolved.append(row)
+
+        record_replay(resolved, failed)
+        return len(resolved), len(failed)
+
     def _process_source(self, adapter):
         """
-        Process a single source end to end with transaction boundary.
-        All-or-nothing: if any step fails, entire source processing is rolled back.
+        Process a single source end to end, one transaction per signal.
+        A signal that fails is quarantined without affecting the others.
         """
-        adapter_name = adapter.__class__.__name__
+        adapter_name = adapter.name
         
         # Fetch signals
         logger.info(f"[{adapter_name}] Step 1: Fetching signals")
         signals = self._fetch(adapter)
         logger.info(f"[{adapter_name}] Fetched {len(signals)} signals")
-        
+        return self._process_signals(adapter, signals)
+
+    def _process_signals(self, adapter, signals, quarantine=True):
+        """
+        Normalize, score and store fetched signals. The chunk is normalized
+        and scored up front (see ChunkScorer for cross-validation within
+        it), then each signal is stored in its own transaction. Signals
+        that fail are quarantined (unless quarantine is False) and the rest
+        carry on. Returns the counts, with the failed (signal, error) pairs
+        under 'failures'.
+        """
+        adapter_name = adapter.name
+        summary = {'processed': 0, 'duplicates': 0, 'quarantined': 0, 'failures': []}
         if not signals:
             logger.info(f"[{adapter_name}] No signals to process")
-            return
+            return summary
         
         # Process each signal
         processed_count = 0
         duplicate_count = 0
+        near_duplicate_count = 0
         error_count = 0
         
+        stored_signals = []
+        failures = []
+
+        def fail(idx, signal, e, normalized_signal=None):
+            nonlocal duplicate_count, error_count
+            from django.db import IntegrityError
+
+            # Handle duplicates gracefully (unique constraint on dedup_hash)
+            if isinstance(e, IntegrityError) and 'dedup_hash' in str(e):
+                duplicate_count += 1
+                logger.debug(
+                    f"[{adapter_name}] Signal {idx}/{len(signals)}: Duplicate detected (IntegrityError)",
+                    extra={'signal_type': normalized_signal.signal_type if normalized_signal else 'unknown'}
+                )
+            else:
+                error_count += 1
+                logger.error(
+                    f"[{adapter_name}] Signal {idx}/{len(signals)}: Processing failed",
+                    exc_info=e,
+                    extra={
+                        'error_type': type(e).__name__,
+                        'error_message': str(e)
+                    }
+                )
+                # Keep the signal for replay and carry on with the batch
+                failures.append((signal, e))
+
+        # Step 1: Normalize, and look up each source once per chunk so
+        # its trust score stays current across the chunk's signals
+        prepared = []
+        sources = {}
         for idx, signal in enumerate(signals, 1):
             try:
-                with transaction.atomic():
-                    # Step 1: Normalize
-                    logger.debug(f"[{adapter_name}] Signal {idx}/{len(signals)}: Normalizing")
-                    normalized_signal = self._normalize(signal, adapter)
-
-                    # get_or_create returns (object, created) tuple
-                    source, created = Source.objects.get_or_create(
-                        platform=normalized_signal.source_platform,
-                        external_identifier=normalized_signal.source_identifier,
-                        defaults={'last_fetched_at': normalized_signal.timestamp}
-                    )
-                    
-                    if created:
-                        logger.info(
-                            f"[{adapter_name}] Created new source: {source}",
-                            extra={'source_id': str(source.id)}
-                        )
-                    else:
-                        # Update last_fetched_at for existing sources
-                        source.last_fetched_at = timezone.now()
-                        source.save(update_fields=['last_fetched_at'])
-                    
-                    # Step 2: Score
-                    logger.debug(f"[{adapter_name}] Signal {idx}/{len(signals)}: Calculating trust score")
-                    score = self._score(normalized_signal, source)
+                logger.debug(f"[{adapter_name}] Signal {idx}/{len(signals)}: Normalizing")
+                normalized_signal = self._normalize(signal, adapter)
+                key = (normalized_signal.source_platform, normalized_signal.source_identifier)
+                if key not in sources:
+                    sources[key] = self._get_source(adapter_name, normalized_signal)
+                prepared.append((idx, signal, normalized_signal, sources[key]))
+            except Exception as e:
+                fail(idx, signal, e)
+
+        # Step 2: Score the chunk
+        logger.debug(f"[{adapter_name}] Calculating trust scores of {len(prepared)} signals")
+        scorer = self._score(
+            [normalized_signal for _, _, normalized_signal, _ in prepared],
+            [source for _, _, _, source in prepared],
+        )
+
+        try:
+            for i, (idx, signal, normalized_signal, source) in enumerate(prepared):
+                previous_score = source.trust_score
+                try:
+                    with transaction.atomic():
+                        score, breakdown = scorer.score(i)
                     
-                    # Update source trust score
-                    if score is not None and source.trust_score != score:
-                        old_score = source.trust_score
-                        source.trust_score = score
-                        source.save(update_fields=['trust_score'])
-                        logger.info(
-                            f"[{adapter_name}] Updated trust score for {source}: {old_score} → {score}",
-                            extra={
-                                'source_id': str(source.id),
-                                'old_score': old_score,
-                                'new_score': score
-                            }
-                        )
+                        # Update source trust score
+                        if score is not None and source.trust_score != score:
+                            old_score = source.trust_score
+                            source.trust_score = score
+                            source.save(update_fields=['trust_score'])
+                            record_trust_changes(
+                                [(source.id, score)],
+                                reason=f'Scored signal from {adapter_name}',
+                                changed_by='ingestion',
+                            )
+                            logger.info(
+                                f"[{adapter_name}] Updated trust score for {source}: {old_score} → {score}",
+                                extra={
+                                    'source_id': str(source.id),
+                                    'old_score': old_score,
+                                    'new_score': score
+                                }
+                            )
                     
-                    # Step 3: Store (dedup handled by model's unique constraint)
-                    logger.debug(f"[{adapter_name}] Signal {idx}/{len(signals)}: Storing")
-                    stored_signal = self._store(normalized_signal, score, source)
+                        # Step 3: Store (dedup handled by model's unique constraint)
+                        logger.debug(f"[{adapter_name}] Signal {idx}/{len(signals)}: Storing")
+                        with self._stage('store'):
+                            stored_signal = self._store(normalized_signal, score, breakdown, source)
+                    scorer.stored(i)
                     processed_count += 1
+                    if stored_signal.near_duplicate_of:
+                        near_duplicate_count += 1
+                    stored_signals.append(stored_signal)
                     
                     logger.debug(
                         f"[{adapter_name}] Signal {idx}/{len(signals)}: Successfully stored",
@@ -130,47 +315,78 @@ class IngestionCoordinator:
                         }
                     )
                     
-            except Exception as e:
-                from django.db import IntegrityError
-                
-                # Handle duplicates gracefully (unique constraint on dedup_hash)
-                if isinstance(e, IntegrityError) and 'dedup_hash' in str(e):
-                    duplicate_count += 1
-                    logger.debug(
-                        f"[{adapter_name}] Signal {idx}/{len(signals)}: Duplicate detected (IntegrityError)",
-                        extra={'signal_type': normalized_signal.signal_type if 'normalized_signal' in locals() else 'unknown'}
-                    )
-                else:
-                    error_count += 1
-                    logger.error(
-                        f"[{adapter_name}] Signal {idx}/{len(signals)}: Processing failed",
-                        exc_info=True,
-                        extra={
-                            'error_type': type(e).__name__,
-                            'error_message': str(e)
-                        }
-                    )
-                    # Re-raise only for actual errors (not duplicates)
-                    raise
+                except Exception as e:
+                    # The source update rolled back with the signal
+                    source.trust_score = previous_score
+                    fail(idx, signal, e, normalized_signal)
         
+        finally:
+            with self._stage('after_store'):
+                self._after_store(adapter_name, stored_signals)
+
+        quarantined_count = 0
+        if quarantine:
+            with self._stage('quarantine'):
+                quarantined_count = quarantine_signals(adapter_name, failures)
+
         # Summary logging
         logger.info(
             f"[{adapter_name}] Processing complete: "
-            f"{processed_count} stored, {duplicate_count} duplicates, {error_count} errors",
+            f"{processed_count} stored ({near_duplicate_count} near-duplicates), "
+            f"{duplicate_count} duplicates, {error_count} errors "
+            f"({quarantined_count} quarantined)",
             extra={
                 'adapter': adapter_name,
                 'processed': processed_count,
                 'duplicates': duplicate_count,
+                'near_duplicates': near_duplicate_count,
                 'errors': error_count,
+                'quarantined': quarantined_count,
                 'total': len(signals)
             }
         )
+        summary.update(
+            processed=processed_count,
+            duplicates=duplicate_count,
+            quarantined=quarantined_count,
+            failures=failures,
+        )
+        return summary
+
+    def _after_store(self, adapter_name, stored_signals):
+        """
+        Post-store bookkeeping for the signals committed from one source.
+        Runs even when the source fails part way, since earlier signals
+        were committed in their own transactions.
+        """
+        if not stored_signals:
+            return
+        tiles = self.tile_cache.invalidate_points(s.location for s in stored_signals)
+        regions = self.response_cache.bump(stored_signals)
+        logger.debug(
+            f"[{adapter_name}] Invalidated {tiles} cached tiles, bumped {regions} response regions"
+        )
+        matches = self.geofence_matcher.record(stored_signals)
+        if matches:
+            logger.info(
+                f"[{adapter_name}] {matches} geofence matches",
+                extra={'adapter': adapter_name, 'geofence_matches': matches},
+            )
+
+    def _stage(self, name):
+        """
+        Context of one pipeline stage, profiled when a profiler is set.
+        """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(name)
 
     def _fetch(self, adapter):
         """
         Fetch signals from the adapter.
         """
-        return adapter.fetch_signals()
+        with self._stage('fetch'):
+            return adapter.fetch_signals()
     
     def _normalize(self, signal, adapter):
         """
@@ -178,29 +394,80 @@ class IngestionCoordinator:
         FIX #3: Removed call to non-existent self.normalize_signal method.
         Signals are already normalized by adapters, so just return as-is.
         """
-        # Adapters already return normalized signals
-        # If additional normalization is needed, implement it here
-        return adapter.normalize_signal(signal)
+        with self._stage('normalize'):
+            # Adapters already return normalized signals
+            # If additional normalization is needed, implement it here
+            return adapter.normalize_signal(signal)
     
-    def _score(self, signal, source):
+    def _get_source(self, adapter_name, normalized_signal):
+        """
+        Get or create the source of a signal and mark it fetched.
+        """
+        # get_or_create returns (object, created) tuple
+        source, created = Source.objects.get_or_create(
+            platform=normalized_signal.source_platform,
+            external_identifier=normalized_signal.source_identifier,
+            defaults={'last_fetched_at': normalized_signal.timestamp}
+        )
+
+        if created:
+            logger.info(
+                f"[{adapter_name}] Created new source: {source}",
+                extra={'source_id': str(source.id)}
+            )
+        else:
+            # Update last_fetched_at for existing sources
+            source.last_fetched_at = timezone.now()
+            source.save(update_fields=['last_fetched_at'])
+        return source
+
+    def _score(self, signals, sources):
         """
-        Score signals using trust calculator.
+        Score a chunk of signals using the trust rules, with one
+        cross-validation query.
         """
-        return self.trust_calculator.calculate(signal, source)
+        with self._stage('score'):
+            return ChunkScorer(signals, sources, self.trust_evaluator)
     
 
     
-    def _store(self, normalized_signal, score, source):
+    def _store(self, normalized_signal, score, breakdown, source):
         """
-        Store signals in database.
+        Store signals in database, link near-duplicate content, assign their
+        incident and count them in the heatmap rollups.
         The Signal model will auto-generate dedup_hash in its save() method.
         """
-        return Signal.objects.create(
+        signature = self.deduplication_service.content_signature(normalized_signal.description)
+        original_id = self.deduplication_service.find_near_duplicate(
+            normalized_signal.signal_type, signature, normalized_signal.timestamp,
+        )
+        incident_id = assign_incident(
+            self.incident_clusterer,
+            normalized_signal.signal_type,
+            normalized_signal.location,
+            normalized_signal.timestamp,
+        )
+        signal = Signal.objects.create(
             content=normalized_signal.description,
             signal_type=normalized_signal.signal_type,
             location=normalized_signal.location,
             occurred_at=normalized_signal.timestamp,
             source_metadata=normalized_signal.additional_data,
+            incident_id=incident_id,
+            near_duplicate_of=original_id,
+            trust_score=score,
+            trust_breakdown=breakdown,
             source=source  # ForeignKey to Source object
             # dedup_hash will be auto-generated by Signal.save()
         )
+        self.deduplication_service.index_content(signal, signature, original_id)
+        if incident_id is not None:
+            # Only index the incident once it is committed: if the rest of
+            # this signal's transaction fails the incident row is rolled back
+            transaction.on_commit(partial(
+                self.incident_clusterer.add,
+                signal.signal_type, signal.location.x, signal.location.y, signal.occurred_at, incident_id,
+            ))
+        # Heatmap rollups are updated in the same transaction as the insert
+        increment_rollups([signal])
+        return signal
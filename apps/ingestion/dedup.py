@@ -1,4 +1,11 @@
-from apps.signals.models import Signal
+import time as time_module
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from apps.ingestion import minhash
+from apps.signals.models import Signal, SignalContentBand, SignalContentSignature, SignalDedupKey
 from apps.ingestion.types import NormalizedSignal
 from apps.sources.models import Source
 
@@ -8,7 +15,8 @@ class DeduplicationService:
     Deduplication service.
 
     Responsible for deciding whether an incoming signal
-    already exists in the system.
+    already exists in the system, exactly (dedup_hash) or as a
+    near-duplicate of another signal's content (MinHash/LSH).
     """
 
     @staticmethod
@@ -27,5 +35,169 @@ class DeduplicationService:
     def is_duplicate(self, hash: str) -> bool:
         """
         Check if a signal is a duplicate, i.e checks if signals exist.
+        Looks up the claimed-hash table rather than every signal partition.
+        """
+        return SignalDedupKey.objects.filter(dedup_hash=hash).exists()
+
+    def content_signature(self, content: str):
+        """
+        MinHash signature of a signal's content, or None if it is too short
+        to compare.
+        """
+        return minhash.signature(content, settings.CONTENT_DEDUP_MIN_SHINGLES)
+
+    def find_near_duplicate(self, signal_type, signature, occurred_at):
+        """
+        Id of the original signal whose content this signature nearly
+        repeats, or None. Only signals of the same type occurring within
+        CONTENT_DEDUP_WINDOW_DAYS are considered.
+        """
+        if signature is None:
+            return None
+        signal_type = getattr(signal_type, 'value', signal_type)
+        window = timedelta(days=settings.CONTENT_DEDUP_WINDOW_DAYS)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT sig.signal_id, sig.original_id, sig.signature
+                FROM (
+                    SELECT signal_id
+                    FROM signals_signalcontentband
+                    WHERE band_hash = ANY(%s)
+                      AND occurred_at >= %s AND occurred_at <= %s
+                    GROUP BY signal_id
+                    ORDER BY count(*) DESC
+                    LIMIT %s
+                ) candidates
+                JOIN signals_signalcontentsignature sig ON sig.signal_id = candidates.signal_id
+                WHERE sig.signal_type = %s
+                """,
+                [
+                    minhash.band_hashes(signature, signal_type),
+                    occurred_at - window,
+                    occurred_at + window,
+                    settings.CONTENT_DEDUP_MAX_CANDIDATES,
+                    signal_type,
+                ],
+            )
+            rows = cursor.fetchall()
+
+        best = None
+        for signal_id, original_id, stored in rows:
+            score = minhash.similarity(signature, minhash.from_bytes(stored))
+            if score >= settings.CONTENT_DEDUP_THRESHOLD and (best is None or score > best[0]):
+                best = (score, original_id or signal_id)
+        return best[1] if best else None
+
+    def index_content(self, signal: Signal, signature, original_id=None):
+        """
+        Add a stored signal's signature and bands to the LSH index.
+        Call in the transaction that stored the signal.
+        """
+        if signature is None:
+            return
+        signal_type = getattr(signal.signal_type, 'value', signal.signal_type)
+        SignalContentSignature.objects.create(
+            signal_id=signal.id,
+            signal_type=signal_type,
+            occurred_at=signal.occurred_at,
+            signature=minhash.to_bytes(signature),
+            original_id=original_id,
+        )
+        SignalContentBand.objects.bulk_create([
+            SignalContentBand(band_hash=band_hash, signal_id=signal.id, occurred_at=signal.occurred_at)
+            for band_hash in minhash.band_hashes(signature, signal_type)
+        ])
+
+    def prune_content_index(self, before, batch_size=5000, sleep=0.1) -> int:
+        """
+        Delete signatures and bands of signals that occurred before before,
+        in small batches. Pass a time at least CONTENT_DEDUP_WINDOW_DAYS ago:
+        find_near_duplicate never reaches rows older than the window.
+        Returns the number of rows deleted.
         """
-        return Signal.objects.filter(dedup_hash=hash).exists()
+        deleted = 0
+        for table, key in (
+            ('signals_signalcontentband', 'id'),
+            ('signals_signalcontentsignature', 'signal_id'),
+        ):
+            while True:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"""
+                        DELETE FROM {table}
+                        WHERE {key} IN (
+                            SELECT {key} FROM {table}
+                            WHERE occurred_at < %s
+                            LIMIT %s
+                        )
+                        """,
+                        [before, batch_size],
+                    )
+                    count = cursor.rowcount
+                deleted += count
+                if count < batch_size:
+                    break
+                time_module.sleep(sleep)
+        return deleted
+
+    def backfill_content_index(self, since, batch_size=1000, progress=None) -> int:
+        """
+        Index signals from since onwards that have no signature yet, oldest
+        first, linking near-duplicates as ingestion would.
+        Returns the number of signals indexed.
+        """
+        indexed = 0
+        position = None
+        while True:
+            keyset = ''
+            params = [since]
+            if position is not None:
+                keyset = 'AND (s.occurred_at, s.id) > (%s, %s)'
+                params.extend(position)
+            params.append(batch_size)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT s.id, s.occurred_at, s.signal_type, s.content
+                    FROM signals_signal s
+                    WHERE s.occurred_at >= %s {keyset}
+                      AND NOT EXISTS (
+                          SELECT 1 FROM signals_signalcontentsignature c WHERE c.signal_id = s.id
+                      )
+                    ORDER BY s.occurred_at, s.id
+                    LIMIT %s
+                    """,
+                    params,
+                )
+                rows = cursor.fetchall()
+            if not rows:
+                return indexed
+
+            links = []
+            with transaction.atomic():
+                for signal_id, occurred_at, signal_type, content in rows:
+                    signature = self.content_signature(content)
+                    original_id = self.find_near_duplicate(signal_type, signature, occurred_at)
+                    signal = Signal(id=signal_id, occurred_at=occurred_at, signal_type=signal_type)
+                    self.index_content(signal, signature, original_id)
+                    if original_id is not None:
+                        links.append((signal_id, occurred_at, original_id))
+                if links:
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            """
+                            UPDATE signals_signal s
+                            SET near_duplicate_of = l.original_id
+                            FROM unnest(%s::uuid[], %s::timestamptz[], %s::uuid[])
+                                AS l(id, occurred_at, original_id)
+                            WHERE s.id = l.id AND s.occurred_at = l.occurred_at
+                            """,
+                            [[l[0] for l in links], [l[1] for l in links], [l[2] for l in links]],
+                        )
+
+            indexed += len(rows)
+            position = (rows[-1][1], rows[-1][0])
+            if progress:
+                progress(indexed)
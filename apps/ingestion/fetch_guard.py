@@ -0,0 +1,240 @@
+"""
+Circuit breaking and rate limiting of source fetches.
+
+SourceBreaker keeps a circuit breaker per source on its Source row
+(platform, external_identifier):
+
+    closed     consecutive_errors below SOURCE_BREAKER_THRESHOLD; fetch
+    open       at or above it and before breaker_retry_at; skip the fetch
+    half-open  at or above it and breaker_retry_at has passed; one fetch
+               is let through as a probe
+
+Each failure at or above the threshold schedules the next probe
+SOURCE_BREAKER_BASE_SECONDS * 2^(failures past the threshold) later, up
+to SOURCE_BREAKER_MAX_SECONDS; a success closes the breaker. Claiming the
+probe moves breaker_retry_at forward first, so concurrent runs send a
+single probe.
+
+HostRateLimiter gives each host a token bucket of FETCH_BURST_PER_HOST
+tokens refilled at FETCH_RATE_PER_HOST per second, so concurrent fetches
+from one publisher are spaced out. Buckets are per process.
+"""
+
+import logging
+import threading
+import time as time_module
+from datetime import timedelta
+from typing import Dict
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.sources.models import Source
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of fetching from a source whose breaker is open.
+    """
+
+
+class SourceBreaker:
+    """
+    Circuit breakers persisted on Source rows.
+    """
+
+    def __init__(self, threshold: int = None, base_seconds: float = None, max_seconds: float = None):
+        self.threshold = threshold or settings.SOURCE_BREAKER_THRESHOLD
+        self.base_seconds = settings.SOURCE_BREAKER_BASE_SECONDS if base_seconds is None else base_seconds
+        self.max_seconds = settings.SOURCE_BREAKER_MAX_SECONDS if max_seconds is None else max_seconds
+
+    def delay(self, consecutive_errors: int) -> timedelta:
+        """
+        Time until the next probe after this many consecutive failures.
+        """
+        exponent = min(max(consecutive_errors - self.threshold, 0), 32)
+        return timedelta(seconds=min(self.base_seconds * 2 ** exponent, self.max_seconds))
+
+    def state(self, source: Source, now=None) -> str:
+        if source is None or source.consecutive_errors < self.threshold:
+            return CLOSED
+        now = now or timezone.now()
+        if source.breaker_retry_at is not None and source.breaker_retry_at > now:
+            return OPEN
+        return HALF_OPEN
+
+    def allow(self, platform: str, identifier: str) -> str:
+        """
+        State the fetch goes ahead in (closed or half-open, as the probe).
+        Raises CircuitOpen when it must be skipped.
+        """
+        source = (
+            Source.objects.filter(platform=platform, external_identifier=identifier)
+            .only('id', 'consecutive_errors', 'breaker_retry_at')
+            .first()
+        )
+        now = timezone.now()
+        state = self.state(source, now)
+        if state == OPEN:
+            raise CircuitOpen(f'{platform}:{identifier} open until {source.breaker_retry_at.isoformat()}')
+        if state == HALF_OPEN:
+            # Lease the probe to this caller; another that read the same
+            # retry time finds nothing to update and skips
+            claimed = Source.objects.filter(
+                id=source.id, breaker_retry_at=source.breaker_retry_at,
+            ).update(breaker_retry_at=now + self.delay(source.consecutive_errors))
+            if not claimed:
+                raise CircuitOpen(f'{platform}:{identifier} is being probed')
+        return state
+
+    def record_success(self, platform: str, identifier: str):
+        Source.objects.filter(
+            platform=platform, external_identifier=identifier, consecutive_errors__gt=0,
+        ).update(consecutive_errors=0, breaker_retry_at=None)
+
+    def record_failure(self, platform: str, identifier: str) -> Source:
+        with transaction.atomic():
+            source, _ = Source.objects.select_for_update().get_or_create(
+                platform=platform, external_identifier=identifier,
+            )
+            source.consecutive_errors += 1
+            update_fields = ['consecutive_errors']
+            if source.consecutive_errors >= self.threshold:
+                source.breaker_retry_at = timezone.now() + self.delay(source.consecutive_errors)
+                update_fields.append('breaker_retry_at')
+            source.save(update_fields=update_fields)
+        if source.consecutive_errors == self.threshold:
+            logger.warning(
+                f'Circuit opened for {platform}:{identifier} after {source.consecutive_errors} failures',
+                extra={'source_id': str(source.id), 'consecutive_errors': source.consecutive_errors},
+            )
+        return source
+
+
+class TokenBucket:
+    """
+    Token bucket handing out reservations: a caller takes a token even when
+    none is left and waits for it to be refilled.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time_module.monotonic()
+
+    def reserve(self, now: float = None) -> float:
+        """
+        Take a token; returns the seconds to wait before using it.
+        """
+        now = time_module.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    """
+    A token bucket per host.
+    """
+
+    def __init__(self, rate: float = None, burst: float = None, sleep=time_module.sleep):
+        self.rate = rate or settings.FETCH_RATE_PER_HOST
+        self.burst = burst or settings.FETCH_BURST_PER_HOST
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._sleep = sleep
+
+    def acquire(self, url: str) -> float:
+        """
+        Wait for the host of url to have a token. Returns the seconds waited.
+        """
+        host = (urlsplit(url).hostname or url).lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            wait = bucket.reserve()
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+class FetchGuard:
+    """
+    Breaker and rate limiter around source fetches, counting what they did
+    for the run summary.
+    """
+
+    def __init__(self, breaker: SourceBreaker = None, limiter: HostRateLimiter = None):
+        self.breaker = breaker or SourceBreaker()
+        self.limiter = limiter or HostRateLimiter()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.skipped = 0
+            self.probes = 0
+            self.failures = 0
+            self.throttled_seconds = 0.0
+            # 'platform:identifier' -> state after the last fetch or skip
+            self.states = {}
+
+    def call(self, platform: str, identifier: str, url: str, fetch):
+        """
+        fetch() unless the source's breaker is open, after waiting for the
+        host's rate limit. Raises CircuitOpen when skipped; failures are
+        recorded and re-raised.
+        """
+        key = f'{platform}:{identifier}'
+        try:
+            state = self.breaker.allow(platform, identifier)
+        except CircuitOpen:
+            with self._lock:
+                self.skipped += 1
+                self.states[key] = OPEN
+            raise
+        waited = self.limiter.acquire(url)
+        try:
+            result = fetch()
+        except Exception:
+            source = self.breaker.record_failure(platform, identifier)
+            with self._lock:
+                self.failures += 1
+                self.probes += state == HALF_OPEN
+                self.throttled_seconds += waited
+                state_after = self.breaker.state(source)
+                if state_after != CLOSED:
+                    self.states[key] = state_after
+            raise
+        if state != CLOSED:
+            logger.info(f'Circuit closed for {key} after a successful probe')
+        self.breaker.record_success(platform, identifier)
+        with self._lock:
+            self.probes += state == HALF_OPEN
+            self.throttled_seconds += waited
+            self.states.pop(key, None)
+        return result
+
+    def summary(self) -> dict:
+        """
+        Counts since the last reset, with the sources not left closed.
+        """
+        with self._lock:
+            return {
+                'skipped_fetches': self.skipped,
+                'failed_fetches': self.failures,
+                'probes': self.probes,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+                'breakers': dict(self.states),
+            }
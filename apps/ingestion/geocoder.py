@@ -0,0 +1,207 @@
+"""
+Offline geocoding of feed entries against a local gazetteer.
+
+The gazetteer (GAZETTEER_PATH) is a tab-separated file with a header row:
+
+    name  latitude  longitude  population  alternate_names
+
+alternate_names being comma-separated. Every name is compiled into one
+token automaton (see classifier.KeywordAutomaton), so place names are
+extracted from an entry in a single scan. Where names overlap the longest
+wins, so "Benin City" never also counts as a shorter name inside it.
+
+An entry resolves to the place mentioned most (title mentions count
+twice); ties go to the smaller population, i.e. the more specific place,
+then to the earlier mention.
+
+Resolutions are cached per entry, since feeds return the same entries on
+every fetch: in a per-process LRU, backed by the file based 'geocode'
+cache shared between processes. Cache keys include a digest of the
+gazetteer, so editing it invalidates old resolutions.
+"""
+
+import csv
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.ingestion.classifier import KeywordAutomaton, tokenize
+
+TITLE_WEIGHT = 2
+
+# Cached value for entries that name no known place
+_MISS = ''
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    latitude: float
+    longitude: float
+    population: int = 0
+
+
+class Gazetteer:
+    """
+    Place names indexed for extraction from free text.
+    """
+
+    def __init__(self, places: Iterable[Tuple[Place, Iterable[str]]]):
+        self.places = []
+        self.by_name = {}
+        patterns = []
+        for place, alternate_names in places:
+            index = len(self.places)
+            self.places.append(place)
+            self.by_name[place.name] = place
+            for name in {place.name, *alternate_names}:
+                tokens = tokenize(name)
+                if tokens:
+                    patterns.append((tokens, index))
+        self.automaton = KeywordAutomaton(patterns)
+        self.digest = hashlib.blake2b(
+            repr((self.places, sorted(patterns))).encode('utf-8'), digest_size=8,
+        ).hexdigest()
+
+    @classmethod
+    def from_file(cls, path) -> 'Gazetteer':
+        with open(path, encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f, delimiter='\t'))
+        return cls(
+            (
+                Place(
+                    name=row['name'].strip(),
+                    latitude=float(row['latitude']),
+                    longitude=float(row['longitude']),
+                    population=int(row.get('population') or 0),
+                ),
+                [n.strip() for n in (row.get('alternate_names') or '').split(',') if n.strip()],
+            )
+            for row in rows
+        )
+
+    def mentions(self, text: str) -> List[Tuple[int, Place]]:
+        """
+        (token index, place) of each place named in text, longest names
+        first where they overlap, in text order.
+        """
+        found = sorted(
+            (end - length + 1, -length, index)
+            for end, length, index in self.automaton.matches(tokenize(text))
+        )
+        mentions = []
+        covered_until = -1
+        for start, neg_length, index in found:
+            if start <= covered_until:
+                continue
+            mentions.append((start, self.places[index]))
+            covered_until = start - neg_length - 1
+        return mentions
+
+    def resolve(self, title: str, description: str = '') -> Optional[Place]:
+        """
+        The place an entry is about, or None if it names none.
+        """
+        scores = {}
+        order = 0
+        for weight, text in ((TITLE_WEIGHT, title), (1, description)):
+            for _, place in self.mentions(text):
+                score, first = scores.get(place.name, (0, order))
+                scores[place.name] = (score + weight, first)
+                order += 1
+        if not scores:
+            return None
+        best = min(
+            scores.items(),
+            key=lambda item: (-item[1][0], self.by_name[item[0]].population, item[1][1]),
+        )
+        return self.by_name[best[0]]
+
+
+class Geocoder:
+    """
+    Batch geocoder with a per-process LRU in front of the shared 'geocode'
+    cache.
+    """
+
+    def __init__(self, gazetteer: Gazetteer, lru_size: int = None, cache=None):
+        self.gazetteer = gazetteer
+        self.lru_size = lru_size or settings.GEOCODER_LRU_SIZE
+        self.cache = caches['geocode'] if cache is None else cache
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, title: str, description: str = '') -> Optional[Place]:
+        return self.resolve_batch([(title, description)])[0]
+
+    def resolve_batch(self, entries: Iterable[Tuple[str, str]]) -> List[Optional[Place]]:
+        """
+        Resolve (title, description) pairs, reading and writing the shared
+        cache with one call each for the whole batch.
+        """
+        entries = list(entries)
+        keys = [self._key(title, description) for title, description in entries]
+        entries = dict(zip(keys, entries))
+        resolved = {}
+
+        with self._lock:
+            for key in entries:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    resolved[key] = self._lru[key]
+                    self.hits += 1
+
+        pending = [key for key in entries if key not in resolved]
+        if pending:
+            for key, name in self.cache.get_many(pending).items():
+                resolved[key] = self.gazetteer.by_name.get(name) if name else None
+                self.hits += 1
+
+            computed = {}
+            for key in pending:
+                if key not in resolved:
+                    place = self.gazetteer.resolve(*entries[key])
+                    resolved[key] = place
+                    computed[key] = place.name if place else _MISS
+                    self.misses += 1
+            if computed:
+                self.cache.set_many(computed, settings.GEOCODE_CACHE_TIMEOUT)
+
+            with self._lock:
+                for key in pending:
+                    self._lru[key] = resolved[key]
+                while len(self._lru) > self.lru_size:
+                    self._lru.popitem(last=False)
+
+        return [resolved[key] for key in keys]
+
+    def _key(self, title, description):
+        digest = hashlib.blake2b(
+            f'{title}\x00{description}'.encode('utf-8'), digest_size=16
+        ).hexdigest()
+        return f'geocode:{self.gazetteer.digest}:{digest}'
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            self.hits = self.misses = 0
+
+
+@lru_cache(maxsize=None)
+def _load(path) -> Geocoder:
+    return Geocoder(Gazetteer.from_file(path))
+
+
+def get_geocoder() -> Geocoder:
+    """
+    Process-wide geocoder built from GAZETTEER_PATH.
+    """
+    return _load(str(settings.GAZETTEER_PATH))
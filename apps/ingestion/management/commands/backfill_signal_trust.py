@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.ingestion.trust_backfill import backfill_signal_trust
+
+
+class Command(BaseCommand):
+    """
+    Fill the per-signal trust score and breakdown.
+    """
+    help = 'Score stored signals with the trust rules and store their trust score and breakdown.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Signals per transaction')
+        parser.add_argument(
+            '--rescore',
+            action='store_true',
+            help='Score every signal, not only those without a score (after changing the trust rules)',
+        )
+
+    def handle(self, *args, **options):
+        result = backfill_signal_trust(
+            batch_size=options['batch_size'],
+            rescore=options['rescore'],
+            progress=lambda r: self.stdout.write(f'Scored {r.scored} signals, {r.changed} changed'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.scored} signals scored, {result.changed} changed'
+        ))
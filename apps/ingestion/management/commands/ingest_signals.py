@@ -1,6 +1,12 @@
-from django.core.management.base import BaseCommand
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 from apps.ingestion.coordinator import IngestionCoordinator
 from apps.ingestion.logger import log_ingestion_start, log_signal_stored
+from apps.ingestion.profiling import QueryExplainer, StageProfiler, write_report
+from apps.ingestion.queue import get_queue
+from apps.ingestion.workers import run_store_workers
 
 
 class Command(BaseCommand):
@@ -9,8 +15,107 @@ class Command(BaseCommand):
     """
     help = 'Run Signal Ingestion.'
 
-    def handle(self, *args, **kwargs):
-        # log_ingestion_start(run_id, source_count)
-        coordinator = IngestionCoordinator()
-        coordinator.run()
-        # log_ingestion_end(run_id)
+    def add_arguments(self, parser):
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            '--publish',
+            action='store_true',
+            help='Fetch every source and publish the signals to the work queue only',
+        )
+        mode.add_argument(
+            '--work',
+            action='store_true',
+            help='Run store workers consuming the work queue',
+        )
+        mode.add_argument(
+            '--queued',
+            action='store_true',
+            help='Publish, then store through the work queue until it is drained',
+        )
+        parser.add_argument('--workers', type=int, default=1, help='Store worker threads (default: %(default)s)')
+        parser.add_argument(
+            '--drain',
+            action='store_true',
+            help='With --work, stop once the queue is empty instead of waiting for more',
+        )
+        parser.add_argument(
+            '--profile',
+            action='store_true',
+            help='Sample the stack per pipeline stage and write folded stacks to the report',
+        )
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            help='Write EXPLAIN (ANALYZE, BUFFERS) of sampled cross-validation, dedup and insert queries to the report',
+        )
+        parser.add_argument(
+            '--explain-samples',
+            type=int,
+            default=3,
+            help='Statements explained per query kind (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--report',
+            default='ingest_report.txt',
+            help='Report file for --profile and --explain (default: %(default)s)',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        queued = options['publish'] or options['work'] or options['queued']
+        if queued and (options['profile'] or options['explain']):
+            raise CommandError('--profile and --explain apply to an inline run only')
+
+        if not queued:
+            # log_ingestion_start(run_id, source_count)
+            coordinator = IngestionCoordinator()
+            if options['profile'] or options['explain']:
+                totals = self._run_instrumented(coordinator, options)
+            else:
+                totals = coordinator.run()
+            # log_ingestion_end(run_id)
+            if totals['quarantined']:
+                self.stdout.write(self.style.WARNING(
+                    f"{totals['quarantined']} signals quarantined; see retry_quarantined"
+                ))
+            if totals['skipped_fetches'] or totals['breakers']:
+                self.stdout.write(self.style.WARNING(
+                    f"{totals['skipped_fetches']} fetches skipped; breakers not closed: "
+                    + ', '.join(f'{key} ({state})' for key, state in sorted(totals['breakers'].items()))
+                ))
+            return
+
+        queue = get_queue()
+        if options['publish'] or options['queued']:
+            published = IngestionCoordinator().publish(queue)
+            self.stdout.write(f'Published {published} batches')
+        if options['work'] or options['queued']:
+            stats = run_store_workers(
+                workers=options['workers'],
+                drain=options['drain'] or options['queued'],
+                poll_interval=settings.INGESTION_QUEUE_POLL_SECONDS,
+                queue=queue,
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Stored {stats.processed} batches ({stats.failed} failed attempts, '
+                f'{stats.exhausted} given up), {stats.quarantined} signals quarantined'
+            ))
+
+    def _run_instrumented(self, coordinator, options):
+        profiler = StageProfiler() if options['profile'] else None
+        explainer = QueryExplainer(options['explain_samples']) if options['explain'] else None
+        capture = explainer.capture() if explainer else nullcontext()
+        if profiler:
+            coordinator.profiler = profiler
+            profiler.start()
+        try:
+            with capture:
+                totals = coordinator.run()
+        finally:
+            if profiler:
+                profiler.stop()
+        write_report(options['report'], profiler=profiler, explainer=explainer, summary=totals)
+        self.stdout.write(f"Report written to {options['report']}")
+        return totals
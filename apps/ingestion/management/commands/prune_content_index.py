@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.ingestion.dedup import DeduplicationService
+
+
+class Command(BaseCommand):
+    """
+    Prune the near-duplicate content index to the dedup window.
+    """
+    help = 'Delete MinHash signatures and bands of signals older than the near-duplicate window.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.CONTENT_DEDUP_WINDOW_DAYS,
+            help='Keep signals from the last N days (default: %(default)s)',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--sleep', type=float, default=0.1, help='Seconds between batches')
+
+    def handle(self, *args, **options):
+        # Near-duplicates are searched this far back, so a shorter horizon
+        # would drop signatures that new signals still match against
+        if options['days'] < settings.CONTENT_DEDUP_WINDOW_DAYS:
+            raise CommandError(
+                f'--days must be at least CONTENT_DEDUP_WINDOW_DAYS ({settings.CONTENT_DEDUP_WINDOW_DAYS})'
+            )
+
+        before = timezone.now() - timedelta(days=options['days'])
+        pruned = DeduplicationService().prune_content_index(
+            before,
+            batch_size=options['batch_size'],
+            sleep=options['sleep'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Pruned {pruned} content index rows before {before.isoformat()}'
+        ))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from apps.ingestion.trust_recalc import recalculate_trust
+
+
+class Command(BaseCommand):
+    """
+    Recompute trust scores for all sources.
+    """
+    help = 'Recalculate every source trust score in set-based SQL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Sources per statement')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Write nothing; show how the score distribution would change',
+        )
+
+    def handle(self, *args, **options):
+        result = recalculate_trust(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            progress=lambda r: self.stdout.write(f'Scored {r.scored} sources, {r.changed} changed'),
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"{'score':>8} {'before':>8} {'after':>8} {'diff':>8}")
+            for bucket in range(0, 100, 10):
+                before = result.before[bucket]
+                after = result.after[bucket]
+                label = f'{bucket}-{bucket + 9 if bucket < 90 else 100}'
+                self.stdout.write(f'{label:>8} {before:>8} {after:>8} {after - before:>+8}')
+
+        verb = 'would change' if options['dry_run'] else 'changed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.scored} sources scored, {result.changed} {verb}'
+        ))
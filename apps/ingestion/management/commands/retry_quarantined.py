@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from apps.ingestion.coordinator import IngestionCoordinator
+from apps.ingestion.models import QuarantinedSignal
+
+
+class Command(BaseCommand):
+    """
+    Replay quarantined signals.
+    """
+    help = 'Process quarantined signals again; rows that now store are removed from the quarantine.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--adapter', help='Only replay signals of this adapter (e.g. rss)')
+        parser.add_argument('--id', type=int, action='append', dest='ids', help='Only replay this row (repeatable)')
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            help='Skip rows already attempted this many times',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        rows = QuarantinedSignal.objects.order_by('id')
+        if options['adapter']:
+            rows = rows.filter(adapter=options['adapter'])
+        if options['ids']:
+            rows = rows.filter(id__in=options['ids'])
+        if options['max_attempts']:
+            rows = rows.filter(attempts__lt=options['max_attempts'])
+
+        coordinator = IngestionCoordinator()
+        resolved = failed = 0
+        last_id = 0
+        # Rows that fail again stay, so batches advance by id
+        while True:
+            batch = list(rows.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            batch_resolved, batch_failed = coordinator.replay_quarantined(batch)
+            resolved += batch_resolved
+            failed += batch_failed
+            self.stdout.write(f'Replayed {resolved + failed} quarantined signals')
+
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(
+            f'{resolved} quarantined signals resolved, {failed} still failing'
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-19 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueueMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=50)),
+                ('payload', models.JSONField()),
+                ('attempts', models.IntegerField(default=0)),
+                ('available_at', models.DateTimeField()),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='queuemessage',
+            index=models.Index(fields=['topic', 'available_at', 'id'], name='ingestion_queue_ready'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingestion', '0001_queue_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuarantinedSignal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('adapter', models.CharField(max_length=100)),
+                ('payload', models.JSONField()),
+                ('error_type', models.CharField(max_length=200)),
+                ('error_message', models.TextField()),
+                ('traceback', models.TextField(blank=True, default='')),
+                ('attempts', models.IntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_attempt_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='quarantinedsignal',
+            index=models.Index(fields=['adapter', 'id'], name='ingestion_quarantine_adapter'),
+        ),
+    ]
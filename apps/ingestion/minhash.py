@@ -0,0 +1,96 @@
+"""
+MinHash signatures and LSH bands for near-duplicate content.
+
+Content is normalised to lowercase word tokens and split into overlapping
+word shingles. A signature holds, for each of NUM_PERM hash functions
+h(x) = (a * x + b) mod p, the minimum over the content's shingles; the
+fraction of positions where two signatures agree estimates the Jaccard
+similarity of their shingle sets.
+
+Signatures are cut into BANDS bands of ROWS values. Two signals become
+candidates when any band matches exactly, which happens with probability
+1 - (1 - s^ROWS)^BANDS for similarity s: about 0.5 at s = 0.67 and 0.99 at
+s = 0.85 with the defaults. Changing any constant here invalidates every
+stored signature (rebuild with build_content_index).
+"""
+
+import hashlib
+import re
+import zlib
+from typing import List, Optional, Set
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+SIGNATURE_DTYPE = np.dtype('<u4')
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(0x5EED)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def shingles(text: str) -> Set[str]:
+    """
+    Word shingles of normalised text. Texts shorter than one shingle
+    yield the whole text as a single shingle.
+    """
+    tokens = _TOKEN_RE.findall((text or '').lower())
+    if len(tokens) < SHINGLE_WORDS:
+        return {' '.join(tokens)} if tokens else set()
+    return {
+        ' '.join(tokens[i:i + SHINGLE_WORDS])
+        for i in range(len(tokens) - SHINGLE_WORDS + 1)
+    }
+
+
+def signature(text: str, min_shingles: int = 1) -> Optional[np.ndarray]:
+    """
+    MinHash signature of text, or None when it has fewer than
+    min_shingles shingles (too short to compare meaningfully).
+    """
+    parts = shingles(text)
+    if len(parts) < max(min_shingles, 1):
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(part.encode('utf-8')) for part in parts),
+        dtype=np.uint64,
+        count=len(parts),
+    ) % np.uint64(_PRIME)
+    # (shingles x permutations); products stay below 2**62
+    permuted = (hashes[:, None] * _A[None, :] + _B[None, :]) % np.uint64(_PRIME)
+    return permuted.min(axis=0).astype(SIGNATURE_DTYPE)
+
+
+def band_hashes(sig: np.ndarray, namespace: str = '') -> List[int]:
+    """
+    One signed 64-bit hash per band. namespace (the signal type) keeps
+    bands of different types apart.
+    """
+    prefix = namespace.encode('utf-8') + b'\x00'
+    hashes = []
+    for band in range(BANDS):
+        chunk = sig[band * ROWS:(band + 1) * ROWS].tobytes()
+        digest = hashlib.blake2b(prefix + bytes([band]) + chunk, digest_size=8).digest()
+        hashes.append(int.from_bytes(digest, 'big', signed=True))
+    return hashes
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Estimated Jaccard similarity of two signatures.
+    """
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+def to_bytes(sig: np.ndarray) -> bytes:
+    return sig.astype(SIGNATURE_DTYPE).tobytes()
+
+
+def from_bytes(value) -> np.ndarray:
+    return np.frombuffer(bytes(value), dtype=SIGNATURE_DTYPE)
@@ -1,3 +1,49 @@
 from django.db import models
 
 # Create your models here.
+
+
+class QueueMessage(models.Model):
+    """
+    A message of the Postgres-table ingestion queue (see queue.PostgresQueue).
+    """
+    topic = models.CharField(max_length=50)
+    payload = models.JSONField()
+    attempts = models.IntegerField(default=0)
+    # Claiming a message pushes this past the visibility timeout, so a
+    # message whose worker died is redelivered once it passes
+    available_at = models.DateTimeField()
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['topic', 'available_at', 'id'], name='ingestion_queue_ready'),
+        ]
+
+    def __str__(self):
+        return f'{self.topic} #{self.id} (attempt {self.attempts})'
+
+
+class QuarantinedSignal(models.Model):
+    """
+    A fetched signal that failed to store, kept with its error until it is
+    replayed (see quarantine.py and the retry_quarantined command).
+    """
+    adapter = models.CharField(max_length=100)
+    # The raw signal, encoded as for the work queue
+    payload = models.JSONField()
+    error_type = models.CharField(max_length=200)
+    error_message = models.TextField()
+    traceback = models.TextField(blank=True, default='')
+    attempts = models.IntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_attempt_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['adapter', 'id'], name='ingestion_quarantine_adapter'),
+        ]
+
+    def __str__(self):
+        return f'{self.adapter} #{self.id}: {self.error_type}'
@@ -0,0 +1,223 @@
+"""
+Profiling and query plan capture for ingest_signals --profile / --explain.
+
+StageProfiler samples the stack of the ingesting thread every
+INGESTION_PROFILE_INTERVAL seconds from a background thread and files
+each sample under the coordinator stage running at the time (fetch,
+normalize, score, store, after_store, quarantine). Samples are kept as
+folded stacks, the input format of flamegraph.pl, speedscope and
+inferno, rooted at the stage name. Sampling wall-clock time means time
+spent waiting (on the network, the database or the rate limiter) shows
+up as well.
+
+QueryExplainer wraps the database connection and, for the first few
+cross-validation, dedup lookup and signal insert statements, runs
+EXPLAIN (ANALYZE, BUFFERS) on them just before they execute, inside a
+savepoint that is rolled back, so the plan reflects the data the
+statement actually ran against and explaining an INSERT stores nothing.
+Insert plans include the time of the dedup key trigger.
+
+write_report puts both in one text file. Every line except the folded
+stacks starts with '#', so
+
+    grep -v '^#' report.txt | flamegraph.pl > profile.svg
+
+draws the flame graph, and two reports diff line by line.
+"""
+
+import os
+import re
+import sys
+import threading
+import time as time_module
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+# Samples taken while no stage is running
+NO_STAGE = 'other'
+
+# Statement kinds explained, matched in order
+QUERY_KINDS = (
+    ('insert', re.compile(r'^\s*INSERT INTO "signals_signal"\s', re.IGNORECASE)),
+    ('dedup', re.compile(r'^\s*SELECT\b.*"signals_signal(dedupkey|contentband)"', re.IGNORECASE | re.DOTALL)),
+    ('cross_validation', re.compile(r'^\s*SELECT\b.*\bsignals_signal\b.*ST_D', re.IGNORECASE | re.DOTALL)),
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = os.sep.join(code.co_filename.split(os.sep)[-2:])
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'
+
+
+class StageProfiler:
+    """
+    Sampling profiler attributing samples to coordinator stages.
+    """
+
+    def __init__(self, interval: float = None):
+        self.interval = interval or settings.INGESTION_PROFILE_INTERVAL
+        self.samples = Counter()
+        self.wall = defaultdict(float)
+        self.calls = Counter()
+        self._stages = []
+        self._thread_id = None
+        self._sampler = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """
+        Start sampling the calling thread.
+        """
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name='stage-profiler', daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    @contextmanager
+    def stage(self, name: str):
+        self._stages.append(name)
+        started = time_module.perf_counter()
+        try:
+            yield
+        finally:
+            self.wall[name] += time_module.perf_counter() - started
+            self.calls[name] += 1
+            self._stages.pop()
+
+    def sample(self):
+        """
+        Record one sample of the profiled thread's stack.
+        """
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return
+        stage = self._stages[-1] if self._stages else NO_STAGE
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        stack.append(stage)
+        self.samples[';'.join(reversed(stack))] += 1
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def folded(self):
+        """
+        Folded stack lines, sorted so reports diff cleanly.
+        """
+        return [f'{stack} {count}' for stack, count in sorted(self.samples.items())]
+
+    def stage_samples(self):
+        counts = Counter()
+        for stack, count in self.samples.items():
+            counts[stack.split(';', 1)[0]] += count
+        return counts
+
+
+class QueryExplainer:
+    """
+    Connection execute wrapper recording plans of sampled statements.
+    """
+
+    def __init__(self, samples: int = 3):
+        self.samples = samples
+        # kind -> [(sql, params, plan lines)]
+        self.plans = defaultdict(list)
+        self.seen = Counter()
+        self._explaining = threading.local()
+
+    @staticmethod
+    def kind_of(sql: str):
+        for kind, pattern in QUERY_KINDS:
+            if pattern.search(sql):
+                return kind
+        return None
+
+    @contextmanager
+    def capture(self, using=connection):
+        with using.execute_wrapper(self):
+            yield self
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and not getattr(self._explaining, 'active', False):
+            kind = self.kind_of(sql)
+            if kind is not None:
+                self.seen[kind] += 1
+                if len(self.plans[kind]) < self.samples:
+                    self._explain(kind, sql, params, context['cursor'])
+        return execute(sql, params, many, context)
+
+    def _explain(self, kind, sql, params, cursor):
+        self._explaining.active = True
+        try:
+            with transaction.atomic():
+                try:
+                    cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {sql}', params)
+                    plan = [row[0] for row in cursor.fetchall()]
+                except DatabaseError as e:
+                    plan = [f'EXPLAIN failed: {type(e).__name__}: {str(e).strip()}']
+                # Undo whatever ANALYZE executed
+                transaction.set_rollback(True)
+        finally:
+            self._explaining.active = False
+        self.plans[kind].append((sql, params, plan))
+
+
+def _comment(lines):
+    return [f'# {line}'.rstrip() for line in lines]
+
+
+def write_report(path, profiler: StageProfiler = None, explainer: QueryExplainer = None, summary: dict = None):
+    """
+    Write the profile and plans to one text file.
+    """
+    lines = [f'# ingest_signals report, {timezone.now().isoformat(timespec="seconds")}']
+    if summary:
+        lines.append('#')
+        lines.append('# Summary')
+        lines.extend(_comment(f'  {key}: {summary[key]}' for key in sorted(summary)))
+
+    if profiler is not None:
+        stage_samples = profiler.stage_samples()
+        lines.append('#')
+        lines.append(f'# Stages (sampled every {profiler.interval * 1000:g} ms)')
+        lines.append(f'#   {"stage":<14}{"calls":>8}{"wall s":>12}{"samples":>10}')
+        for stage in sorted(set(profiler.wall) | set(stage_samples)):
+            lines.append(
+                f'#   {stage:<14}{profiler.calls[stage]:>8}'
+                f'{profiler.wall[stage]:>12.3f}{stage_samples[stage]:>10}'
+            )
+
+    if explainer is not None:
+        for kind, _ in QUERY_KINDS:
+            lines.append('#')
+            lines.append(
+                f'# EXPLAIN (ANALYZE, BUFFERS): {kind}, '
+                f'{len(explainer.plans[kind])} of {explainer.seen[kind]} statements'
+            )
+            for sql, params, plan in explainer.plans[kind]:
+                lines.append('#')
+                lines.extend(_comment(f'  {line}' for line in sql.strip().splitlines()))
+                lines.append(f'#   params: {params!r}'[:2000])
+                lines.extend(_comment(f'    {line}' for line in plan))
+
+    if profiler is not None:
+        lines.append('#')
+        lines.append('# Folded stacks (stage;frame;... samples)')
+        lines.extend(profiler.folded())
+
+    with open(path, 'w', encoding='utf-8') as report:
+        report.write('\n'.join(lines) + '\n')
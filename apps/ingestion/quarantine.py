@@ -0,0 +1,125 @@
+"""
+Dead-letter quarantine for signals that fail to store.
+
+A signal whose processing raises anything but a duplicate is written to
+QuarantinedSignal with its raw payload and the error, and the rest of its
+batch carries on. Once the cause is fixed, retry_quarantined replays the
+rows: those that now store (or turn out to be duplicates) are deleted,
+the others keep their latest error and attempt count.
+
+Queued batches that used up their delivery attempts are dead-lettered the
+same way, one row per signal, by quarantine_exhausted.
+"""
+
+import logging
+import traceback as traceback_module
+from typing import Iterable, List, Tuple
+
+from django.utils import timezone
+
+from apps.ingestion.models import QuarantinedSignal
+from apps.ingestion.queue import encode_raw_signal
+
+logger = logging.getLogger(__name__)
+
+# Longest traceback kept per row
+MAX_TRACEBACK = 10000
+
+
+def encode_payload(signal) -> dict:
+    """
+    The signal encoded for replay, or its repr when it cannot be encoded
+    (such a row cannot be replayed, but keeps the evidence).
+    """
+    try:
+        return encode_raw_signal(signal)
+    except Exception:
+        return {'unencodable': repr(signal)}
+
+
+def _error_fields(error: BaseException) -> dict:
+    return {
+        'error_type': type(error).__name__,
+        'error_message': str(error),
+        'traceback': ''.join(
+            traceback_module.format_exception(type(error), error, error.__traceback__)
+        )[-MAX_TRACEBACK:],
+    }
+
+
+def quarantine_signals(adapter_name: str, failures: Iterable[Tuple[object, BaseException]]) -> int:
+    """
+    Store (raw signal, error) pairs that failed for an adapter.
+    Returns the number quarantined.
+    """
+    now = timezone.now()
+    rows = [
+        QuarantinedSignal(
+            adapter=adapter_name,
+            payload=encode_payload(signal),
+            last_attempt_at=now,
+            **_error_fields(error),
+        )
+        for signal, error in failures
+    ]
+    QuarantinedSignal.objects.bulk_create(rows)
+    if rows:
+        logger.warning(
+            f"[{adapter_name}] Quarantined {len(rows)} signals",
+            extra={'adapter': adapter_name, 'quarantined': len(rows)},
+        )
+    return len(rows)
+
+
+def quarantine_exhausted(messages) -> int:
+    """
+    Store the signals of queued batches that used up their delivery
+    attempts, with the batch's last error. Returns the number quarantined.
+    """
+    now = timezone.now()
+    rows = []
+    for message in messages:
+        if message.last_error:
+            # Workers release failed batches with 'ErrorType: message'
+            error_type, _, error_message = message.last_error.partition(': ')
+        else:
+            # Its workers died or timed out without releasing it
+            error_type = 'AttemptsExhausted'
+            error_message = f"Queued batch {message.id} was not acknowledged after {message.attempts} attempts"
+        rows.extend(
+            QuarantinedSignal(
+                adapter=message.payload.get('adapter', ''),
+                payload=data,
+                error_type=error_type[:200],
+                error_message=error_message,
+                attempts=message.attempts,
+                last_attempt_at=now,
+            )
+            for data in message.payload.get('signals', ())
+        )
+    QuarantinedSignal.objects.bulk_create(rows)
+    if messages:
+        logger.warning(
+            f"Quarantined {len(rows)} signals of {len(messages)} exhausted queued batches",
+            extra={'batches': len(messages), 'quarantined': len(rows)},
+        )
+    return len(rows)
+
+
+def record_replay(resolved: List[QuarantinedSignal], failed: List[Tuple[QuarantinedSignal, BaseException]]):
+    """
+    Delete the rows a replay stored and record the new error of the rest.
+    """
+    if resolved:
+        QuarantinedSignal.objects.filter(id__in=[row.id for row in resolved]).delete()
+    if failed:
+        now = timezone.now()
+        for row, error in failed:
+            for field, value in _error_fields(error).items():
+                setattr(row, field, value)
+            row.attempts += 1
+            row.last_attempt_at = now
+        QuarantinedSignal.objects.bulk_update(
+            [row for row, _ in failed],
+            ['error_type', 'error_message', 'traceback', 'attempts', 'last_attempt_at'],
+        )
@@ -0,0 +1,299 @@
+"""
+Work queue between signal fetchers and store workers.
+
+Fetchers publish batches of raw signals; store workers consume them,
+acknowledging each batch once it is stored. Delivery is at least once: a
+batch that is not acknowledged within INGESTION_QUEUE_VISIBILITY_SECONDS
+(its worker died or failed) is delivered again, up to
+INGESTION_QUEUE_MAX_ATTEMPTS times. Storing a redelivered batch is safe
+because signals already stored are rejected as duplicates by dedup_hash.
+A batch that used up its attempts is no longer delivered; take_exhausted
+removes it so the store workers can move its signals into quarantine.
+
+Backends (INGESTION_QUEUE_BACKEND):
+    PostgresQueue   the ingestion_queuemessage table, claimed with
+                    FOR UPDATE SKIP LOCKED so workers in any number of
+                    processes never take the same message
+    InProcessQueue  memory only, for fetchers and workers sharing one
+                    process; messages are lost with it
+"""
+
+import json
+import threading
+import time as time_module
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.ingestion.models import QueueMessage
+from apps.ingestion.types import RawSignal, SignalType
+
+RAW_SIGNALS_TOPIC = 'raw_signals'
+
+
+@dataclass
+class Message:
+    id: object
+    payload: dict
+    attempts: int
+    last_error: str = ''
+
+
+def encode_raw_signal(raw: RawSignal) -> dict:
+    return {
+        'title': raw.title,
+        'description': raw.description,
+        'signal_type': getattr(raw.signal_type, 'value', raw.signal_type),
+        'link': raw.link,
+        'published': raw.published.isoformat() if raw.published else None,
+        'source_name': raw.source_name,
+        'location': [raw.location.x, raw.location.y] if raw.location is not None else None,
+        'has_photo': raw.has_photo,
+        'has_video': raw.has_video,
+        'type_confidence': raw.type_confidence,
+        'place': raw.place,
+    }
+
+
+def decode_raw_signal(data: dict) -> RawSignal:
+    return RawSignal(
+        title=data['title'],
+        description=data['description'],
+        signal_type=SignalType(data['signal_type']) if data['signal_type'] else None,
+        link=data['link'],
+        published=datetime.fromisoformat(data['published']) if data['published'] else None,
+        source_name=data['source_name'],
+        location=Point(*data['location'], srid=4326) if data['location'] else None,
+        has_photo=data['has_photo'],
+        has_video=data['has_video'],
+        type_confidence=data.get('type_confidence'),
+        place=data.get('place'),
+    )
+
+
+class BaseQueue:
+    """
+    Queue interface shared by the backends.
+    """
+
+    def __init__(self, visibility: float = None, max_attempts: int = None):
+        self.visibility = settings.INGESTION_QUEUE_VISIBILITY_SECONDS if visibility is None else visibility
+        self.max_attempts = max_attempts or settings.INGESTION_QUEUE_MAX_ATTEMPTS
+
+    def publish(self, topic: str, payloads: List[dict]) -> int:
+        raise NotImplementedError
+
+    def consume(self, topic: str, max_messages: int = 1) -> List[Message]:
+        """
+        Claim up to max_messages ready messages. They are hidden from
+        other consumers until acknowledged, released, or their visibility
+        timeout passes.
+        """
+        raise NotImplementedError
+
+    def ack(self, messages: List[Message]):
+        raise NotImplementedError
+
+    def release(self, message: Message, error: str = '', delay: float = 0):
+        """
+        Give a message back for redelivery after delay seconds.
+        """
+        raise NotImplementedError
+
+    def take_exhausted(self, topic: str, max_messages: int = 100) -> List[Message]:
+        """
+        Remove and return up to max_messages messages that used up
+        max_attempts and are no longer in flight, for the caller to
+        dead-letter.
+        """
+        raise NotImplementedError
+
+    def pending(self, topic: str) -> int:
+        """
+        Messages in flight, or waiting and still deliverable.
+        """
+        raise NotImplementedError
+
+
+class PostgresQueue(BaseQueue):
+    """
+    Queue stored in the ingestion_queuemessage table.
+    """
+
+    CLAIM_SQL = """
+        UPDATE ingestion_queuemessage m
+        SET available_at = now() + %(visibility)s, attempts = m.attempts + 1
+        WHERE m.id IN (
+            SELECT id FROM ingestion_queuemessage
+            WHERE topic = %(topic)s AND available_at <= now() AND attempts < %(max_attempts)s
+            ORDER BY available_at, id
+            LIMIT %(limit)s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING m.id, m.payload, m.attempts
+    """
+
+    EXHAUSTED_SQL = """
+        DELETE FROM ingestion_queuemessage
+        WHERE id IN (
+            SELECT id FROM ingestion_queuemessage
+            WHERE topic = %(topic)s AND available_at <= now() AND attempts >= %(max_attempts)s
+            ORDER BY id
+            LIMIT %(limit)s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, payload, attempts, last_error
+    """
+
+    def publish(self, topic, payloads):
+        now = timezone.now()
+        QueueMessage.objects.bulk_create([
+            QueueMessage(topic=topic, payload=payload, available_at=now)
+            for payload in payloads
+        ])
+        return len(payloads)
+
+    def consume(self, topic, max_messages=1):
+        with connection.cursor() as cursor:
+            cursor.execute(self.CLAIM_SQL, {
+                'visibility': timedelta(seconds=self.visibility),
+                'topic': topic,
+                'max_attempts': self.max_attempts,
+                'limit': max_messages,
+            })
+            rows = cursor.fetchall()
+        return self._messages(rows)
+
+    def take_exhausted(self, topic, max_messages=100):
+        with connection.cursor() as cursor:
+            cursor.execute(self.EXHAUSTED_SQL, {
+                'topic': topic,
+                'max_attempts': self.max_attempts,
+                'limit': max_messages,
+            })
+            rows = cursor.fetchall()
+        return self._messages(rows)
+
+    @staticmethod
+    def _messages(rows):
+        messages = []
+        for message_id, payload, *rest in sorted(rows):
+            # Django leaves jsonb undecoded on raw cursors
+            if isinstance(payload, str):
+                payload = json.loads(payload)
+            messages.append(Message(message_id, payload, *rest))
+        return messages
+
+    def ack(self, messages):
+        QueueMessage.objects.filter(id__in=[m.id for m in messages]).delete()
+
+    def release(self, message, error='', delay=0):
+        QueueMessage.objects.filter(id=message.id).update(
+            available_at=timezone.now() + timedelta(seconds=delay),
+            last_error=error[:2000],
+        )
+
+    def pending(self, topic):
+        # A message on its last attempt is still in flight until its
+        # visibility timeout passes
+        return QueueMessage.objects.filter(
+            Q(attempts__lt=self.max_attempts) | Q(available_at__gt=timezone.now()),
+            topic=topic,
+        ).count()
+
+
+class InProcessQueue(BaseQueue):
+    """
+    Thread-safe in-memory queue for a single process.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._ready = {}
+        # message id -> (topic, Message, visible again at)
+        self._in_flight = {}
+        self._ids = iter(range(1, 1 << 62))
+
+    def publish(self, topic, payloads):
+        with self._lock:
+            ready = self._ready.setdefault(topic, deque())
+            for payload in payloads:
+                ready.append((Message(next(self._ids), payload, 0), 0.0))
+        return len(payloads)
+
+    def consume(self, topic, max_messages=1):
+        now = time_module.monotonic()
+        claimed = []
+        with self._lock:
+            self._expire(now)
+            ready = self._ready.get(topic, deque())
+            skipped = []
+            while ready and len(claimed) < max_messages:
+                message, available_at = ready.popleft()
+                # Exhausted messages stay until take_exhausted removes them
+                if message.attempts >= self.max_attempts or available_at > now:
+                    skipped.append((message, available_at))
+                    continue
+                message.attempts += 1
+                self._in_flight[message.id] = (topic, message, now + self.visibility)
+                claimed.append(message)
+            ready.extendleft(reversed(skipped))
+        return claimed
+
+    def _expire(self, now):
+        for message_id, (topic, message, visible_at) in list(self._in_flight.items()):
+            if visible_at <= now:
+                del self._in_flight[message_id]
+                self._ready.setdefault(topic, deque()).append((message, 0.0))
+
+    def ack(self, messages):
+        with self._lock:
+            for message in messages:
+                self._in_flight.pop(message.id, None)
+
+    def release(self, message, error='', delay=0):
+        with self._lock:
+            entry = self._in_flight.pop(message.id, None)
+            if entry is not None:
+                message.last_error = error[:2000]
+                self._ready.setdefault(entry[0], deque()).append(
+                    (message, time_module.monotonic() + delay)
+                )
+
+    def take_exhausted(self, topic, max_messages=100):
+        with self._lock:
+            self._expire(time_module.monotonic())
+            exhausted, kept = [], deque()
+            for message, available_at in self._ready.get(topic, ()):
+                if message.attempts >= self.max_attempts and len(exhausted) < max_messages:
+                    exhausted.append(message)
+                else:
+                    kept.append((message, available_at))
+            self._ready[topic] = kept
+        return exhausted
+
+    def pending(self, topic):
+        with self._lock:
+            ready = sum(
+                1 for message, _ in self._ready.get(topic, ()) if message.attempts < self.max_attempts
+            )
+            in_flight = sum(1 for t, _, _ in self._in_flight.values() if t == topic)
+        return ready + in_flight
+
+
+@lru_cache(maxsize=None)
+def get_queue() -> BaseQueue:
+    """
+    The process-wide queue of the configured backend.
+    """
+    return import_string(settings.INGESTION_QUEUE_BACKEND)()
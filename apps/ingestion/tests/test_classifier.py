@@ -0,0 +1,142 @@
+import json
+import random
+import tempfile
+
+from django.test import SimpleTestCase
+
+from apps.ingestion.classifier import KeywordAutomaton, KeywordClassifier, get_classifier, tokenize
+from apps.ingestion.types import SignalType
+
+RULES = {
+    'title_weight': 2.0,
+    'confidence_scale': 3.0,
+    'negation_window': 3,
+    'negations': ['no', 'false alarm'],
+    'types': {
+        'robbery': {'robbery': 3, 'armed robbery': 2, 'stolen': 1},
+        'vehicle_theft': {'stolen car': 4, 'car': 0.5},
+        'assault': {'stabbed': 3, 'attack': 1},
+    },
+}
+
+
+class KeywordAutomatonTestCase(SimpleTestCase):
+    """
+    Test case for the token Aho-Corasick automaton.
+    """
+
+    def test_matches_agree_with_brute_force(self):
+        """
+        Test that the automaton reports every occurrence of every pattern, including overlaps.
+        """
+        rng = random.Random(7)
+        vocabulary = ['a', 'b', 'c', 'd']
+        patterns = {tuple(rng.choices(vocabulary, k=rng.randint(1, 4))) for _ in range(30)}
+        automaton = KeywordAutomaton((p, p) for p in patterns)
+
+        for _ in range(200):
+            tokens = rng.choices(vocabulary, k=rng.randint(0, 20))
+            expected = sorted(
+                (i + len(p) - 1, len(p), p)
+                for p in patterns
+                for i in range(len(tokens) - len(p) + 1)
+                if tuple(tokens[i:i + len(p)]) == p
+            )
+            self.assertEqual(sorted(automaton.matches(tokens)), expected)
+
+    def test_matches_whole_words_only(self):
+        """
+        Test that patterns do not match inside longer words.
+        """
+        automaton = KeywordAutomaton([(('rob',), 'rob')])
+        self.assertEqual(list(automaton.matches(tokenize('Robbery on Robson street'))), [])
+        self.assertEqual(len(list(automaton.matches(tokenize('They tried to ROB him')))), 1)
+
+
+class KeywordClassifierTestCase(SimpleTestCase):
+    """
+    Test case for the KeywordClassifier class.
+    """
+
+    def setUp(self):
+        self.classifier = KeywordClassifier(RULES)
+
+    def test_classify_picks_best_type(self):
+        """
+        Test that the highest scoring type wins with a confidence from its margin.
+        """
+        result = self.classifier.classify('Stolen car recovered', 'Police found the stolen car downtown')
+        self.assertEqual(result.signal_type, SignalType.VEHICLE_THEFT)
+        self.assertGreater(result.confidence, 0.5)
+        self.assertLessEqual(result.confidence, 1.0)
+
+    def test_title_matches_weigh_more(self):
+        """
+        Test that a title keyword outweighs an equal description keyword.
+        """
+        result = self.classifier.classify('Man stabbed', 'after a robbery')
+        self.assertEqual(result.signal_type, SignalType.ASSAULT)
+        self.assertEqual(self.classifier.scores('Man stabbed', 'after a robbery'), [3.0, 0.0, 6.0])
+
+    def test_negation_cancels_following_keywords(self):
+        """
+        Test that keywords shortly after a negation cue are ignored.
+        """
+        self.assertEqual(self.classifier.scores('', 'no robbery took place'), [0.0, 0.0, 0.0])
+        self.assertEqual(self.classifier.scores('', 'false alarm, not a robbery'), [0.0, 0.0, 0.0])
+        # Outside the window the keyword counts again
+        self.assertEqual(
+            self.classifier.scores('', 'no one saw the armed robbery'),
+            [5.0, 0.0, 0.0],
+        )
+
+    def test_unmatched_text_is_other(self):
+        """
+        Test that text without keywords is OTHER with zero confidence.
+        """
+        result = self.classifier.classify('Weather update', 'Sunny all week')
+        self.assertEqual(result.signal_type, SignalType.OTHER)
+        self.assertEqual(result.confidence, 0.0)
+
+    def test_tie_has_zero_confidence(self):
+        """
+        Test that equally scored types give zero confidence.
+        """
+        result = self.classifier.classify('', 'robbery then stabbed')
+        self.assertEqual(result.confidence, 0.0)
+
+    def test_classify_batch(self):
+        """
+        Test that batch classification matches one-by-one classification.
+        """
+        entries = [
+            ('Armed robbery at bank', ''),
+            ('Weather update', 'Sunny'),
+            ('Armed robbery at bank', ''),
+            ('Car', 'stolen car'),
+        ]
+        self.assertEqual(
+            self.classifier.classify_batch(entries),
+            [self.classifier.classify(*entry) for entry in entries],
+        )
+
+    def test_unknown_type_is_rejected(self):
+        """
+        Test that rules naming an unknown signal type raise ValueError.
+        """
+        with self.assertRaises(ValueError):
+            KeywordClassifier({'types': {'arson': {'fire': 1}}})
+
+    def test_from_file(self):
+        """
+        Test that rules load from a JSON file, including the shipped defaults.
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(RULES, f)
+            f.flush()
+            classifier = KeywordClassifier.from_file(f.name)
+        self.assertEqual(classifier.classify('Robbery', '').signal_type, SignalType.ROBBERY)
+        self.assertEqual(
+            get_classifier().classify('Two men robbed a shop at gunpoint', '').signal_type,
+            SignalType.ROBBERY,
+        )
@@ -0,0 +1,37 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.ingestion.coordinator import IngestionCoordinator
+from apps.ingestion.tests.test_quarantine import FlakyAdapter, raw_signal
+from apps.signals.models import Incident, Signal
+
+
+class IncidentIndexingTestCase(TestCase):
+    """
+    Test case for indexing incidents of stored signals.
+    """
+    def setUp(self):
+        self.adapter = FlakyAdapter([raw_signal('first', 10)])
+        self.coordinator = IngestionCoordinator(adapters=[self.adapter])
+
+    def test_committed_incident_is_indexed(self):
+        """
+        Test that the incident of a stored signal is indexed once its transaction commits.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.coordinator._process_signals(self.adapter, self.adapter.signals, quarantine=False)
+        self.assertEqual(Signal.objects.count(), 1)
+        self.assertEqual(len(self.coordinator.incident_clusterer.index), 1)
+
+    def test_rolled_back_incident_is_not_indexed(self):
+        """
+        Test that an incident whose signal fails to store is neither kept nor indexed.
+        """
+        with mock.patch('apps.ingestion.coordinator.increment_rollups', side_effect=RuntimeError('rollups')):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                summary = self.coordinator._process_signals(self.adapter, self.adapter.signals, quarantine=False)
+        self.assertEqual(len(summary['failures']), 1)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(Incident.objects.count(), 0)
+        self.assertEqual(len(self.coordinator.incident_clusterer.index), 0)
@@ -1,9 +1,13 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 from django.utils import timezone
 from django.contrib.gis.geos import Point
 from apps.ingestion.dedup import DeduplicationService
 from apps.ingestion.types import NormalizedSignal, SignalType
-from apps.signals.models import Signal
+from apps.signals.models import Signal, SignalContentBand, SignalContentSignature
 from apps.sources.models import Source
 
 
@@ -71,3 +75,93 @@ class DeduplicationServiceTestCase(TestCase):
         hash1 = self.service.compute_hash(self.signal_data, self.source)
         hash2 = self.service.compute_hash(self.signal_data, self.source)
         self.assertEqual(hash1, hash2)
+
+    def _store_indexed(self, content, signal_type=SignalType.ROBBERY, occurred_at=None):
+        occurred_at = occurred_at or self.now
+        signature = self.service.content_signature(content)
+        original_id = self.service.find_near_duplicate(signal_type, signature, occurred_at)
+        signal = Signal.objects.create(
+            content=content,
+            signal_type=signal_type.value,
+            location=self.location,
+            occurred_at=occurred_at,
+            source=self.source,
+            near_duplicate_of=original_id,
+        )
+        self.service.index_content(signal, signature, original_id)
+        return signal
+
+    def test_find_near_duplicate(self):
+        """
+        Test that reworded content of the same type links to the original signal.
+        """
+        original = self._store_indexed(
+            'Armed robbery reported at the corner of Main Street and Fifth Avenue, '
+            'two suspects fled on foot towards the central station'
+        )
+        repeat = self._store_indexed(
+            'Armed robbery reported at the corner of Main Street and Fifth Avenue, '
+            'two suspects fled on foot towards the central bus station'
+        )
+        self.assertIsNone(original.near_duplicate_of)
+        self.assertEqual(repeat.near_duplicate_of, original.id)
+
+        # A third copy links to the first signal, not to the repeat
+        third = self._store_indexed(
+            'Armed robbery reported at the corner of Main Street and Fifth Avenue, '
+            'two suspects fled on foot towards the central station'
+        )
+        self.assertEqual(third.near_duplicate_of, original.id)
+
+    def test_find_near_duplicate_ignores_other_types_and_times(self):
+        """
+        Test that content of another type or outside the window is not linked.
+        """
+        content = (
+            'Armed robbery reported at the corner of Main Street and Fifth Avenue, '
+            'two suspects fled on foot towards the central station'
+        )
+        self._store_indexed(content)
+        signature = self.service.content_signature(content)
+
+        self.assertIsNone(self.service.find_near_duplicate(SignalType.ASSAULT, signature, self.now))
+        later = self.now + timedelta(days=30)
+        self.assertIsNone(self.service.find_near_duplicate(SignalType.ROBBERY, signature, later))
+
+    def test_prune_content_index(self):
+        """
+        Test that signatures and bands older than the cutoff are deleted and newer ones kept.
+        """
+        content = (
+            'Armed robbery reported at the corner of Main Street and Fifth Avenue, '
+            'two suspects fled on foot towards the central station'
+        )
+        old = self._store_indexed(content, occurred_at=self.now - timedelta(days=30))
+        recent = self._store_indexed(content)
+
+        deleted = self.service.prune_content_index(self.now - timedelta(days=7), batch_size=3, sleep=0)
+
+        self.assertEqual(deleted, SignalContentBand.objects.count() + 1)
+        self.assertEqual(list(SignalContentSignature.objects.values_list('signal_id', flat=True)), [recent.id])
+        self.assertFalse(SignalContentBand.objects.filter(signal_id=old.id).exists())
+        self.assertTrue(SignalContentBand.objects.filter(signal_id=recent.id).exists())
+
+    def test_prune_content_index_command(self):
+        """
+        Test that the prune command keeps the dedup window and refuses a shorter one.
+        """
+        content = (
+            'Armed robbery reported at the corner of Main Street and Fifth Avenue, '
+            'two suspects fled on foot towards the central station'
+        )
+        old = self._store_indexed(content, occurred_at=self.now - timedelta(days=30))
+        recent = self._store_indexed(content, occurred_at=self.now - timedelta(days=1))
+
+        with self.assertRaises(CommandError):
+            call_command('prune_content_index', '--days', '0', stdout=StringIO())
+        self.assertTrue(SignalContentSignature.objects.filter(signal_id=old.id).exists())
+
+        call_command('prune_content_index', '--sleep', '0', stdout=StringIO())
+
+        self.assertEqual(list(SignalContentSignature.objects.values_list('signal_id', flat=True)), [recent.id])
+        self.assertFalse(SignalContentBand.objects.filter(signal_id=old.id).exists())
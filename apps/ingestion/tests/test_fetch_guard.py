@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.ingestion.fetch_guard import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitOpen,
+    FetchGuard,
+    HostRateLimiter,
+    SourceBreaker,
+    TokenBucket,
+)
+from apps.sources.models import Source
+
+FEED = 'https://news.example.com/feed.xml'
+
+
+class RateLimitTestCase(SimpleTestCase):
+    """
+    Test case for the per-host token buckets.
+    """
+
+    def test_bucket_allows_burst_then_spaces_reservations(self):
+        """
+        Test that a bucket hands out its burst at once and then one token per 1/rate seconds.
+        """
+        bucket = TokenBucket(rate=2.0, capacity=2)
+        now = bucket.updated
+        waits = [bucket.reserve(now) for _ in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.5)
+        self.assertAlmostEqual(waits[3], 1.0)
+        self.assertEqual(bucket.reserve(now + 10), 0.0)
+
+    def test_hosts_have_separate_buckets(self):
+        """
+        Test that fetches from one host wait while another host is unaffected.
+        """
+        slept = []
+        limiter = HostRateLimiter(rate=1.0, burst=1, sleep=slept.append)
+        limiter.acquire(FEED)
+        self.assertGreater(limiter.acquire('https://NEWS.example.com/other.xml'), 0)
+        self.assertEqual(limiter.acquire('https://elsewhere.example.org/feed'), 0.0)
+        self.assertEqual(len(slept), 1)
+
+
+class SourceBreakerStateTestCase(SimpleTestCase):
+    """
+    Test case for the breaker schedule and states.
+    """
+
+    def test_delay_doubles_up_to_the_maximum(self):
+        """
+        Test that the probe delay doubles with each failure past the threshold and is capped.
+        """
+        breaker = SourceBreaker(threshold=3, base_seconds=60, max_seconds=300)
+        self.assertEqual(
+            [breaker.delay(n).total_seconds() for n in (3, 4, 5, 6, 50)],
+            [60, 120, 240, 300, 300],
+        )
+
+    def test_state_follows_errors_and_retry_time(self):
+        """
+        Test that a source is closed below the threshold, open before its retry time and half-open after.
+        """
+        breaker = SourceBreaker(threshold=3, base_seconds=60, max_seconds=300)
+        now = timezone.now()
+        self.assertEqual(breaker.state(None, now), CLOSED)
+        self.assertEqual(breaker.state(Source(consecutive_errors=2), now), CLOSED)
+        source = Source(consecutive_errors=3, breaker_retry_at=now + timedelta(seconds=1))
+        self.assertEqual(breaker.state(source, now), OPEN)
+        self.assertEqual(breaker.state(source, now + timedelta(seconds=2)), HALF_OPEN)
+
+
+class FetchGuardTestCase(TestCase):
+    """
+    Test case for breaking fetches from failing sources.
+    """
+    def setUp(self):
+        self.guard = FetchGuard(
+            breaker=SourceBreaker(threshold=2, base_seconds=60, max_seconds=600),
+            limiter=HostRateLimiter(rate=1000, burst=1000),
+        )
+
+    def fail(self):
+        raise OSError('connection timed out')
+
+    def test_breaker_opens_and_skips_fetches(self):
+        """
+        Test that the breaker opens after the threshold, then skips fetches and counts them.
+        """
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                self.guard.call('rss', FEED, FEED, self.fail)
+        source = Source.objects.get(platform='rss', external_identifier=FEED)
+        self.assertEqual(source.consecutive_errors, 2)
+        self.assertIsNotNone(source.breaker_retry_at)
+
+        with self.assertRaises(CircuitOpen):
+            self.guard.call('rss', FEED, FEED, lambda: 'feed')
+        summary = self.guard.summary()
+        self.assertEqual(summary['skipped_fetches'], 1)
+        self.assertEqual(summary['failed_fetches'], 2)
+        self.assertEqual(summary['breakers'], {f'rss:{FEED}': OPEN})
+
+    def test_successful_probe_closes_the_breaker(self):
+        """
+        Test that once the retry time passes a single probe is let through and its success closes the breaker.
+        """
+        Source.objects.create(
+            platform='rss',
+            external_identifier=FEED,
+            consecutive_errors=4,
+            breaker_retry_at=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(self.guard.breaker.allow('rss', FEED), HALF_OPEN)
+        # The probe is leased, so a concurrent caller is skipped
+        with self.assertRaises(CircuitOpen):
+            self.guard.breaker.allow('rss', FEED)
+
+        Source.objects.filter(external_identifier=FEED).update(
+            breaker_retry_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(self.guard.call('rss', FEED, FEED, lambda: 'feed'), 'feed')
+        source = Source.objects.get(platform='rss', external_identifier=FEED)
+        self.assertEqual((source.consecutive_errors, source.breaker_retry_at), (0, None))
+        self.assertEqual(self.guard.summary()['probes'], 1)
+        self.assertEqual(self.guard.summary()['breakers'], {})
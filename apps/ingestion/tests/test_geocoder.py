@@ -0,0 +1,103 @@
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from apps.ingestion.geocoder import Gazetteer, Geocoder, Place, get_geocoder
+
+PLACES = [
+    (Place('Lagos', 6.4550, 3.3941, 15388000), ['Eko']),
+    (Place('Ikeja', 6.6018, 3.3515, 313196), []),
+    (Place('Benin City', 6.3350, 5.6037, 1782000), []),
+    (Place('Benin', 9.3077, 2.3158, 12000000), []),
+]
+
+
+class GazetteerTestCase(SimpleTestCase):
+    """
+    Test case for place name extraction and resolution.
+    """
+
+    def setUp(self):
+        self.gazetteer = Gazetteer(PLACES)
+
+    def test_mentions_prefer_longest_name(self):
+        """
+        Test that an overlapping longer name hides the shorter one inside it.
+        """
+        mentions = self.gazetteer.mentions('Robbery in Benin City, police in Benin say')
+        self.assertEqual([place.name for _, place in mentions], ['Benin City', 'Benin'])
+
+    def test_alternate_names(self):
+        """
+        Test that alternate names resolve to their place.
+        """
+        self.assertEqual(self.gazetteer.resolve('Traffic across Eko').name, 'Lagos')
+
+    def test_resolve_prefers_most_mentioned_then_specific(self):
+        """
+        Test that mentions decide first and the smaller place breaks ties.
+        """
+        self.assertEqual(self.gazetteer.resolve('Lagos: robbery', 'Lagos police said').name, 'Lagos')
+        self.assertEqual(self.gazetteer.resolve('Robbery in Ikeja, Lagos').name, 'Ikeja')
+        # A title mention outweighs a single description mention
+        self.assertEqual(self.gazetteer.resolve('Lagos robbery', 'Suspects fled to Ikeja').name, 'Lagos')
+
+    def test_resolve_without_place(self):
+        """
+        Test that text naming no known place resolves to None.
+        """
+        self.assertIsNone(self.gazetteer.resolve('Robbery reported', 'No location given'))
+
+    def test_digest_tracks_contents(self):
+        """
+        Test that changing the gazetteer changes its digest.
+        """
+        changed = Gazetteer(PLACES[:-1])
+        self.assertNotEqual(self.gazetteer.digest, changed.digest)
+        self.assertEqual(self.gazetteer.digest, Gazetteer(PLACES).digest)
+
+
+class GeocoderTestCase(SimpleTestCase):
+    """
+    Test case for the caching batch Geocoder.
+    """
+
+    def setUp(self):
+        self.cache = LocMemCache('geocode-test', {})
+        self.cache.clear()
+        self.geocoder = Geocoder(Gazetteer(PLACES), lru_size=2, cache=self.cache)
+
+    def test_resolve_batch(self):
+        """
+        Test that a batch resolves each entry, repeats included.
+        """
+        entries = [('Robbery in Ikeja', ''), ('No place', ''), ('Robbery in Ikeja', '')]
+        places = self.geocoder.resolve_batch(entries)
+        self.assertEqual([p.name if p else None for p in places], ['Ikeja', None, 'Ikeja'])
+        self.assertEqual(self.geocoder.misses, 2)
+
+    def test_shared_cache_serves_other_processes(self):
+        """
+        Test that a fresh geocoder reads resolutions, misses included, from the shared cache.
+        """
+        self.geocoder.resolve_batch([('Robbery in Ikeja', ''), ('No place', '')])
+        other = Geocoder(Gazetteer(PLACES), lru_size=2, cache=self.cache)
+        places = other.resolve_batch([('Robbery in Ikeja', ''), ('No place', '')])
+        self.assertEqual(places[0].name, 'Ikeja')
+        self.assertIsNone(places[1])
+        self.assertEqual((other.hits, other.misses), (2, 0))
+
+    def test_lru_is_bounded(self):
+        """
+        Test that the in-process LRU keeps at most lru_size entries.
+        """
+        self.geocoder.resolve_batch([(f'Robbery {i} in Lagos', '') for i in range(5)])
+        self.assertEqual(len(self.geocoder._lru), 2)
+        self.geocoder.resolve('Robbery 4 in Lagos')
+        self.assertEqual(self.geocoder.hits, 1)
+
+    def test_default_gazetteer(self):
+        """
+        Test that the shipped gazetteer loads and resolves a known place.
+        """
+        place = get_geocoder().gazetteer.resolve('Armed robbers attack bank in Victoria Island')
+        self.assertEqual(place.name, 'Victoria Island')
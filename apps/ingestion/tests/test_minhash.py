@@ -0,0 +1,71 @@
+from django.test import SimpleTestCase
+
+from apps.ingestion import minhash
+
+
+class MinHashTestCase(SimpleTestCase):
+    """
+    Test case for MinHash signatures and LSH bands.
+    """
+    ORIGINAL = (
+        'Armed robbery reported at the corner of Main Street and Fifth Avenue, '
+        'two suspects fled on foot towards the central station'
+    )
+    REWORDED = (
+        'Armed robbery reported at the corner of Main Street and Fifth Avenue, '
+        'two suspects fled on foot towards the central bus station'
+    )
+    UNRELATED = (
+        'Heavy flooding closed the riverside road after the storm overnight, '
+        'residents are advised to avoid the area until further notice'
+    )
+
+    def test_identical_content_has_identical_signature(self):
+        """
+        Test that the same content, differently cased and punctuated, gives the same signature.
+        """
+        a = minhash.signature(self.ORIGINAL)
+        b = minhash.signature(self.ORIGINAL.upper().replace(',', ' ;'))
+        self.assertEqual(minhash.similarity(a, b), 1.0)
+
+    def test_near_duplicates_share_a_band(self):
+        """
+        Test that lightly reworded content is similar and shares at least one band.
+        """
+        a = minhash.signature(self.ORIGINAL)
+        b = minhash.signature(self.REWORDED)
+        self.assertGreater(minhash.similarity(a, b), 0.7)
+        shared = set(minhash.band_hashes(a, 'robbery')) & set(minhash.band_hashes(b, 'robbery'))
+        self.assertTrue(shared)
+
+    def test_unrelated_content_is_dissimilar(self):
+        """
+        Test that unrelated content has low similarity and no shared bands.
+        """
+        a = minhash.signature(self.ORIGINAL)
+        b = minhash.signature(self.UNRELATED)
+        self.assertLess(minhash.similarity(a, b), 0.2)
+        self.assertFalse(set(minhash.band_hashes(a)) & set(minhash.band_hashes(b)))
+
+    def test_bands_are_namespaced(self):
+        """
+        Test that the same signature gives different bands for different signal types.
+        """
+        sig = minhash.signature(self.ORIGINAL)
+        self.assertFalse(set(minhash.band_hashes(sig, 'robbery')) & set(minhash.band_hashes(sig, 'assault')))
+
+    def test_short_content_has_no_signature(self):
+        """
+        Test that content with fewer shingles than the minimum returns None.
+        """
+        self.assertIsNone(minhash.signature('Robbery', min_shingles=5))
+        self.assertIsNone(minhash.signature('', min_shingles=1))
+
+    def test_bytes_round_trip(self):
+        """
+        Test that signatures survive conversion to and from bytes.
+        """
+        sig = minhash.signature(self.ORIGINAL)
+        raw = minhash.to_bytes(sig)
+        self.assertEqual(len(raw), minhash.NUM_PERM * 4)
+        self.assertTrue((minhash.from_bytes(memoryview(raw)) == sig).all())
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import time
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.ingestion.profiling import QueryExplainer, StageProfiler, write_report
+from apps.ingestion.trust_rules import CROSS_VALIDATED_SQL
+from apps.signals.models import Signal
+from apps.sources.models import Source
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class StageProfilerTestCase(SimpleTestCase):
+    """
+    Test case for the StageProfiler class.
+    """
+
+    def test_samples_are_folded_under_their_stage(self):
+        """
+        Test that samples taken during a stage are folded stacks rooted at the stage name.
+        """
+        profiler = StageProfiler(interval=0.001)
+        profiler.start()
+        try:
+            with profiler.stage('score'):
+                busy(0.1)
+        finally:
+            profiler.stop()
+
+        self.assertEqual(profiler.calls['score'], 1)
+        self.assertGreaterEqual(profiler.wall['score'], 0.1)
+        self.assertGreater(profiler.stage_samples()['score'], 0)
+        score_stacks = [line for line in profiler.folded() if line.startswith('score;')]
+        self.assertTrue(any('busy (tests/test_profiling.py' in line for line in score_stacks))
+        for line in profiler.folded():
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(count.isdigit())
+
+    def test_report_comments_everything_but_folded_stacks(self):
+        """
+        Test that only folded stack lines of the report are uncommented.
+        """
+        profiler = StageProfiler(interval=0.001)
+        profiler.samples['fetch;run (ingestion/coordinator.py:45)'] = 3
+        profiler.wall['fetch'] = 0.25
+        profiler.calls['fetch'] = 1
+        explainer = QueryExplainer()
+        explainer.seen['insert'] = 1
+        explainer.plans['insert'].append(('INSERT INTO "signals_signal" VALUES (%s)', (1,), ['Insert on signals_signal']))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'report.txt')
+            write_report(path, profiler, explainer, summary={'processed': 2})
+            with open(path, encoding='utf-8') as report:
+                lines = report.read().splitlines()
+
+        self.assertEqual(
+            [line for line in lines if not line.startswith('#')],
+            ['fetch;run (ingestion/coordinator.py:45) 3'],
+        )
+        self.assertIn('#     Insert on signals_signal', lines)
+        self.assertIn('# EXPLAIN (ANALYZE, BUFFERS): insert, 1 of 1 statements', lines)
+
+
+class QueryKindTestCase(SimpleTestCase):
+    """
+    Test case for classifying statements to explain.
+    """
+
+    def test_kinds(self):
+        """
+        Test that signal inserts, dedup lookups and cross-validation queries are told apart.
+        """
+        kind_of = QueryExplainer.kind_of
+        self.assertEqual(kind_of('INSERT INTO "signals_signal" ("id") VALUES (%s)'), 'insert')
+        self.assertIsNone(kind_of('INSERT INTO "signals_signalcontentband" ("band") VALUES (%s)'))
+        self.assertEqual(
+            kind_of('SELECT 1 AS "a" FROM "signals_signaldedupkey" WHERE "dedup_hash" = %s LIMIT 1'),
+            'dedup',
+        )
+        self.assertEqual(
+            kind_of('SELECT 1 AS "a" FROM "signals_signal" WHERE ST_DistanceSphere("location", %s) <= %s LIMIT 1'),
+            'cross_validation',
+        )
+        self.assertEqual(kind_of(CROSS_VALIDATED_SQL), 'cross_validation')
+        self.assertIsNone(kind_of('SELECT "id" FROM "sources_source" WHERE "id" = %s'))
+
+
+class QueryExplainerTestCase(TestCase):
+    """
+    Test case for capturing query plans while ingesting.
+    """
+
+    def test_explaining_an_insert_stores_one_row(self):
+        """
+        Test that an insert is explained once and its EXPLAIN ANALYZE leaves no row behind.
+        """
+        source = Source.objects.create(platform='test', external_identifier='explain')
+        explainer = QueryExplainer(samples=1)
+        with explainer.capture():
+            for minutes in (1, 2):
+                Signal.objects.create(
+                    content='Robbery reported near the market',
+                    signal_type='robbery',
+                    location=Point(3.38, 6.52, srid=4326),
+                    occurred_at=timezone.now().replace(minute=minutes),
+                    source=source,
+                )
+
+        self.assertEqual(Signal.objects.count(), 2)
+        self.assertEqual(explainer.seen['insert'], 2)
+        self.assertEqual(len(explainer.plans['insert']), 1)
+        plan = explainer.plans['insert'][0][2]
+        self.assertTrue(any('Insert on' in line for line in plan), plan)
@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.ingestion.adapters.base import SourceAdapter
+from apps.ingestion.coordinator import IngestionCoordinator
+from apps.ingestion.models import QuarantinedSignal
+from apps.ingestion.quarantine import encode_payload, quarantine_exhausted
+from apps.ingestion.queue import Message, encode_raw_signal
+from apps.ingestion.types import NormalizedSignal, RawSignal, SignalType
+from apps.signals.models import Signal
+
+
+class FlakyAdapter(SourceAdapter):
+    """
+    Adapter whose normalization fails for titles listed in broken.
+    """
+    def __init__(self, signals=()):
+        self.signals = list(signals)
+        self.broken = set()
+
+    def fetch_signals(self):
+        return self.signals
+
+    def normalize_signal(self, raw):
+        if raw.title in self.broken:
+            raise ValueError(f'Cannot normalize {raw.title}')
+        return NormalizedSignal(
+            title=raw.title,
+            description=raw.description,
+            signal_type=raw.signal_type,
+            source_identifier=raw.source_name,
+            timestamp=raw.published,
+            source_platform='flaky',
+            location=raw.location,
+            additional_data={},
+        )
+
+
+def raw_signal(title, minutes_ago):
+    return RawSignal(
+        title=title,
+        description=f'{title} reported near the market',
+        signal_type=SignalType.ROBBERY,
+        link='https://example.com',
+        published=timezone.now() - timedelta(minutes=minutes_ago),
+        source_name='flaky:reporter',
+        location=Point(3.38 + minutes_ago / 1000, 6.52, srid=4326),
+        has_photo=False,
+        has_video=False,
+    )
+
+
+class EncodePayloadTestCase(SimpleTestCase):
+    """
+    Test case for encoding quarantined payloads.
+    """
+
+    def test_unencodable_signal_keeps_its_repr(self):
+        """
+        Test that a signal the queue codec cannot encode is kept as its repr.
+        """
+        self.assertEqual(encode_payload({'title': 'x'}), {'unencodable': repr({'title': 'x'})})
+
+
+class QuarantineTestCase(TestCase):
+    """
+    Test case for quarantining and replaying signals that fail to store.
+    """
+    def setUp(self):
+        self.adapter = FlakyAdapter([raw_signal('first', 10), raw_signal('second', 20), raw_signal('third', 30)])
+        self.adapter.broken = {'second'}
+        self.coordinator = IngestionCoordinator(adapters=[self.adapter])
+
+    def test_failed_signal_is_quarantined_and_batch_continues(self):
+        """
+        Test that a failing signal is quarantined with its error while the rest are stored.
+        """
+        summary = self.coordinator._process_source(self.adapter)
+
+        self.assertEqual(summary['processed'], 2)
+        self.assertEqual(summary['quarantined'], 1)
+        self.assertEqual(Signal.objects.count(), 2)
+        row = QuarantinedSignal.objects.get()
+        self.assertEqual(row.adapter, 'FlakyAdapter')
+        self.assertEqual(row.payload['title'], 'second')
+        self.assertEqual(row.error_type, 'ValueError')
+        self.assertIn('Cannot normalize second', row.traceback)
+
+    def test_replay_resolves_fixed_rows(self):
+        """
+        Test that replaying after a fix stores the signal and removes its row.
+        """
+        self.coordinator._process_source(self.adapter)
+        rows = list(QuarantinedSignal.objects.all())
+
+        self.assertEqual(self.coordinator.replay_quarantined(rows), (0, 1))
+        self.assertEqual(QuarantinedSignal.objects.get().attempts, 2)
+
+        self.adapter.broken = set()
+        self.assertEqual(self.coordinator.replay_quarantined(rows), (1, 0))
+        self.assertFalse(QuarantinedSignal.objects.exists())
+        self.assertEqual(Signal.objects.count(), 3)
+
+
+class QuarantineExhaustedTestCase(TestCase):
+    """
+    Test case for dead-lettering queued batches that used up their attempts.
+    """
+
+    def test_each_signal_is_quarantined_with_the_batch_error(self):
+        """
+        Test that every signal of an exhausted batch gets a replayable row carrying the last error.
+        """
+        payload = {
+            'adapter': 'flaky',
+            'signals': [encode_raw_signal(raw_signal('Robbery', 5)), encode_raw_signal(raw_signal('Fire', 6))],
+        }
+        failed = Message(1, payload, 5, 'ValueError: Cannot normalize Robbery')
+        abandoned = Message(2, {'adapter': 'flaky', 'signals': payload['signals'][:1]}, 5)
+
+        self.assertEqual(quarantine_exhausted([failed, abandoned]), 3)
+
+        rows = list(QuarantinedSignal.objects.order_by('id'))
+        self.assertEqual(
+            [(row.adapter, row.error_type, row.attempts) for row in rows],
+            [('flaky', 'ValueError', 5), ('flaky', 'ValueError', 5), ('flaky', 'AttemptsExhausted', 5)],
+        )
+        self.assertEqual(rows[0].error_message, 'Cannot normalize Robbery')
+        self.assertEqual(rows[1].payload, payload['signals'][1])
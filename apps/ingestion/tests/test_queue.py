@@ -0,0 +1,184 @@
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TransactionTestCase
+
+from apps.ingestion.queue import (
+    InProcessQueue,
+    PostgresQueue,
+    decode_raw_signal,
+    encode_raw_signal,
+)
+from apps.ingestion.types import RawSignal, SignalType
+
+TOPIC = 'raw_signals'
+
+
+class RawSignalCodecTestCase(SimpleTestCase):
+    """
+    Test case for encoding raw signals into queue payloads.
+    """
+
+    def test_round_trip(self):
+        """
+        Test that a decoded payload equals the signal it was encoded from.
+        """
+        raw = RawSignal(
+            title='Robbery on Main Street',
+            description='Two suspects fled on foot',
+            signal_type=SignalType.ROBBERY,
+            link='https://example.com/1',
+            published=datetime(2026, 3, 1, 12, 30, tzinfo=dt_timezone.utc),
+            source_name='example',
+            location=Point(3.38, 6.52, srid=4326),
+            has_photo=True,
+            has_video=False,
+            type_confidence=0.75,
+            place='Lagos',
+        )
+        decoded = decode_raw_signal(encode_raw_signal(raw))
+        self.assertEqual(decoded.signal_type, SignalType.ROBBERY)
+        self.assertEqual(decoded.published, raw.published)
+        self.assertEqual((decoded.location.x, decoded.location.y), (3.38, 6.52))
+        self.assertEqual(decoded.location.srid, 4326)
+        self.assertEqual(decoded.type_confidence, 0.75)
+        self.assertEqual(decoded.place, 'Lagos')
+        self.assertEqual(decoded.title, raw.title)
+
+
+class InProcessQueueTestCase(SimpleTestCase):
+    """
+    Test case for the in-process queue backend.
+    """
+
+    def test_acknowledged_messages_are_not_redelivered(self):
+        """
+        Test that messages are delivered in order and gone once acknowledged.
+        """
+        queue = InProcessQueue(visibility=60, max_attempts=3)
+        queue.publish(TOPIC, [{'n': 1}, {'n': 2}])
+        messages = queue.consume(TOPIC, max_messages=5)
+        self.assertEqual([m.payload['n'] for m in messages], [1, 2])
+        self.assertEqual(queue.consume(TOPIC), [])
+        self.assertEqual(queue.pending(TOPIC), 2)
+        queue.ack(messages)
+        self.assertEqual(queue.pending(TOPIC), 0)
+
+    def test_unacknowledged_message_is_redelivered(self):
+        """
+        Test that a message not acknowledged within the visibility timeout is delivered again.
+        """
+        queue = InProcessQueue(visibility=0.05, max_attempts=3)
+        queue.publish(TOPIC, [{'n': 1}])
+        first = queue.consume(TOPIC)
+        self.assertEqual(first[0].attempts, 1)
+        time.sleep(0.1)
+        again = queue.consume(TOPIC)
+        self.assertEqual(again[0].id, first[0].id)
+        self.assertEqual(again[0].attempts, 2)
+
+    def test_released_message_waits_for_delay(self):
+        """
+        Test that a released message is held back for its delay.
+        """
+        queue = InProcessQueue(visibility=60, max_attempts=3)
+        queue.publish(TOPIC, [{'n': 1}])
+        queue.release(queue.consume(TOPIC)[0], error='boom', delay=0.05)
+        self.assertEqual(queue.consume(TOPIC), [])
+        time.sleep(0.1)
+        self.assertEqual(len(queue.consume(TOPIC)), 1)
+
+    def test_message_is_given_up_after_max_attempts(self):
+        """
+        Test that a message is not delivered again once it reached max_attempts.
+        """
+        queue = InProcessQueue(visibility=60, max_attempts=2)
+        queue.publish(TOPIC, [{'n': 1}])
+        queue.release(queue.consume(TOPIC)[0])
+        queue.release(queue.consume(TOPIC)[0])
+        self.assertEqual(queue.consume(TOPIC), [])
+        self.assertEqual(queue.pending(TOPIC), 0)
+
+    def test_exhausted_message_is_taken_with_its_error(self):
+        """
+        Test that messages that used up their attempts are kept, once out of flight, until take_exhausted removes them.
+        """
+        queue = InProcessQueue(visibility=60, max_attempts=1)
+        queue.publish(TOPIC, [{'n': 1}, {'n': 2}])
+        first, second = queue.consume(TOPIC, max_messages=2)
+        self.assertEqual(queue.take_exhausted(TOPIC), [])
+
+        queue.release(first, error='ValueError: boom')
+        queue.release(second)
+        self.assertEqual(queue.consume(TOPIC), [])
+        exhausted = queue.take_exhausted(TOPIC)
+        self.assertEqual([(m.payload['n'], m.last_error) for m in exhausted], [(1, 'ValueError: boom'), (2, '')])
+        self.assertEqual(queue.take_exhausted(TOPIC), [])
+
+    def test_concurrent_consumers_never_share_a_message(self):
+        """
+        Test that each message goes to exactly one of several consumer threads.
+        """
+        queue = InProcessQueue(visibility=60, max_attempts=3)
+        queue.publish(TOPIC, [{'n': n} for n in range(500)])
+        seen = []
+        lock = threading.Lock()
+
+        def consume():
+            while True:
+                messages = queue.consume(TOPIC, max_messages=3)
+                if not messages:
+                    return
+                with lock:
+                    seen.extend(m.payload['n'] for m in messages)
+                queue.ack(messages)
+
+        threads = [threading.Thread(target=consume) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(seen), list(range(500)))
+
+
+class PostgresQueueTestCase(TransactionTestCase):
+    """
+    Test case for the Postgres queue backend.
+    """
+
+    def test_claimed_messages_are_hidden_until_released(self):
+        """
+        Test that claimed messages are skipped by other consumers and come back once released.
+        """
+        queue = PostgresQueue(visibility=60, max_attempts=3)
+        queue.publish(TOPIC, [{'n': 1}, {'n': 2}])
+        first = queue.consume(TOPIC)
+        second = queue.consume(TOPIC)
+        self.assertEqual([first[0].payload['n'], second[0].payload['n']], [1, 2])
+        self.assertEqual(queue.consume(TOPIC), [])
+
+        queue.release(first[0], error='boom')
+        again = queue.consume(TOPIC)
+        self.assertEqual(again[0].id, first[0].id)
+        self.assertEqual(again[0].attempts, 2)
+
+        queue.ack(again + second)
+        self.assertEqual(queue.pending(TOPIC), 0)
+
+    def test_exhausted_message_is_taken_once_out_of_flight(self):
+        """
+        Test that a message on its last attempt stays pending until its visibility timeout, then is taken.
+        """
+        queue = PostgresQueue(visibility=60, max_attempts=1)
+        queue.publish(TOPIC, [{'n': 1}])
+        message = queue.consume(TOPIC)[0]
+        self.assertEqual(queue.take_exhausted(TOPIC), [])
+        self.assertEqual(queue.pending(TOPIC), 1)
+
+        queue.release(message, error='ValueError: boom')
+        self.assertEqual(queue.consume(TOPIC), [])
+        exhausted = queue.take_exhausted(TOPIC)
+        self.assertEqual([(m.id, m.payload, m.last_error) for m in exhausted], [(message.id, {'n': 1}, 'ValueError: boom')])
+        self.assertEqual(queue.pending(TOPIC), 0)
@@ -0,0 +1,148 @@
+import json
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase
+
+from apps.ingestion.adapters.base import SourceAdapter
+from apps.ingestion.adapters.registry import AdapterRegistry
+from apps.sources.models import Source
+
+FAKE_BACKEND = 'apps.ingestion.tests.test_registry.FakeAdapter'
+
+REGISTRY_MODULE = 'apps.ingestion.adapters.registry'
+
+# Seconds the registry's own import (with the modules it alone pulls in,
+# as -X importtime reports) may take; it is a few milliseconds, and
+# heavier modules the command imports, such as numpy, are not counted
+REGISTRY_IMPORT_BUDGET_SECONDS = 0.25
+
+# Modules only adapters need; starting a command must not import them
+ADAPTER_ONLY_MODULES = ('faker', 'feedparser', 'apps.ingestion.adapters.mock', 'apps.ingestion.adapters.rss')
+
+IMPORT_PROBE = """
+import json, sys
+import django
+django.setup()
+import apps.ingestion.management.commands.ingest_signals
+print(json.dumps(sorted(m for m in %r if m in sys.modules)))
+"""
+
+
+def cumulative_import_seconds(importtime_log, module):
+    """
+    Cumulative import time of a module from -X importtime output.
+    """
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip() == module:
+            return int(cumulative) / 1_000_000
+    raise AssertionError(f'{module} was not imported')
+
+
+class FakeAdapter(SourceAdapter):
+    """
+    Adapter recording its constructor options.
+    """
+    def __init__(self, feed='default'):
+        self.feed = feed
+
+    def fetch_signals(self):
+        return []
+
+    def normalize_signal(self, raw):
+        return raw
+
+
+class AdapterRegistryTestCase(SimpleTestCase):
+    """
+    Test case for the AdapterRegistry class.
+    """
+
+    def test_builds_enabled_adapters_with_options(self):
+        """
+        Test that enabled adapters are built with their options and named after their key.
+        """
+        registry = AdapterRegistry({
+            'first': {'BACKEND': FAKE_BACKEND, 'OPTIONS': {'feed': 'a'}},
+            'template': {'BACKEND': FAKE_BACKEND, 'ENABLED': False},
+        })
+        adapters = registry.adapters(include_sources=False)
+        self.assertEqual([(a.name, a.feed) for a in adapters], [('first', 'a')])
+        self.assertIn('template', registry)
+
+    def test_missing_backend_is_improperly_configured(self):
+        """
+        Test that an entry without BACKEND raises ImproperlyConfigured.
+        """
+        with self.assertRaises(ImproperlyConfigured):
+            AdapterRegistry({'broken': {'OPTIONS': {}}})
+
+    def test_unbuildable_adapter_is_left_out(self):
+        """
+        Test that an adapter whose constructor fails is skipped and the others are built.
+        """
+        registry = AdapterRegistry({
+            'bad': {'BACKEND': FAKE_BACKEND, 'OPTIONS': {'unknown': 1}},
+            'good': {'BACKEND': FAKE_BACKEND},
+        })
+        with self.assertLogs('apps.ingestion.adapters.registry', level='ERROR'):
+            adapters = registry.adapters(include_sources=False)
+        self.assertEqual([a.name for a in adapters], ['good'])
+
+    def test_unnamed_adapter_defaults_to_class_name(self):
+        """
+        Test that an adapter built outside the registry is named after its class.
+        """
+        self.assertEqual(FakeAdapter().name, 'FakeAdapter')
+
+    def test_command_import_leaves_adapters_unloaded(self):
+        """
+        Test that importing ingest_signals imports no adapter modules and the registry import stays within the budget.
+        """
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', IMPORT_PROBE % (ADAPTER_ONLY_MODULES,)],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            timeout=60,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        self.assertEqual(json.loads(result.stdout.strip().splitlines()[-1]), [])
+        self.assertLess(
+            cumulative_import_seconds(result.stderr, REGISTRY_MODULE), REGISTRY_IMPORT_BUDGET_SECONDS,
+        )
+
+
+class SourceAdapterTestCase(TestCase):
+    """
+    Test case for adapters configured by Source rows.
+    """
+
+    def test_source_rows_get_their_own_adapter(self):
+        """
+        Test that each active Source naming an adapter gets an instance with its options.
+        """
+        registry = AdapterRegistry({'fake': {'BACKEND': FAKE_BACKEND, 'ENABLED': False}})
+        source = Source.objects.create(
+            platform='fake',
+            external_identifier='feed-1',
+            metadata={'adapter': 'fake', 'adapter_options': {'feed': 'https://example.com/feed'}},
+        )
+        Source.objects.create(
+            platform='fake',
+            external_identifier='feed-2',
+            active=False,
+            metadata={'adapter': 'fake'},
+        )
+        Source.objects.create(platform='fake', external_identifier='plain')
+
+        adapters = registry.adapters()
+        self.assertEqual(
+            [(a.name, a.feed) for a in adapters],
+            [(f'fake:{source.id}', 'https://example.com/feed')],
+        )
@@ -0,0 +1,65 @@
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import feedparser
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.ingestion.adapters.rss import RssAdapter
+from apps.signals.models import Signal
+from apps.sources.models import Source
+
+FEED = 'https://news.example.com/feed.xml'
+
+
+def entry(**fields):
+    return feedparser.FeedParserDict(title='Robbery at the market', link='https://news.example.com/1', **fields)
+
+
+class ParseEntryTestCase(SimpleTestCase):
+    """
+    Test case for timestamps of parsed RSS entries.
+    """
+
+    def test_updated_date_stands_in_for_published(self):
+        """
+        Test that an entry without a published date takes its updated date.
+        """
+        raw = RssAdapter._parse_entry(entry(updated_parsed=time.gmtime(1700000000)), FEED)
+        self.assertEqual(raw.published, datetime.fromtimestamp(1700000000, dt_timezone.utc))
+
+    def test_undated_entry_is_left_for_stamping(self):
+        """
+        Test that an entry without any date is parsed without a timestamp.
+        """
+        self.assertIsNone(RssAdapter._parse_entry(entry(), FEED).published)
+
+
+class StampUndatedTestCase(TestCase):
+    """
+    Test case for stable timestamps of undated entries.
+    """
+
+    def test_refetched_entry_keeps_its_first_timestamp(self):
+        """
+        Test that an undated entry already stored reuses its occurred_at, so its dedup hash is unchanged.
+        """
+        first_seen = timezone.now() - timedelta(hours=3)
+        source = Source.objects.create(platform='rss', external_identifier=FEED)
+        Signal.objects.create(
+            content='Robbery at the market',
+            signal_type='robbery',
+            location=Point(3.38, 6.52, srid=4326),
+            occurred_at=first_seen,
+            source=source,
+            source_metadata={'original_link': 'https://news.example.com/1'},
+        )
+        adapter = RssAdapter(feed_urls=[])
+        stored = RssAdapter._parse_entry(entry(), FEED)
+        new = RssAdapter._parse_entry(entry(link='https://news.example.com/2'), FEED)
+
+        before = timezone.now()
+        adapter._stamp_undated([stored, new], FEED)
+        self.assertEqual(stored.published, first_seen)
+        self.assertGreaterEqual(new.published, before)
@@ -131,6 +131,28 @@ class TrustCalculatorTestCase(unittest.TestCase):
         self.assertEqual(breakdown['cross_validation_bonus'], 0)
         self.assertEqual(breakdown['base'], 50)
 
+    def test_type_confidence_penalty(self):
+        """
+        Test that a low classifier confidence is penalised and a high one is not.
+        """
+        unsure = NormalizedSignal(
+            title="Test Signal",
+            signal_type="robbery",
+            description="They just took them out",
+            location=None,
+            timestamp=datetime.now(),
+            source_platform="RSS",
+            source_identifier="test_source",
+            additional_data={"type_confidence": 0.2}
+        )
+        breakdown = self.calculator.get_score_breakdown(unsure, self.trust_verified)
+        self.assertEqual(breakdown['type_confidence_penalty'], -20)
+        self.assertEqual(self.calculator.calculate(unsure, self.trust_verified), 50)
+
+        unsure.additional_data["type_confidence"] = 0.8
+        breakdown = self.calculator.get_score_breakdown(unsure, self.trust_verified)
+        self.assertEqual(breakdown['type_confidence_penalty'], 0)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
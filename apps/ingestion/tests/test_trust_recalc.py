@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.ingestion.trust import TrustCalculator
+from apps.ingestion.trust_recalc import CHANGED_BY, recalculate_trust, score_bucket
+from apps.ingestion.trust_rules import get_evaluator
+from apps.ingestion.types import NormalizedSignal
+from apps.signals.models import Signal
+from apps.sources.models import Source, SourceTrustHistory
+
+
+class TrustRecalculationTestCase(TestCase):
+    """
+    Test case for the set-based trust recalculation.
+    """
+    def setUp(self):
+        self.now = timezone.now()
+        self.location = Point(3.3792, 6.5244)
+        self.verified = Source.objects.create(
+            platform="test_platform", external_identifier="verified", verified=True, trust_score=50,
+        )
+        self.witness = Source.objects.create(
+            platform="test_platform", external_identifier="witness", trust_score=50,
+        )
+        self.idle = Source.objects.create(
+            platform="test_platform", external_identifier="idle", trust_score=42,
+        )
+        self.create_signal(self.verified, {'has_photo': True, 'has_video': 0})
+        # 300 m north, five minutes later: cross-validates both signals
+        self.create_signal(
+            self.witness, {}, location=Point(3.3792, 6.5271), occurred_at=self.now + timedelta(minutes=5),
+        )
+
+    def create_signal(self, source, metadata, location=None, occurred_at=None):
+        return Signal.objects.create(
+            content="Robbery at the junction",
+            signal_type='robbery',
+            location=location or self.location,
+            occurred_at=occurred_at or self.now,
+            source_metadata=metadata,
+            source=source,
+        )
+
+    def expected_score(self, source):
+        signal = source.signals.order_by('-created_at').first()
+        return TrustCalculator().calculate(
+            NormalizedSignal(
+                title=signal.content,
+                signal_type=signal.signal_type,
+                description=signal.content,
+                location=signal.location,
+                timestamp=signal.occurred_at,
+                source_platform=source.platform,
+                source_identifier=source.external_identifier,
+                additional_data=signal.source_metadata,
+            ),
+            source,
+        )
+
+    def test_scores_match_trust_calculator(self):
+        """
+        Test that the SQL scores equal TrustCalculator scores.
+        """
+        result = recalculate_trust(batch_size=1)
+        self.assertEqual(result.scored, 2)
+
+        for source in (self.verified, self.witness):
+            source.refresh_from_db()
+            self.assertEqual(source.trust_score, self.expected_score(source))
+        self.assertEqual(self.verified.trust_score, 100)
+        self.assertEqual(self.witness.trust_score, 85)
+
+    def test_history_only_for_changed_sources(self):
+        """
+        Test that history rows are written only when a score changes.
+        """
+        self.witness.trust_score = 85
+        self.witness.save(update_fields=['trust_score'])
+        SourceTrustHistory.objects.create(
+            source=self.verified, trust_score=50, reason="initial", changed_by="test",
+        )
+
+        result = recalculate_trust()
+        self.assertEqual(result.changed, 1)
+
+        history = SourceTrustHistory.objects.filter(changed_by=CHANGED_BY)
+        self.assertEqual([h.source_id for h in history], [self.verified.id])
+        self.assertIsNotNone(SourceTrustHistory.objects.get(changed_by="test").valid_to)
+
+        self.idle.refresh_from_db()
+        self.assertEqual(self.idle.trust_score, 42)
+
+    def test_dry_run_writes_nothing(self):
+        """
+        Test that a dry run only reports the distribution change.
+        """
+        result = recalculate_trust(dry_run=True)
+
+        self.assertEqual(result.changed, 2)
+        self.assertEqual(result.before[50], 2)
+        self.assertEqual(result.after[score_bucket(100)], 1)
+        self.assertEqual(result.after[80], 1)
+        self.verified.refresh_from_db()
+        self.assertEqual(self.verified.trust_score, 50)
+        self.assertFalse(SourceTrustHistory.objects.exists())
+
+    def test_custom_rules_file_is_used(self):
+        """
+        Test that recalculation scores with the rules of TRUST_RULES_FILE, like ingestion.
+        """
+        rules = [
+            {'name': 'base', 'weight': 10},
+            {'name': 'photo', 'when': 'has_photo', 'weight': 40},
+            {'name': 'corroborated', 'when': 'cross_validated', 'weight': 5},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rules.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(rules, f)
+            with override_settings(TRUST_RULES_FILE=path):
+                get_evaluator.cache_clear()
+                self.addCleanup(get_evaluator.cache_clear)
+                recalculate_trust()
+
+        self.verified.refresh_from_db()
+        self.witness.refresh_from_db()
+        self.assertEqual((self.verified.trust_score, self.witness.trust_score), (55, 15))
@@ -0,0 +1,211 @@
+import random
+from datetime import timedelta
+from unittest import mock
+
+import numpy as np
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.ingestion.trust import TrustCalculator
+from apps.ingestion.trust_rules import DEFAULT_RULES, ChunkScorer, RuleSet, cross_validated, signal_columns
+from apps.ingestion.types import NormalizedSignal
+from apps.signals.models import Signal
+from apps.sources.models import Source
+
+
+def make_signal(rng, now):
+    additional_data = {}
+    for key in ('has_photo', 'has_video'):
+        choice = rng.random()
+        if choice < 0.4:
+            additional_data[key] = rng.choice([True, False, 1, 0, 'yes', '', None])
+    if rng.random() < 0.5:
+        additional_data['type_confidence'] = rng.choice([0.0, 0.2, 0.49, 0.5, 0.51, 0.9, 1.0])
+    return NormalizedSignal(
+        title='Signal',
+        signal_type=rng.choice(['robbery', 'assault', 'burglary']),
+        description='Reported near the market',
+        timestamp=now - timedelta(minutes=rng.randint(0, 600)),
+        location=Point(3.3 + rng.random() / 10, 6.5 + rng.random() / 10, srid=4326) if rng.random() < 0.8 else None,
+        source_platform='test',
+        source_identifier='test_source',
+        additional_data=additional_data,
+    )
+
+
+class DefaultRulesTestCase(SimpleTestCase):
+    """
+    Test case for the default rules against TrustCalculator.
+    """
+
+    def test_scores_and_breakdowns_match_trust_calculator(self):
+        """
+        Test that the default rules give TrustCalculator's score and breakdown for every signal.
+        """
+        rng = random.Random(7)
+        now = timezone.now()
+        signals = [make_signal(rng, now) for _ in range(2000)]
+        sources = [Source(verified=rng.random() < 0.3) for _ in signals]
+        flags = [rng.random() < 0.3 for _ in signals]
+        cross = {id(signal): flag for signal, flag in zip(signals, flags)}
+
+        evaluator = RuleSet(DEFAULT_RULES).compile()
+        result = evaluator.evaluate(signal_columns(signals, sources, cross_validated_flags=flags))
+
+        calculator = TrustCalculator()
+        bonus = TrustCalculator.CROSS_VALIDATION_BONUS
+        with mock.patch.object(
+            TrustCalculator,
+            '_cross_validation_bonus',
+            lambda self, signal, source: bonus if cross[id(signal)] else 0,
+        ):
+            for i, (signal, source) in enumerate(zip(signals, sources)):
+                self.assertEqual(result.breakdown(i), calculator.get_score_breakdown(signal, source))
+                self.assertEqual(int(result.scores[i]), calculator.calculate(signal, source))
+
+    def test_bitmask_marks_the_rules_that_fired(self):
+        """
+        Test that bit i of the bitmask is set exactly when rule i contributed.
+        """
+        evaluator = RuleSet(DEFAULT_RULES).compile()
+        columns = {
+            'verified': np.array([True, False]),
+            'has_photo': np.array([False, False]),
+            'has_video': np.array([True, False]),
+            'has_location': np.array([True, False]),
+            'cross_validated': np.array([False, False]),
+            'type_confidence': np.array([np.nan, 0.1]),
+        }
+        result = evaluator.evaluate(columns)
+        self.assertEqual(result.bitmask.tolist(), [0b0011011, 0b1000001])
+        self.assertEqual(result.scores.tolist(), [95, 30])
+        self.assertEqual(result.contributions['type_confidence_penalty'].dtype, np.int16)
+        self.assertEqual(evaluator.rule_names(int(result.bitmask[1])), ['base', 'type_confidence_penalty'])
+
+
+class RuleSetTestCase(SimpleTestCase):
+    """
+    Test case for compiling declarative rules.
+    """
+
+    def test_compound_conditions(self):
+        """
+        Test that all, any and not conditions combine their parts, and missing numbers fail comparisons.
+        """
+        evaluator = RuleSet([
+            {'name': 'media', 'when': {'any': ['has_photo', 'has_video']}, 'weight': 10},
+            {'name': 'confident_unverified', 'when': {'all': [
+                {'not': 'verified'},
+                {'column': 'type_confidence', 'op': 'ne', 'value': 0.5},
+            ]}, 'weight': 5},
+        ]).compile()
+        result = evaluator.evaluate({
+            'verified': np.array([False, True, False]),
+            'has_photo': np.array([True, False, False]),
+            'has_video': np.array([False, False, False]),
+            'type_confidence': np.array([0.9, 0.9, np.nan]),
+        })
+        self.assertEqual(result.contributions['media'].tolist(), [10, 0, 0])
+        self.assertEqual(result.contributions['confident_unverified'].tolist(), [5, 0, 0])
+        self.assertEqual(result.scores.tolist(), [15, 0, 0])
+
+    def test_invalid_rules_are_rejected(self):
+        """
+        Test that unknown columns or operators, duplicate names and non-integer weights raise ValueError.
+        """
+        invalid = [
+            [{'name': 'a', 'when': 'has_audio', 'weight': 1}],
+            [{'name': 'a', 'when': {'column': 'type_confidence', 'op': 'between', 'value': 1}, 'weight': 1}],
+            [{'name': 'a', 'weight': 1}, {'name': 'a', 'weight': 2}],
+            [{'name': 'a', 'weight': 1.5}],
+        ]
+        for rules in invalid:
+            with self.assertRaises(ValueError):
+                RuleSet(rules)
+
+
+class ChunkScorerTestCase(SimpleTestCase):
+    """
+    Test case for scoring a chunk before storing it signal by signal.
+    """
+
+    def test_signals_stored_earlier_in_the_chunk_cross_validate(self):
+        """
+        Test that a signal is cross-validated by an earlier stored signal of the chunk from another source.
+        """
+        now = timezone.now()
+
+        def signal(lon, minutes):
+            return NormalizedSignal(
+                title='Signal',
+                signal_type='robbery',
+                description='Robbery reported',
+                timestamp=now + timedelta(minutes=minutes),
+                location=Point(lon, 6.52, srid=4326),
+                source_platform='test',
+                source_identifier='test_source',
+                additional_data={},
+            )
+
+        first, second = Source(verified=False), Source(verified=False)
+        signals = [signal(3.38, 0), signal(3.383, 5), signal(3.383, 5), signal(3.39, 5)]
+        sources = [first, second, first, second]
+        evaluator = RuleSet(DEFAULT_RULES).compile()
+        with mock.patch('apps.ingestion.trust_rules.cross_validated', return_value=np.zeros(4, dtype=bool)):
+            scorer = ChunkScorer(signals, sources, evaluator)
+
+        base = TrustCalculator.BASE_SCORE + TrustCalculator.LOCATION_BONUS
+        self.assertEqual(scorer.score(1)[0], base)
+        scorer.stored(0)
+        # ~330 m away from another source; the same source; ~1.1 km away
+        self.assertEqual(
+            [scorer.score(i)[0] for i in (1, 2, 3)],
+            [base + TrustCalculator.CROSS_VALIDATION_BONUS, base, base],
+        )
+        self.assertIn('cross_validation_bonus', evaluator.rule_names(scorer.score(1)[1]))
+
+
+class CrossValidatedTestCase(TestCase):
+    """
+    Test case for the batched cross-validation query.
+    """
+
+    def test_matches_trust_calculator(self):
+        """
+        Test that the batched query flags the signals TrustCalculator gives the cross-validation bonus.
+        """
+        now = timezone.now()
+        reporter = Source.objects.create(platform='test', external_identifier='reporter')
+        other = Source.objects.create(platform='test', external_identifier='other')
+        Signal.objects.create(
+            content='Robbery at the market',
+            signal_type='robbery',
+            location=Point(3.38, 6.52, srid=4326),
+            occurred_at=now,
+            source=other,
+        )
+
+        def candidate(lon, lat, minutes, signal_type='robbery'):
+            return NormalizedSignal(
+                title='Signal',
+                signal_type=signal_type,
+                description='Robbery reported',
+                timestamp=now + timedelta(minutes=minutes),
+                location=Point(lon, lat, srid=4326),
+                source_platform='test',
+                source_identifier='reporter',
+                additional_data={},
+            )
+
+        signals = [
+            candidate(3.3830, 6.52, 5),       # ~330 m east, in the window
+            candidate(3.3880, 6.52, 5),       # ~880 m east
+            candidate(3.38, 6.52, 11),        # outside the window
+            candidate(3.38, 6.52, 0, 'assault'),
+        ]
+        sources = [reporter] * len(signals)
+        expected = [TrustCalculator()._cross_validation_bonus(s, reporter) > 0 for s in signals]
+        self.assertEqual(expected, [True, False, False, False])
+        self.assertEqual(cross_validated(signals, sources).tolist(), expected)
+        self.assertEqual(cross_validated(signals[:1], [other]).tolist(), [False])
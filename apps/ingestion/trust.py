@@ -10,6 +10,17 @@ class TrustCalculator:
     Trust calculator.
     """
     BASE_SCORE = 50
+    VERIFIED_BONUS = 20
+    PHOTO_BONUS = 15
+    VIDEO_BONUS = 15
+    LOCATION_BONUS = 10
+    CROSS_VALIDATION_BONUS = 25
+    CROSS_VALIDATION_RADIUS_M = 500
+    CROSS_VALIDATION_WINDOW = timedelta(minutes=10)
+    # Signals typed by the keyword classifier carry its confidence
+    LOW_CONFIDENCE_THRESHOLD = 0.5
+    LOW_CONFIDENCE_PENALTY = 20
+
     def calculate(self, signal: NormalizedSignal, source: Source) -> int:
         """
         Apply trust scoring rules.
@@ -29,6 +40,7 @@ class TrustCalculator:
             "video_bonus": self._video_bonus(signal),
             "location_bonus": self._location_bonus(signal),
             "cross_validation_bonus": self._cross_validation_bonus(signal, source),
+            "type_confidence_penalty": self._type_confidence_penalty(signal),
         }
 
     def _verified_bonus(self, source: Source) -> int:
@@ -36,7 +48,7 @@ class TrustCalculator:
         Bonus for verified sources.
         """
         if source.verified:
-            return 20
+            return self.VERIFIED_BONUS
         return 0
     
     def _photo_bonus(self, signal: NormalizedSignal) -> int:
@@ -44,7 +56,7 @@ class TrustCalculator:
         Bonus for photo upload in signal.
         """
         if signal.additional_data.get('has_photo', False):
-            return 15
+            return self.PHOTO_BONUS
         return 0
     
     def _video_bonus(self, signal: NormalizedSignal) -> int:
@@ -52,7 +64,7 @@ class TrustCalculator:
         Bonus for video upload in signal.
         """
         if signal.additional_data.get('has_video', False):
-            return 15
+            return self.VIDEO_BONUS
         return 0
     
     def _location_bonus(self, signal: NormalizedSignal) -> int:
@@ -60,9 +72,19 @@ class TrustCalculator:
         Bonus for location in signal.
         """
         if signal.location is not None:
-            return 10
+            return self.LOCATION_BONUS
         return 0
     
+    def _type_confidence_penalty(self, signal: NormalizedSignal) -> int:
+        """
+        Penalty for a signal type the classifier was unsure about. Signals
+        typed by their source carry no confidence and are not penalised.
+        """
+        confidence = (signal.additional_data or {}).get('type_confidence')
+        if confidence is not None and confidence < self.LOW_CONFIDENCE_THRESHOLD:
+            return -self.LOW_CONFIDENCE_PENALTY
+        return 0
+
     def _cross_validation_bonus(self, signal: NormalizedSignal, source: Source) -> int:
         """
         Bonus for cross validation.
@@ -75,13 +97,13 @@ class TrustCalculator:
 
         if Signal.objects.filter(
             signal_type=signal.signal_type,
-            location__distance_lte=(signal.location, D(m=500)),
+            location__distance_lte=(signal.location, D(m=self.CROSS_VALIDATION_RADIUS_M)),
             occurred_at__range=(
-                signal.timestamp - timedelta(minutes=10),
-                signal.timestamp + timedelta(minutes=10)
+                signal.timestamp - self.CROSS_VALIDATION_WINDOW,
+                signal.timestamp + self.CROSS_VALIDATION_WINDOW
             )
         ).exclude(source=source).exists():
-            return 25
+            return self.CROSS_VALIDATION_BONUS
         return 0
     
     @staticmethod
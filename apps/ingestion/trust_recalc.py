@@ -0,0 +1,175 @@
+"""
+Set-based recalculation of source trust scores.
+
+A source's trust score is the trust rule score of its most recently
+ingested signal. recalculate_trust reads the rule columns (see
+apps.ingestion.trust_rules) of that signal for every source in SQL, a
+chunk of sources per statement, and scores the chunk with the same
+compiled rules as ingestion, so TRUST_RULES_FILE applies here too.
+
+Photo and video flags are read from the signal's source_metadata with
+Python truthiness, and the classifier's type_confidence (absent for
+signals typed by their source) as a number. Cross-validation sees every
+signal stored now, not only those present when the signal was ingested.
+Sources without signals are left alone.
+
+Changed scores are written with one UPDATE per chunk, and their history
+rows with one record_trust_changes call.
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+from django.db import connection, transaction
+
+from apps.ingestion.trust import TrustCalculator
+from apps.ingestion.trust_rules import BOOLEAN_COLUMNS, get_evaluator
+from apps.sources.trust_history import record_trust_changes
+
+logger = logging.getLogger(__name__)
+
+CHANGED_BY = 'recalculate_trust'
+
+# JSON values Python treats as false
+_FALSY_JSON = "('false', 'null', '0', '\"\"', '[]', '{}')"
+
+
+def _flag(key: str) -> str:
+    value = f"s.source_metadata -> '{key}'"
+    return f'({value} IS NOT NULL AND {value} NOT IN {_FALSY_JSON})'
+
+
+SCORE_SQL = f"""
+    WITH chunk AS (
+        SELECT id, verified, trust_score FROM sources_source
+        WHERE id > %(after)s
+        ORDER BY id
+        LIMIT %(limit)s
+    )
+    SELECT
+        chunk.id,
+        chunk.trust_score,
+        s.source_id IS NOT NULL,
+        chunk.verified,
+        {_flag('has_photo')},
+        {_flag('has_video')},
+        s.location IS NOT NULL,
+        EXISTS (
+            SELECT 1 FROM signals_signal o
+            WHERE o.signal_type = s.signal_type
+              AND o.source_id <> s.source_id
+              AND o.occurred_at BETWEEN s.occurred_at - %(window)s AND s.occurred_at + %(window)s
+              AND o.location && ST_Expand(
+                  s.location,
+                  %(radius_deg)s / GREATEST(cos(radians(ST_Y(s.location))), 0.01),
+                  %(radius_deg)s
+              )
+              AND ST_DistanceSphere(o.location, s.location) <= %(radius)s
+        ),
+        (s.source_metadata ->> 'type_confidence')::float
+    FROM chunk
+    LEFT JOIN LATERAL (
+        SELECT source_id, signal_type, location, occurred_at, source_metadata
+        FROM signals_signal
+        WHERE source_id = chunk.id
+        ORDER BY created_at DESC, id DESC
+        LIMIT 1
+    ) s ON true
+    ORDER BY chunk.id
+"""
+
+APPLY_SQL = """
+    UPDATE sources_source src
+    SET trust_score = c.score, updated_at = now()
+    FROM unnest(%(ids)s::uuid[], %(scores)s::smallint[]) AS c(id, score)
+    WHERE src.id = c.id
+"""
+
+
+@dataclass
+class RecalculationResult:
+    scored: int = 0
+    changed: int = 0
+    before: Counter = field(default_factory=Counter)
+    after: Counter = field(default_factory=Counter)
+
+
+def score_bucket(score: int) -> int:
+    """
+    Lower bound of the 10-point bucket a score falls in (100 joins 90).
+    """
+    return min(score // 10 * 10, 90)
+
+
+def _score_params(after, limit):
+    calc = TrustCalculator
+    # Radius in degrees of latitude, taking a degree as 110 km (slightly
+    # short) so the bounding box always contains the radius
+    radius_deg = calc.CROSS_VALIDATION_RADIUS_M / 110000.0
+    return {
+        'after': after,
+        'limit': limit,
+        'window': calc.CROSS_VALIDATION_WINDOW,
+        'radius': calc.CROSS_VALIDATION_RADIUS_M,
+        'radius_deg': radius_deg,
+    }
+
+
+def _score_rows(evaluator, rows):
+    """
+    Scores of the rule column rows (verified, has_photo, has_video,
+    has_location, cross_validated, type_confidence) of SCORE_SQL.
+    """
+    columns = {
+        name: np.array([row[i] for row in rows], dtype=bool)
+        for i, name in enumerate(BOOLEAN_COLUMNS)
+    }
+    columns['type_confidence'] = np.array(
+        [np.nan if row[5] is None else row[5] for row in rows], dtype=np.float64,
+    )
+    return evaluator.evaluate(columns).scores.tolist()
+
+
+def recalculate_trust(batch_size=1000, dry_run=False, progress=None) -> RecalculationResult:
+    """
+    Recompute every source's trust score. With dry_run nothing is written
+    and the result only carries the before/after score distributions.
+    """
+    result = RecalculationResult()
+    evaluator = get_evaluator()
+    after = '00000000-0000-0000-0000-000000000000'
+
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(SCORE_SQL, _score_params(after, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            with_signal = [row for row in rows if row[2]]
+            scores = _score_rows(evaluator, [row[3:] for row in with_signal]) if with_signal else []
+            scored = [(row[0], row[1], new) for row, new in zip(with_signal, scores)]
+            changed = [(source_id, new) for source_id, old, new in scored if old != new]
+            if changed and not dry_run:
+                cursor.execute(APPLY_SQL, {
+                    'ids': [source_id for source_id, _ in changed],
+                    'scores': [score for _, score in changed],
+                })
+                record_trust_changes(changed, 'Bulk trust recalculation', CHANGED_BY)
+
+        for _, old, new in scored:
+            result.before[score_bucket(old)] += 1
+            result.after[score_bucket(new)] += 1
+        result.scored += len(scored)
+        result.changed += len(changed)
+        if progress:
+            progress(result)
+        after = rows[-1][0]
+
+    logger.info(
+        f"Trust recalculation {'(dry run) ' if dry_run else ''}"
+        f"scored {result.scored} sources, {result.changed} changed",
+        extra={'scored': result.scored, 'changed': result.changed, 'dry_run': dry_run},
+    )
+    return result
@@ -0,0 +1,354 @@
+"""
+Declarative trust rules evaluated a chunk of signals at a time.
+
+A rule set is a list of rules, each a name, a weight and an optional
+condition (a rule without one always applies):
+
+    {"name": "photo_bonus", "when": "has_photo", "weight": 15}
+    {"name": "type_confidence_penalty",
+     "when": {"column": "type_confidence", "op": "lt", "value": 0.5},
+     "weight": -20}
+
+A condition is a boolean column name, a comparison of a numeric column
+({"column", "op": lt/le/gt/ge/eq/ne, "value"}), or {"not": condition},
+{"all": [conditions]} or {"any": [conditions]}. Missing numeric values
+are NaN and fail every comparison.
+
+The columns available per signal are:
+
+    verified         the source is verified
+    has_photo        additional_data has a truthy has_photo
+    has_video        additional_data has a truthy has_video
+    has_location     the signal has a location
+    cross_validated  another source reported the same type nearby in time
+                     (TrustCalculator.CROSS_VALIDATION_RADIUS_M and _WINDOW)
+    type_confidence  the classifier's confidence, NaN when absent
+
+RuleSet.compile turns the rules into a BatchEvaluator of numpy
+functions. Evaluating a chunk gives the clamped scores, the contribution
+of every rule as an int16 array and a bitmask of the rules that fired.
+DEFAULT_RULES are the TrustCalculator rules and give the same scores;
+TRUST_RULES_FILE replaces them with a JSON list.
+
+Ingestion scores each chunk of signals with a ChunkScorer before storing
+it, and backfill_signal_trust and recalculate_trust score stored signals
+with the same compiled rules.
+"""
+
+import json
+import operator
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+from apps.ingestion.trust import TrustCalculator
+from apps.signals.incidents import distance_m
+
+# Rules fit in the bitmask stored with each signal
+MAX_RULES = 31
+
+BOOLEAN_COLUMNS = ('verified', 'has_photo', 'has_video', 'has_location', 'cross_validated')
+NUMERIC_COLUMNS = ('type_confidence',)
+
+_OPS = {
+    'lt': operator.lt,
+    'le': operator.le,
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'eq': operator.eq,
+    'ne': operator.ne,
+}
+
+DEFAULT_RULES = [
+    {'name': 'base', 'weight': TrustCalculator.BASE_SCORE},
+    {'name': 'verified_bonus', 'when': 'verified', 'weight': TrustCalculator.VERIFIED_BONUS},
+    {'name': 'photo_bonus', 'when': 'has_photo', 'weight': TrustCalculator.PHOTO_BONUS},
+    {'name': 'video_bonus', 'when': 'has_video', 'weight': TrustCalculator.VIDEO_BONUS},
+    {'name': 'location_bonus', 'when': 'has_location', 'weight': TrustCalculator.LOCATION_BONUS},
+    {
+        'name': 'cross_validation_bonus',
+        'when': 'cross_validated',
+        'weight': TrustCalculator.CROSS_VALIDATION_BONUS,
+    },
+    {
+        'name': 'type_confidence_penalty',
+        'when': {'column': 'type_confidence', 'op': 'lt', 'value': TrustCalculator.LOW_CONFIDENCE_THRESHOLD},
+        'weight': -TrustCalculator.LOW_CONFIDENCE_PENALTY,
+    },
+]
+
+# Signals of each row that another source cross-validates, by the same
+# rules as TrustCalculator._cross_validation_bonus; the bounding box
+# (a degree of latitude taken as 110 km) only lets the index narrow it
+CROSS_VALIDATED_SQL = """
+    SELECT c.i
+    FROM unnest(
+        %(types)s::text[], %(lons)s::float8[], %(lats)s::float8[],
+        %(times)s::timestamptz[], %(sources)s::uuid[]
+    ) WITH ORDINALITY AS c(signal_type, lon, lat, occurred_at, source_id, i)
+    WHERE EXISTS (
+        SELECT 1 FROM signals_signal o
+        WHERE o.signal_type = c.signal_type
+          AND o.source_id <> c.source_id
+          AND o.occurred_at BETWEEN c.occurred_at - %(window)s AND c.occurred_at + %(window)s
+          AND o.location && ST_Expand(
+              ST_SetSRID(ST_MakePoint(c.lon, c.lat), 4326),
+              %(radius_deg)s / GREATEST(cos(radians(c.lat)), 0.01),
+              %(radius_deg)s
+          )
+          AND ST_DistanceSphere(o.location, ST_SetSRID(ST_MakePoint(c.lon, c.lat), 4326)) <= %(radius)s
+    )
+"""
+
+
+@dataclass
+class TrustScores:
+    """
+    Scores of a chunk of signals with the contribution of every rule.
+    """
+    scores: np.ndarray
+    contributions: Dict[str, np.ndarray]
+    bitmask: np.ndarray
+
+    def __len__(self):
+        return len(self.scores)
+
+    def breakdown(self, i: int) -> dict:
+        """
+        The contributions to signal i, as TrustCalculator.get_score_breakdown.
+        """
+        return {name: int(values[i]) for name, values in self.contributions.items()}
+
+
+class BatchEvaluator:
+    """
+    Compiled rule set.
+    """
+
+    def __init__(self, names: List[str], weights: List[int], conditions: List):
+        self.names = names
+        self.weights = np.asarray(weights, dtype=np.int16)
+        self.conditions = conditions
+
+    def evaluate(self, columns: Dict[str, np.ndarray]) -> TrustScores:
+        size = len(next(iter(columns.values()))) if columns else 0
+        fired = np.zeros((len(self.names), size), dtype=bool)
+        for i, condition in enumerate(self.conditions):
+            fired[i] = True if condition is None else condition(columns)
+        contributions = np.where(fired, self.weights[:, None], 0).astype(np.int16)
+        raw = contributions.sum(axis=0, dtype=np.int32)
+        shifts = np.arange(len(self.names), dtype=np.uint32)[:, None]
+        return TrustScores(
+            scores=np.clip(raw, 0, 100).astype(np.int16),
+            contributions=dict(zip(self.names, contributions)),
+            bitmask=np.bitwise_or.reduce(fired.astype(np.uint32) << shifts, axis=0),
+        )
+
+    def rule_names(self, bitmask: int) -> List[str]:
+        """
+        Names of the rules set in a bitmask, such as Signal.trust_breakdown.
+        """
+        return [name for i, name in enumerate(self.names) if bitmask >> i & 1]
+
+
+class RuleSet:
+    """
+    Validated declarative rules.
+    """
+
+    def __init__(self, rules: Sequence[dict]):
+        rules = list(rules)
+        if len(rules) > MAX_RULES:
+            raise ValueError(f'At most {MAX_RULES} trust rules are supported, got {len(rules)}')
+        names = [rule['name'] for rule in rules]
+        if len(set(names)) != len(names):
+            raise ValueError('Trust rule names must be unique')
+        for rule in rules:
+            if not isinstance(rule.get('weight'), int):
+                raise ValueError(f"Trust rule {rule['name']} needs an integer weight")
+            if 'when' in rule:
+                self._check(rule['when'], rule['name'])
+        self.rules = rules
+
+    @classmethod
+    def from_file(cls, path) -> 'RuleSet':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _check(self, condition, rule_name):
+        if isinstance(condition, str):
+            if condition not in BOOLEAN_COLUMNS:
+                raise ValueError(f'Trust rule {rule_name}: unknown boolean column {condition!r}')
+        elif 'column' in condition:
+            if condition['column'] not in NUMERIC_COLUMNS:
+                raise ValueError(f"Trust rule {rule_name}: unknown numeric column {condition['column']!r}")
+            if condition.get('op') not in _OPS:
+                raise ValueError(f"Trust rule {rule_name}: unknown operator {condition.get('op')!r}")
+        elif 'not' in condition:
+            self._check(condition['not'], rule_name)
+        elif 'all' in condition or 'any' in condition:
+            for part in condition.get('all', condition.get('any')):
+                self._check(part, rule_name)
+        else:
+            raise ValueError(f'Trust rule {rule_name}: invalid condition {condition!r}')
+
+    def _compile(self, condition):
+        if isinstance(condition, str):
+            return lambda columns: columns[condition]
+        if 'column' in condition:
+            op, column, value = _OPS[condition['op']], condition['column'], condition['value']
+            return lambda columns: op(columns[column], value) & ~np.isnan(columns[column])
+        if 'not' in condition:
+            inner = self._compile(condition['not'])
+            return lambda columns: ~inner(columns)
+        parts = [self._compile(part) for part in condition.get('all', condition.get('any'))]
+        combine = np.logical_and if 'all' in condition else np.logical_or
+        return lambda columns: combine.reduce([part(columns) for part in parts])
+
+    def compile(self) -> BatchEvaluator:
+        return BatchEvaluator(
+            [rule['name'] for rule in self.rules],
+            [rule['weight'] for rule in self.rules],
+            [self._compile(rule['when']) if 'when' in rule else None for rule in self.rules],
+        )
+
+
+def cross_validated(signals, sources) -> np.ndarray:
+    """
+    Whether each normalized signal is cross-validated by another source,
+    in one query for the chunk.
+    """
+    flags = np.zeros(len(signals), dtype=bool)
+    rows = [
+        (i, signal, source) for i, (signal, source) in enumerate(zip(signals, sources))
+        if signal.location and signal.timestamp
+    ]
+    if not rows:
+        return flags
+    calc = TrustCalculator
+    with connection.cursor() as cursor:
+        cursor.execute(CROSS_VALIDATED_SQL, {
+            'types': [getattr(s.signal_type, 'value', s.signal_type) for _, s, _ in rows],
+            'lons': [s.location.x for _, s, _ in rows],
+            'lats': [s.location.y for _, s, _ in rows],
+            'times': [s.timestamp for _, s, _ in rows],
+            'sources': [source.id for _, _, source in rows],
+            'window': calc.CROSS_VALIDATION_WINDOW,
+            'radius': calc.CROSS_VALIDATION_RADIUS_M,
+            'radius_deg': calc.CROSS_VALIDATION_RADIUS_M / 110000.0,
+        })
+        for (ordinal,) in cursor.fetchall():
+            flags[rows[ordinal - 1][0]] = True
+    return flags
+
+
+def signal_columns(signals, sources, cross_validated_flags=None) -> Dict[str, np.ndarray]:
+    """
+    Rule columns of normalized signals and their sources. Cross-validation
+    is queried unless given.
+    """
+    size = len(signals)
+    data = [signal.additional_data or {} for signal in signals]
+    confidences = [d.get('type_confidence') for d in data]
+    return {
+        'verified': np.fromiter((bool(source.verified) for source in sources), dtype=bool, count=size),
+        'has_photo': np.fromiter((bool(d.get('has_photo', False)) for d in data), dtype=bool, count=size),
+        'has_video': np.fromiter((bool(d.get('has_video', False)) for d in data), dtype=bool, count=size),
+        'has_location': np.fromiter((s.location is not None for s in signals), dtype=bool, count=size),
+        'cross_validated': (
+            cross_validated(signals, sources) if cross_validated_flags is None
+            else np.asarray(cross_validated_flags, dtype=bool)
+        ),
+        'type_confidence': np.array(
+            [np.nan if c is None else float(c) for c in confidences], dtype=np.float64,
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def get_evaluator() -> BatchEvaluator:
+    """
+    The compiled rules of TRUST_RULES_FILE, or the defaults.
+    """
+    if settings.TRUST_RULES_FILE:
+        return RuleSet.from_file(settings.TRUST_RULES_FILE).compile()
+    return RuleSet(DEFAULT_RULES).compile()
+
+
+def score_batch(signals, sources, evaluator: BatchEvaluator = None) -> TrustScores:
+    """
+    Score a chunk of normalized signals, each with its source.
+    """
+    evaluator = evaluator or get_evaluator()
+    return evaluator.evaluate(signal_columns(signals, sources))
+
+
+class ChunkScorer:
+    """
+    Scores of a chunk of signals that are stored one after another.
+
+    The chunk is scored up front, with one cross-validation query, before
+    any of it is stored. A signal scored on its own just before its
+    insert would also be cross-validated by the signals of the chunk
+    stored before it, so those are recorded with stored() and checked
+    here: score() picks between the chunk evaluated as queried and as
+    cross-validated, which gives the same result as scoring each signal
+    in turn.
+    """
+
+    def __init__(self, signals, sources, evaluator: BatchEvaluator = None):
+        evaluator = evaluator or get_evaluator()
+        columns = signal_columns(signals, sources)
+        self.signals = signals
+        self.sources = sources
+        self.queried = columns['cross_validated']
+        self.as_queried = evaluator.evaluate(columns)
+        self.as_cross_validated = evaluator.evaluate(
+            {**columns, 'cross_validated': np.ones(len(signals), dtype=bool)}
+        )
+        # signal type -> [(lon, lat, seconds, source id)] of stored signals
+        self._stored = defaultdict(list)
+        self._window = TrustCalculator.CROSS_VALIDATION_WINDOW.total_seconds()
+
+    def __len__(self):
+        return len(self.signals)
+
+    def _key(self, i):
+        signal = self.signals[i]
+        return getattr(signal.signal_type, 'value', signal.signal_type)
+
+    def stored(self, i: int):
+        """
+        Record that signal i was stored.
+        """
+        signal = self.signals[i]
+        if signal.location and signal.timestamp:
+            self._stored[self._key(i)].append(
+                (signal.location.x, signal.location.y, signal.timestamp.timestamp(), self.sources[i].id)
+            )
+
+    def _cross_validated_in_chunk(self, i) -> bool:
+        signal = self.signals[i]
+        if not signal.location or not signal.timestamp:
+            return False
+        lon, lat, seconds = signal.location.x, signal.location.y, signal.timestamp.timestamp()
+        source_id = self.sources[i].id
+        return any(
+            other_source != source_id
+            and abs(other_seconds - seconds) <= self._window
+            and distance_m(lon, lat, other_lon, other_lat) <= TrustCalculator.CROSS_VALIDATION_RADIUS_M
+            for other_lon, other_lat, other_seconds, other_source in self._stored[self._key(i)]
+        )
+
+    def score(self, i: int):
+        """
+        (score, rule bitmask) of signal i, given the signals stored so far.
+        """
+        cross_validated = self.queried[i] or self._cross_validated_in_chunk(i)
+        trust = self.as_cross_validated if cross_validated else self.as_queried
+        return int(trust.scores[i]), int(trust.bitmask[i])
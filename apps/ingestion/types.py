@@ -31,6 +31,8 @@ class RawSignal:
     location: Optional[Point]
     has_photo: bool = False
     has_video: bool = False
+    type_confidence: Optional[float] = None  # set when signal_type was inferred
+    place: Optional[str] = None  # gazetteer name when location was geocoded
 
 @dataclass
 class NormalizedSignal:
@@ -0,0 +1,137 @@
+"""
+Store workers consuming published signal batches.
+
+Each worker thread owns an IngestionCoordinator, since its incident and
+geofence state is not shared between threads, and its own database
+connection. Incidents other workers create are found through the
+database (see apps.signals.incidents.assign_incident). A batch is
+acknowledged once stored; if storing raises it is released for
+redelivery after INGESTION_QUEUE_RETRY_SECONDS, and signals it already
+stored come back as duplicates. A batch that fails its last attempt, or
+whose last worker died, is moved into quarantine instead, the latter
+whenever a worker finds the queue idle.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from apps.ingestion.quarantine import quarantine_exhausted
+from apps.ingestion.queue import RAW_SIGNALS_TOPIC, get_queue
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkerStats:
+    processed: int = 0
+    failed: int = 0
+    quarantined: int = 0
+    # Batches moved into quarantine after their last delivery attempt
+    exhausted: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, processed=0, failed=0, quarantined=0, exhausted=0):
+        with self.lock:
+            self.processed += processed
+            self.failed += failed
+            self.quarantined += quarantined
+            self.exhausted += exhausted
+
+
+def _dead_letter(messages, stats):
+    quarantined = quarantine_exhausted(messages)
+    stats.add(quarantined=quarantined, exhausted=len(messages))
+
+
+def _work(queue, stats, stop, drain, poll_interval):
+    # Imported here: the coordinator builds adapters, which read settings
+    from apps.ingestion.coordinator import IngestionCoordinator
+
+    coordinator = IngestionCoordinator()
+    try:
+        while not stop.is_set():
+            messages = queue.consume(RAW_SIGNALS_TOPIC)
+            if not messages:
+                # Removed and quarantined together, so a batch is never lost
+                with transaction.atomic():
+                    exhausted = queue.take_exhausted(RAW_SIGNALS_TOPIC)
+                    if exhausted:
+                        _dead_letter(exhausted, stats)
+                if exhausted:
+                    continue
+                if drain and queue.pending(RAW_SIGNALS_TOPIC) == 0:
+                    return
+                stop.wait(poll_interval)
+                continue
+            for message in messages:
+                try:
+                    summary = coordinator.process_message(message)
+                except Exception as e:
+                    logger.error(
+                        f"Queued batch {message.id} failed (attempt {message.attempts})",
+                        exc_info=True,
+                        extra={
+                            'message_id': str(message.id),
+                            'attempts': message.attempts,
+                            'error_type': type(e).__name__,
+                            'error_message': str(e),
+                        },
+                    )
+                    error = f'{type(e).__name__}: {e}'
+                    stats.add(failed=1)
+                    if message.attempts >= queue.max_attempts:
+                        message.last_error = error
+                        with transaction.atomic():
+                            _dead_letter([message], stats)
+                            queue.ack([message])
+                    else:
+                        queue.release(message, error=error, delay=settings.INGESTION_QUEUE_RETRY_SECONDS)
+                else:
+                    queue.ack([message])
+                    stats.add(processed=1, quarantined=summary['quarantined'])
+    finally:
+        connection.close()
+
+
+def run_store_workers(workers=1, drain=True, poll_interval=1.0, queue=None, stop=None) -> WorkerStats:
+    """
+    Run store worker threads until the queue is drained (with drain) or
+    stop is set. Returns batch counts.
+    """
+    queue = queue or get_queue()
+    stop = stop or threading.Event()
+    stats = WorkerStats()
+    threads = [
+        threading.Thread(
+            target=_work,
+            args=(queue, stats, stop, drain, poll_interval),
+            name=f'store-worker-{i}',
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1.0)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    logger.info(
+        f"Store workers finished: {stats.processed} batches stored, {stats.failed} failed, "
+        f"{stats.exhausted} given up, {stats.quarantined} signals quarantined",
+        extra={
+            'processed': stats.processed,
+            'failed': stats.failed,
+            'exhausted': stats.exhausted,
+            'quarantined': stats.quarantined,
+        },
+    )
+    return stats
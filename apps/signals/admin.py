@@ -1,9 +1,12 @@
 from django.contrib.gis import admin as gis_admin
+
+from apps.admin_utils import LargeTableAdminMixin
 from .models import Signal
+from .search import search_query
 
 
 @gis_admin.register(Signal)
-class SignalAdmin(gis_admin.GISModelAdmin):
+class SignalAdmin(LargeTableAdminMixin, gis_admin.GISModelAdmin):
     list_display = [
         'id',
         'signal_type',
@@ -16,16 +19,28 @@ class SignalAdmin(gis_admin.GISModelAdmin):
         'signal_type',
         'source__platform',
     ]
+    list_select_related = ['source']
     date_hierarchy = 'occurred_at'
+    # Exact and prefix lookups only: content is searched through its
+    # full-text index in get_search_results
     search_fields = [
-        'content',
-        'dedup_hash',
+        '=dedup_hash',
+        '^source__external_identifier',
     ]
     readonly_fields = [
         'dedup_hash',
         'created_at',
     ]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('search_vector')
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            results |= queryset.filter(search_vector=search_query(search_term))
+        return results, may_have_duplicates
+
     def location_display(self, obj):
         if obj.location:
             lat = obj.location.y
@@ -0,0 +1,110 @@
+"""
+Streaming export of signals as NDJSON or GeoJSON.
+
+Rows are read through a server-side cursor (QuerySet.iterator on
+PostgreSQL declares a named cursor) and encoded one at a time, so memory
+stays flat however many signals match. Output is grouped into chunks of
+roughly EXPORT_BUFFER_BYTES before being handed to the writer.
+"""
+
+import json
+
+from django.conf import settings
+from django.db.models import F, FloatField, Func
+
+from apps.db_router import read_alias
+from apps.signals.models import Signal
+
+EXPORT_FIELDS = ('id', 'signal_type', 'content', 'occurred_at', 'source_id', 'created_at')
+
+
+def with_coordinates(queryset):
+    """
+    Annotate lon/lat computed in the database, so exports can read
+    coordinates without building GEOS geometries.
+    """
+    return queryset.annotate(
+        lon=Func(F('location'), function='ST_X', output_field=FloatField()),
+        lat=Func(F('location'), function='ST_Y', output_field=FloatField()),
+    )
+
+
+def export_rows(signal_filter, chunk_size=None):
+    """
+    Iterate over matching signals as plain dicts, without building GEOS
+    geometries or model instances.
+    """
+    # Pick the database now: the rows are read while the response streams,
+    # after ReplicaReadMiddleware has returned
+    queryset = with_coordinates(
+        signal_filter.apply(Signal.objects.using(read_alias()))
+    ).values(*EXPORT_FIELDS, 'lon', 'lat')
+    return queryset.iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE)
+
+
+def _properties(row):
+    return {
+        'id': str(row['id']),
+        'signal_type': row['signal_type'],
+        'content': row['content'],
+        'occurred_at': row['occurred_at'].isoformat(),
+        'source': str(row['source_id']),
+        'created_at': row['created_at'].isoformat(),
+    }
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        record = _properties(row)
+        record['lon'] = row['lon']
+        record['lat'] = row['lat']
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def _geojson_parts(rows):
+    yield '{"type": "FeatureCollection", "features": ['
+    separator = ''
+    for row in rows:
+        feature = {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [row['lon'], row['lat']]},
+            'properties': _properties(row),
+        }
+        yield separator + json.dumps(feature, ensure_ascii=False)
+        separator = ','
+    yield ']}\n'
+
+
+def _buffered(parts, size):
+    buffer = []
+    length = 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+EXPORT_FORMATS = {
+    'ndjson': (_ndjson_lines, 'application/x-ndjson'),
+    'geojson': (_geojson_parts, 'application/geo+json'),
+}
+
+
+def stream_export(signal_filter, export_format, chunk_size=None):
+    """
+    Yield the encoded export in chunks of text.
+    Raises ValueError for an unknown format.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    encode, _ = EXPORT_FORMATS[export_format]
+    return _buffered(encode(export_rows(signal_filter, chunk_size)), settings.EXPORT_BUFFER_BYTES)
+
+
+def content_type_for(export_format):
+    return EXPORT_FORMATS[export_format][1]
@@ -0,0 +1,162 @@
+"""
+Query filters shared by the signal read endpoints.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import Optional, Tuple
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+@dataclass(frozen=True)
+class SignalFilter:
+    """
+    Parsed signal filters.
+
+    Built from query parameters:
+        type       comma-separated signal types (``robbery,assault``)
+        since      ISO 8601 lower bound on occurred_at (inclusive)
+        until      ISO 8601 upper bound on occurred_at (exclusive)
+        bbox       ``min_lon,min_lat,max_lon,max_lat`` in EPSG:4326
+        min_trust  lower bound on the signal's own trust_score (0-100);
+                   signals not yet scored never match
+    """
+    types: Tuple[str, ...] = ()
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    min_trust: Optional[int] = None
+
+    @classmethod
+    def from_params(cls, params) -> 'SignalFilter':
+        """
+        Parse filters from a QueryDict (or any mapping).
+        Raises ValueError on malformed input.
+        """
+        from apps.signals.models import Signal
+
+        types = ()
+        raw_types = params.get('type')
+        if raw_types:
+            valid = {value for value, _ in Signal.SIGNAL_TYPES}
+            types = tuple(sorted({t.strip() for t in raw_types.split(',') if t.strip()}))
+            unknown = [t for t in types if t not in valid]
+            if unknown:
+                raise ValueError(f"Unknown signal type(s): {', '.join(unknown)}")
+
+        since = cls._parse_time(params.get('since'), 'since')
+        until = cls._parse_time(params.get('until'), 'until')
+        if since and until and since >= until:
+            raise ValueError("'since' must be earlier than 'until'")
+
+        bbox = None
+        raw_bbox = params.get('bbox')
+        if raw_bbox:
+            try:
+                bbox = tuple(float(v) for v in raw_bbox.split(','))
+            except ValueError:
+                raise ValueError("'bbox' must be four comma-separated numbers")
+            if len(bbox) != 4:
+                raise ValueError("'bbox' must be min_lon,min_lat,max_lon,max_lat")
+            if bbox[0] >= bbox[2] or bbox[1] >= bbox[3]:
+                raise ValueError("'bbox' minimums must be below its maximums")
+
+        min_trust = None
+        raw_min_trust = params.get('min_trust')
+        if raw_min_trust:
+            try:
+                min_trust = int(raw_min_trust)
+            except ValueError:
+                raise ValueError("'min_trust' must be an integer")
+            if not 0 <= min_trust <= 100:
+                raise ValueError("'min_trust' must be between 0 and 100")
+
+        return cls(types=types, since=since, until=until, bbox=bbox, min_trust=min_trust)
+
+    @staticmethod
+    def _parse_time(value, name):
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"'{name}' must be an ISO 8601 datetime")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed, dt_timezone.utc)
+        return parsed
+
+    def apply(self, queryset):
+        """
+        Apply the filters to a Signal queryset.
+        """
+        if self.types:
+            queryset = queryset.filter(signal_type__in=self.types)
+        if self.since:
+            queryset = queryset.filter(occurred_at__gte=self.since)
+        if self.until:
+            queryset = queryset.filter(occurred_at__lt=self.until)
+        if self.bbox:
+            from django.contrib.gis.geos import Polygon
+            queryset = queryset.filter(
+                location__intersects=Polygon.from_bbox(self.bbox)
+            )
+        if self.min_trust is not None:
+            queryset = queryset.filter(trust_score__gte=self.min_trust)
+        return queryset
+
+    def matches(self, signal_type, lon, lat, trust_score=None) -> bool:
+        """
+        Check one signal's type, position and trust score against the type,
+        bbox and trust filters (the time filters do not apply to live
+        signals).
+        """
+        if self.types and signal_type not in self.types:
+            return False
+        if self.min_trust is not None and (trust_score is None or trust_score < self.min_trust):
+            return False
+        if self.bbox:
+            if lon is None or lat is None:
+                return False
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+            return min_lon <= lon <= max_lon and min_lat <= lat <= max_lat
+        return True
+
+    def as_sql(self, alias='s'):
+        """
+        Render the filters as a SQL fragment and params for raw queries.
+        Returns ('', []) when no filter is set.
+        """
+        clauses = []
+        params = []
+        if self.types:
+            clauses.append(f'{alias}.signal_type = ANY(%s)')
+            params.append(list(self.types))
+        if self.since:
+            clauses.append(f'{alias}.occurred_at >= %s')
+            params.append(self.since)
+        if self.until:
+            clauses.append(f'{alias}.occurred_at < %s')
+            params.append(self.until)
+        if self.bbox:
+            clauses.append(f'{alias}.location && ST_MakeEnvelope(%s, %s, %s, %s, 4326)')
+            params.extend(self.bbox)
+        if self.min_trust is not None:
+            clauses.append(f'{alias}.trust_score >= %s')
+            params.append(self.min_trust)
+        return ' AND '.join(clauses), params
+
+    def cache_key(self) -> str:
+        """
+        Stable short digest of the filter values.
+        """
+        payload = json.dumps({
+            'types': self.types,
+            'since': self.since.isoformat() if self.since else None,
+            'until': self.until.isoformat() if self.until else None,
+            'bbox': self.bbox,
+            'min_trust': self.min_trust,
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
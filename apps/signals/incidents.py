@@ -0,0 +1,479 @@
+"""
+Incident clustering: grouping signals that report the same event.
+
+A signal joins the incident of its nearest already clustered neighbour of
+the same type that lies within the type's radius and time window
+(INCIDENT_THRESHOLDS), or starts a new incident. Distances are great-circle
+distances on the sphere ST_DistanceSphere uses.
+
+Neighbours are found through IncidentIndex, a hash grid keyed by signal
+type, latitude row, longitude column and time bucket, with cells one
+radius tall (and at least one radius wide) and buckets one window long.
+A lookup inspects the 3 x 3 x 3 block around the signal, so clustering n
+signals costs O(n) rather than comparing every pair.
+
+The ingestion coordinator assigns incidents as it stores signals, using an
+IncidentClusterer seeded from the database around each signal's time.
+Several store workers each have their own clusterer and never see each
+other's new incidents in memory, so when a signal finds no incident in
+memory assign_incident takes transaction-level advisory locks on the
+signal's 3 x 3 x 3 block of cells and looks for the incident in the
+database. Two signals close enough to share an incident have a cell in
+common in their blocks, so one waits for the other to commit and then
+finds its incident. recluster() reassigns a whole time range in bulk.
+"""
+
+import hashlib
+import logging
+import math
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.db import connection, transaction
+from django.db.models import DateTimeField, F, Value
+from django.db.models.functions import Greatest, Least
+
+from apps.signals.export import with_coordinates
+from apps.signals.models import Incident, Signal
+
+logger = logging.getLogger(__name__)
+
+# Sphere used by ST_DistanceSphere
+EARTH_RADIUS_M = 6370986.0
+METRES_PER_DEGREE = EARTH_RADIUS_M * math.pi / 180
+
+# First key of the advisory locks taken on index cells
+CELL_LOCK_NAMESPACE = 4120
+
+# Stored signals with an incident within a radius and window of a point;
+# the bounding box only lets the location index narrow the search
+NEIGHBOURS_SQL = """
+    SELECT ST_X(location), ST_Y(location), occurred_at, incident_id
+    FROM signals_signal
+    WHERE signal_type = %(signal_type)s
+      AND incident_id IS NOT NULL
+      AND occurred_at BETWEEN %(lower)s AND %(upper)s
+      AND location && ST_Expand(
+          ST_SetSRID(ST_MakePoint(%(lon)s, %(lat)s), 4326),
+          %(radius_deg)s / GREATEST(cos(radians(%(lat)s)), 0.01),
+          %(radius_deg)s
+      )
+      AND ST_DistanceSphere(location, ST_SetSRID(ST_MakePoint(%(lon)s, %(lat)s), 4326)) <= %(radius)s
+"""
+
+
+def thresholds(signal_type: str) -> Tuple[float, timedelta]:
+    """
+    (radius in metres, time window) within which signals of a type join
+    the same incident.
+    """
+    rules = settings.INCIDENT_THRESHOLDS
+    radius_m, minutes = rules.get(signal_type, rules['other'])
+    return float(radius_m), timedelta(minutes=minutes)
+
+
+def max_window() -> timedelta:
+    return max(timedelta(minutes=minutes) for _, minutes in settings.INCIDENT_THRESHOLDS.values())
+
+
+def distance_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """
+    Great-circle distance in metres (haversine).
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _type_value(signal_type) -> str:
+    # Adapters may pass SignalType members rather than their values
+    return getattr(signal_type, 'value', signal_type)
+
+
+class IncidentIndex:
+    """
+    Hash grid of clustered signals for neighbour lookups.
+    """
+
+    def __init__(self):
+        # (signal_type, row, col, bucket) -> [(lon, lat, seconds, incident_id)]
+        self._cells = {}
+        self._grids = {}
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._cells.values())
+
+    def _grid(self, signal_type):
+        """
+        (radius m, row height in degrees, window seconds) for a type.
+        """
+        if signal_type not in self._grids:
+            radius_m, window = thresholds(signal_type)
+            self._grids[signal_type] = (radius_m, radius_m / METRES_PER_DEGREE, window.total_seconds())
+        return self._grids[signal_type]
+
+    @staticmethod
+    def _col_width(row: int, height: float) -> float:
+        """
+        Column width in degrees of longitude for a row: one radius at the
+        most poleward latitude of the row and its neighbours, so a
+        neighbour within the radius is never more than a column away.
+        """
+        edge = min((max(abs(row), abs(row + 1)) + 1) * height, 89.0)
+        return height / max(math.cos(math.radians(edge)), 0.01)
+
+    def _key(self, signal_type, lon, lat, seconds):
+        _, height, window_s = self._grid(signal_type)
+        row = math.floor(lat / height)
+        col = math.floor(lon / self._col_width(row, height))
+        return signal_type, row, col, math.floor(seconds / window_s)
+
+    def add(self, signal_type: str, lon: float, lat: float, occurred_at: datetime, incident_id):
+        seconds = occurred_at.timestamp()
+        key = self._key(signal_type, lon, lat, seconds)
+        self._cells.setdefault(key, []).append((lon, lat, seconds, incident_id))
+
+    def neighbourhood(self, signal_type: str, lon: float, lat: float, occurred_at: datetime):
+        """
+        Keys of the 3 x 3 x 3 block of cells around a signal.
+        """
+        _, height, window_s = self._grid(signal_type)
+        row = math.floor(lat / height)
+        bucket = math.floor(occurred_at.timestamp() / window_s)
+        keys = []
+        for r in (row - 1, row, row + 1):
+            col = math.floor(lon / self._col_width(r, height))
+            for c in (col - 1, col, col + 1):
+                for b in (bucket - 1, bucket, bucket + 1):
+                    keys.append((signal_type, r, c, b))
+        return keys
+
+    def nearest(self, signal_type: str, lon: float, lat: float, occurred_at: datetime):
+        """
+        Incident of the closest indexed signal within the type's radius and
+        window (ties broken by time difference), or None.
+        """
+        radius_m, _, window_s = self._grid(signal_type)
+        seconds = occurred_at.timestamp()
+
+        best = None
+        best_incident = None
+        for key in self.neighbourhood(signal_type, lon, lat, occurred_at):
+            for e_lon, e_lat, e_seconds, incident_id in self._cells.get(key, ()):
+                dt = abs(e_seconds - seconds)
+                if dt > window_s:
+                    continue
+                d = distance_m(lon, lat, e_lon, e_lat)
+                if d <= radius_m and (best is None or (d, dt) < best):
+                    best = (d, dt)
+                    best_incident = incident_id
+        return best_incident
+
+    def prune(self, before: datetime) -> int:
+        """
+        Drop entries too old to match any signal at or after before.
+        """
+        cutoff = before.timestamp()
+        stale = [
+            key for key in self._cells
+            if (key[3] + 2) * self._grid(key[0])[2] <= cutoff
+        ]
+        for key in stale:
+            del self._cells[key]
+        return len(stale)
+
+
+class IncidentClusterer:
+    """
+    Matches signals against an IncidentIndex that is loaded from the
+    database on demand, covering max_window() around every signal seen.
+
+    With seed_before, only signals occurring before it are loaded (used by
+    recluster, which reassigns everything from there on).
+    """
+
+    def __init__(self, seed: bool = True, seed_before: datetime = None):
+        self.index = IncidentIndex()
+        self.seed = seed
+        self.seed_before = seed_before
+        self._window = max_window()
+        self._loaded = None
+
+    def _ensure_loaded(self, occurred_at: datetime):
+        if not self.seed:
+            return
+        lower, upper = occurred_at - self._window, occurred_at + self._window
+        if self.seed_before is not None:
+            upper = min(upper, self.seed_before)
+        if lower >= upper:
+            return
+
+        if self._loaded is None or lower > self._loaded[1] or upper < self._loaded[0]:
+            # Disjoint from what is loaded: everything stored so far is in
+            # the database, so start over around this signal
+            self.index = IncidentIndex()
+            self._loaded = (lower, upper)
+            self._load(lower, upper)
+            return
+
+        loaded_lower, loaded_upper = self._loaded
+        if lower < loaded_lower:
+            self._load(lower, loaded_lower)
+        if upper > loaded_upper:
+            self._load(loaded_upper, upper)
+        self._loaded = (min(lower, loaded_lower), max(upper, loaded_upper))
+
+    def _load(self, lower: datetime, upper: datetime):
+        rows = with_coordinates(
+            Signal.objects.filter(
+                occurred_at__gte=lower,
+                occurred_at__lt=upper,
+                incident__isnull=False,
+            ).order_by()
+        ).values_list('signal_type', 'lon', 'lat', 'occurred_at', 'incident_id')
+        for signal_type, lon, lat, occurred_at, incident_id in rows.iterator(chunk_size=5000):
+            self.index.add(signal_type, lon, lat, occurred_at, incident_id)
+
+    def match(self, signal_type, lon: float, lat: float, occurred_at: datetime):
+        self._ensure_loaded(occurred_at)
+        return self.index.nearest(_type_value(signal_type), lon, lat, occurred_at)
+
+    def add(self, signal_type, lon: float, lat: float, occurred_at: datetime, incident_id):
+        self.index.add(_type_value(signal_type), lon, lat, occurred_at, incident_id)
+
+    def match_stored(self, signal_type, lon: float, lat: float, occurred_at: datetime):
+        """
+        Match against the database after locking the signal's block of
+        cells until the end of the transaction, for incidents other
+        clusterers stored since this one loaded. Found signals are added to
+        the index.
+        """
+        signal_type = _type_value(signal_type)
+        radius_m, window = thresholds(signal_type)
+        block = self.index.neighbourhood(signal_type, lon, lat, occurred_at)
+        lock_keys = sorted({_cell_lock_key(key) for key in block})
+        with connection.cursor() as cursor:
+            # Taken in sorted order, so overlapping blocks cannot deadlock
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(%s, k) FROM unnest(%s::int[]) AS k',
+                [CELL_LOCK_NAMESPACE, lock_keys],
+            )
+            cursor.execute(NEIGHBOURS_SQL, {
+                'signal_type': signal_type,
+                'lower': occurred_at - window,
+                'upper': occurred_at + window,
+                'lon': lon,
+                'lat': lat,
+                'radius': radius_m,
+                # A degree taken as 110 km, so the box contains the radius
+                'radius_deg': radius_m / 110000.0,
+            })
+            rows = cursor.fetchall()
+        for e_lon, e_lat, e_occurred_at, incident_id in rows:
+            self.index.add(signal_type, e_lon, e_lat, e_occurred_at, incident_id)
+        return self.index.nearest(signal_type, lon, lat, occurred_at)
+
+
+def _cell_lock_key(key) -> int:
+    """
+    32-bit advisory lock key of an index cell.
+    """
+    digest = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def assign_incident(clusterer: IncidentClusterer, signal_type, location, occurred_at) -> Optional[uuid.UUID]:
+    """
+    Pick the incident for a signal about to be stored, creating it or
+    extending its counters. Call inside the transaction that stores the
+    signal, and clusterer.add once that transaction commits (an incident
+    indexed earlier outlives its row if the transaction rolls back).
+    A signal without a match in memory is matched against the database
+    under cell locks held until that transaction ends, so concurrent
+    workers join one incident rather than creating one each.
+    """
+    if location is None or occurred_at is None:
+        return None
+
+    incident_id = clusterer.match(signal_type, location.x, location.y, occurred_at)
+    if incident_id is None and clusterer.seed:
+        incident_id = clusterer.match_stored(signal_type, location.x, location.y, occurred_at)
+    if incident_id is None:
+        incident = Incident.objects.create(
+            signal_type=_type_value(signal_type),
+            location=location,
+            first_seen=occurred_at,
+            last_seen=occurred_at,
+            signal_count=1,
+        )
+        return incident.id
+
+    at = Value(occurred_at, output_field=DateTimeField())
+    Incident.objects.filter(pk=incident_id).update(
+        signal_count=F('signal_count') + 1,
+        first_seen=Least('first_seen', at),
+        last_seen=Greatest('last_seen', at),
+    )
+    return incident_id
+
+
+@dataclass
+class ReclusterResult:
+    signals: int = 0
+    incidents_created: int = 0
+    incidents_deleted: int = 0
+
+
+def _signal_batch(since, until, after, batch_size):
+    """
+    Next batch of (id, occurred_at, signal_type, lon, lat) in [since, until)
+    after the (occurred_at, id) keyset position.
+    """
+    clauses = []
+    params = []
+    if since is not None:
+        clauses.append('occurred_at >= %s')
+        params.append(since)
+    if until is not None:
+        clauses.append('occurred_at < %s')
+        params.append(until)
+    if after is not None:
+        clauses.append('(occurred_at, id) > (%s, %s)')
+        params.extend(after)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    params.append(batch_size)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT id, occurred_at, signal_type, ST_X(location), ST_Y(location)
+            FROM signals_signal
+            {where}
+            ORDER BY occurred_at, id
+            LIMIT %s
+            """,
+            params,
+        )
+        return cursor.fetchall()
+
+
+def _flush(assignments, new_incidents):
+    with transaction.atomic(), connection.cursor() as cursor:
+        Incident.objects.bulk_create(new_incidents)
+        cursor.execute(
+            """
+            UPDATE signals_signal s
+            SET incident_id = a.incident_id
+            FROM unnest(%s::uuid[], %s::timestamptz[], %s::uuid[]) AS a(id, occurred_at, incident_id)
+            WHERE s.id = a.id AND s.occurred_at = a.occurred_at
+              AND s.incident_id IS DISTINCT FROM a.incident_id
+            """,
+            [
+                [signal_id for signal_id, _, _ in assignments],
+                [occurred_at for _, occurred_at, _ in assignments],
+                [incident_id for _, _, incident_id in assignments],
+            ],
+        )
+
+
+def _refresh_incidents(since, until):
+    """
+    Recompute counters of incidents overlapping [since, until) and delete
+    the ones no signal refers to any more. Returns the number deleted.
+    """
+    clauses = []
+    params = []
+    if since is not None:
+        clauses.append('last_seen >= %s')
+        params.append(since)
+    if until is not None:
+        clauses.append('first_seen < %s')
+        params.append(until)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE signals_incident i
+            SET signal_count = a.signal_count, first_seen = a.first_seen, last_seen = a.last_seen
+            FROM (
+                SELECT incident_id, count(*) AS signal_count,
+                       min(occurred_at) AS first_seen, max(occurred_at) AS last_seen
+                FROM signals_signal
+                WHERE incident_id IN (SELECT id FROM signals_incident {where})
+                GROUP BY incident_id
+            ) a
+            WHERE i.id = a.incident_id
+            """,
+            params,
+        )
+        cursor.execute(
+            f"""
+            DELETE FROM signals_incident i
+            WHERE i.id IN (SELECT id FROM signals_incident {where})
+              AND NOT EXISTS (SELECT 1 FROM signals_signal s WHERE s.incident_id = i.id)
+            """,
+            params,
+        )
+        return cursor.rowcount
+
+
+def recluster(since: datetime = None, until: datetime = None, batch_size: int = 5000,
+              progress=None) -> ReclusterResult:
+    """
+    Reassign incidents for every signal in [since, until) (either bound
+    may be None), in occurred_at order. Signals just before since keep
+    their incidents and seed the index, so incidents continue across the
+    boundary. Signals stored concurrently may be left with their ingest-time
+    assignment; run while ingestion is paused for an exact result.
+    """
+    result = ReclusterResult()
+    clusterer = IncidentClusterer(seed=since is not None, seed_before=since)
+    position = None
+
+    while True:
+        rows = _signal_batch(since, until, position, batch_size)
+        if not rows:
+            break
+
+        assignments = []
+        new_incidents = []
+        for signal_id, occurred_at, signal_type, lon, lat in rows:
+            incident_id = clusterer.match(signal_type, lon, lat, occurred_at)
+            if incident_id is None:
+                incident_id = uuid.uuid4()
+                new_incidents.append(Incident(
+                    id=incident_id,
+                    signal_type=signal_type,
+                    location=Point(lon, lat, srid=4326),
+                    first_seen=occurred_at,
+                    last_seen=occurred_at,
+                ))
+            clusterer.add(signal_type, lon, lat, occurred_at, incident_id)
+            assignments.append((signal_id, occurred_at, incident_id))
+
+        _flush(assignments, new_incidents)
+        result.signals += len(assignments)
+        result.incidents_created += len(new_incidents)
+        position = (rows[-1][1], rows[-1][0])
+        clusterer.index.prune(position[0])
+        if progress:
+            progress(result)
+
+    window = max_window()
+    result.incidents_deleted = _refresh_incidents(
+        since - window if since is not None else None,
+        until + window if until is not None else None,
+    )
+    logger.info(
+        f"Reclustered {result.signals} signals: {result.incidents_created} incidents created, "
+        f"{result.incidents_deleted} deleted",
+        extra={'signals': result.signals},
+    )
+    return result
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.signals.models import Signal
+from apps.signals.retention import archive_rows, detach_partitions
+
+
+class Command(BaseCommand):
+    """
+    Age old signals out of the live signal table.
+    """
+    help = 'Archive signals older than the retention horizon, in small batches or by partition.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.SIGNAL_RETENTION_DAYS,
+            help='Retention horizon in days (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['rows', 'partitions'],
+            default='rows',
+            help='Move rows into the archive table, or detach whole monthly partitions',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--time-budget',
+            type=float,
+            default=300.0,
+            help='Stop after this many seconds; the next run continues (default: 300)',
+        )
+        parser.add_argument('--sleep', type=float, default=0.5, help='Seconds between batches')
+        parser.add_argument('--lock-timeout-ms', type=int, default=2000)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many signals are past the horizon',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        self.stdout.write(f'Retention cutoff: {cutoff.isoformat()}')
+
+        if options['dry_run']:
+            count = Signal.objects.filter(occurred_at__lt=cutoff).count()
+            self.stdout.write(f'{count} signals are older than the cutoff')
+            return
+
+        if options['mode'] == 'partitions':
+            result = detach_partitions(cutoff, lock_timeout_ms=options['lock_timeout_ms'])
+            for name in result.detached:
+                self.stdout.write(f'Detached {name}')
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(result.detached)} partitions detached, '
+                f'{result.keys_released} dedup keys released'
+            ))
+            return
+
+        result = archive_rows(
+            cutoff,
+            batch_size=options['batch_size'],
+            time_budget=options['time_budget'],
+            sleep=options['sleep'],
+            lock_timeout_ms=options['lock_timeout_ms'],
+            progress=lambda r: self.stdout.write(f'Archived {r.moved} signals ({r.batches} batches)'),
+        )
+        status = 'done' if result.finished else 'time budget spent, run again to continue'
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {result.moved} signals in {result.batches} batches ({status})'
+        ))
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.signals.export import EXPORT_FORMATS, stream_export
+from apps.signals.filters import SignalFilter
+
+
+class Command(BaseCommand):
+    """
+    Stream signals to a file as NDJSON or GeoJSON.
+    """
+    help = 'Export signals matching the list API filters as NDJSON or GeoJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--output', help='Output file (default: stdout)')
+        parser.add_argument('--type', help='Comma-separated signal types')
+        parser.add_argument('--since', help='ISO 8601 start (inclusive)')
+        parser.add_argument('--until', help='ISO 8601 end (exclusive)')
+        parser.add_argument('--bbox', help='min_lon,min_lat,max_lon,max_lat')
+        parser.add_argument('--min-trust', help='Lowest signal trust score (0-100)')
+        parser.add_argument('--chunk-size', type=int, help='Rows fetched per cursor round trip')
+
+    def handle(self, *args, **options):
+        try:
+            signal_filter = SignalFilter.from_params({
+                key: options[key] for key in ('type', 'since', 'until', 'bbox', 'min_trust')
+            })
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = stream_export(signal_filter, options['format'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported signals to {options['output']}"))
+        else:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.signals.partitions import ensure_partitions, existing_partitions
+
+
+class Command(BaseCommand):
+    """
+    Pre-create monthly partitions of the signal table.
+    """
+    help = 'Create missing monthly signal partitions ahead of time. Run daily from cron.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=settings.SIGNAL_PARTITION_MONTHS_AHEAD,
+            help='Months after the current one to create (default: %(default)s)',
+        )
+
+    def handle(self, *args, **options):
+        created = ensure_partitions(options['months_ahead'])
+        for name in created:
+            self.stdout.write(f'Created {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(created)} partitions created, {len(existing_partitions())} attached'
+        ))
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.signals.models import Signal
+from apps.signals.rollups import hour_bucket, hour_ceiling, rebuild_rollups
+
+
+class Command(BaseCommand):
+    """
+    Rebuild heatmap rollups from the raw Signal table.
+    """
+    help = 'Rebuild heatmap rollups for a time range (defaults to all signals).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='ISO 8601 start (inclusive)')
+        parser.add_argument('--until', help='ISO 8601 end (exclusive)')
+        parser.add_argument(
+            '--window-hours',
+            type=int,
+            default=24,
+            help='Hours rebuilt per transaction (default: 24)',
+        )
+
+    def handle(self, *args, **options):
+        bounds = Signal.objects.aggregate(first=Min('occurred_at'), last=Max('occurred_at'))
+        if bounds['first'] is None:
+            self.stdout.write('No signals to roll up.')
+            return
+
+        since = self._parse(options['since']) or bounds['first']
+        until = self._parse(options['until']) or bounds['last'] + timedelta(hours=1)
+        if since >= until:
+            raise CommandError('--since must be earlier than --until')
+
+        window = timedelta(hours=options['window_hours'])
+        # Whole UTC hour buckets, including the partial last one
+        start, until = hour_bucket(since), hour_ceiling(until)
+        total = 0
+        while start < until:
+            end = min(start + window, until)
+            rows = rebuild_rollups(start, end)
+            total += rows
+            self.stdout.write(f'{start.isoformat()} → {end.isoformat()}: {rows} rollup rows')
+            start = end
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} rollup rows'))
+
+    @staticmethod
+    def _parse(value):
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise CommandError(f'Invalid datetime: {value}')
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
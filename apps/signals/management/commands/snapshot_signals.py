@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.signals.export import with_coordinates
+from apps.signals.models import Signal
+from apps.signals.snapshot import SnapshotWriter
+
+
+class Command(BaseCommand):
+    """
+    Append new signals to a columnar snapshot for analytics.
+    """
+    help = 'Write or incrementally extend a memory-mappable columnar snapshot of signals.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Snapshot directory')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50000,
+            help='Rows appended per manifest commit (default: 50000)',
+        )
+        parser.add_argument(
+            '--lag-seconds',
+            type=int,
+            default=300,
+            help=(
+                'Only export signals created at least this long ago, so rows '
+                'still being committed are not skipped by the high-water mark '
+                '(default: 300)'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        signal_types = [value for value, _ in Signal.SIGNAL_TYPES]
+        writer = SnapshotWriter(options['output'], signal_types)
+
+        cutoff = timezone.now() - timedelta(seconds=options['lag_seconds'])
+        queryset = Signal.objects.filter(created_at__lt=cutoff)
+        if writer.high_water:
+            created_at, signal_id = writer.high_water
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=signal_id)
+            )
+        # Signals not yet backfilled fall back to their source's score
+        queryset = queryset.annotate(trust=Coalesce('trust_score', 'source__trust_score'))
+        rows = with_coordinates(queryset.order_by('created_at', 'id')).values_list(
+            'id', 'lon', 'lat', 'occurred_at', 'signal_type',
+            'source_id', 'trust', 'content', 'created_at',
+        )
+
+        batch_size = options['batch_size']
+        batch = []
+        total = 0
+        for row in rows.iterator(chunk_size=min(batch_size, 5000)):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                total += writer.append(batch)
+                self.stdout.write(f'Appended {total} signals')
+                batch = []
+        total += writer.append(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot at {options['output']}: {total} new signals"
+        ))
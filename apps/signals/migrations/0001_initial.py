@@ -0,0 +1,66 @@
+# Generated by Django 4.2 on 2026-10-19 13:34
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('sources', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Signal',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('content', models.TextField()),
+                ('signal_type', models.CharField(choices=[('robbery', 'Robbery'), ('assault', 'Assault'), ('burglary', 'Burglary'), ('vehicle_theft', 'Vehicle Theft'), ('harassment', 'Harassment'), ('other', 'Other')], max_length=20)),
+                ('location', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+                ('occurred_at', models.DateTimeField()),
+                ('source_metadata', models.JSONField(blank=True, default=dict, null=True)),
+                ('dedup_hash', models.CharField(blank=True, help_text='SHA256 hash of the signal content and location', max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-occurred_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SignalRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell_x', models.IntegerField()),
+                ('cell_y', models.IntegerField()),
+                ('signal_type', models.CharField(choices=[('robbery', 'Robbery'), ('assault', 'Assault'), ('burglary', 'Burglary'), ('vehicle_theft', 'Vehicle Theft'), ('harassment', 'Harassment'), ('other', 'Other')], max_length=20)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='signalrollup',
+            index=models.Index(fields=['bucket', 'signal_type'], name='signals_sig_bucket_5cb008_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='signalrollup',
+            constraint=models.UniqueConstraint(fields=('cell_x', 'cell_y', 'signal_type', 'bucket'), name='uniq_signal_rollup_cell'),
+        ),
+        migrations.AddField(
+            model_name='signal',
+            name='source',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='signals', to='sources.source'),
+        ),
+        migrations.AddIndex(
+            model_name='signal',
+            index=models.Index(fields=['signal_type', 'location'], name='signals_sig_signal__e8718c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signal',
+            index=models.Index(fields=['occurred_at'], name='signals_sig_occurre_1590ae_idx'),
+        ),
+    ]
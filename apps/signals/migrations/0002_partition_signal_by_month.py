@@ -0,0 +1,169 @@
+# Generated by Django 4.2 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+# Rebuilds signals_signal as a table range partitioned by month on
+# occurred_at. Indexes and foreign keys are recreated from the catalog so
+# they keep the names Django generated for them. Partitions are created for
+# every month that has data up to three months ahead, plus a default
+# partition; apps.signals.partitions keeps creating future months.
+PARTITION_SIGNAL_SQL = """
+DO $$
+DECLARE
+    r record;
+    first_month date;
+    last_month date;
+    part_month date;
+BEGIN
+    ALTER TABLE signals_signal RENAME TO signals_signal_legacy;
+
+    CREATE TEMP TABLE _signal_indexes ON COMMIT DROP AS
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = 'signals_signal_legacy'
+          AND indexdef NOT LIKE 'CREATE UNIQUE INDEX %';
+    CREATE TEMP TABLE _signal_fks ON COMMIT DROP AS
+        SELECT conname, pg_get_constraintdef(oid) AS condef FROM pg_constraint
+        WHERE conrelid = 'signals_signal_legacy'::regclass AND contype = 'f';
+
+    FOR r IN SELECT conname FROM pg_constraint
+             WHERE conrelid = 'signals_signal_legacy'::regclass AND contype IN ('p', 'u', 'f') LOOP
+        EXECUTE format('ALTER TABLE signals_signal_legacy DROP CONSTRAINT %I', r.conname);
+    END LOOP;
+    FOR r IN SELECT indexname FROM _signal_indexes LOOP
+        EXECUTE format('DROP INDEX %I', r.indexname);
+    END LOOP;
+
+    CREATE TABLE signals_signal (
+        LIKE signals_signal_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+    ) PARTITION BY RANGE (occurred_at);
+    ALTER TABLE signals_signal ADD CONSTRAINT signals_signal_pkey PRIMARY KEY (id, occurred_at);
+    FOR r IN SELECT * FROM _signal_fks LOOP
+        EXECUTE format('ALTER TABLE signals_signal ADD CONSTRAINT %I %s', r.conname, r.condef);
+    END LOOP;
+    FOR r IN SELECT * FROM _signal_indexes LOOP
+        EXECUTE replace(r.indexdef, 'signals_signal_legacy', 'signals_signal');
+    END LOOP;
+
+    SELECT date_trunc('month', min(occurred_at) AT TIME ZONE 'UTC')::date,
+           date_trunc('month', max(occurred_at) AT TIME ZONE 'UTC')::date
+      INTO first_month, last_month
+      FROM signals_signal_legacy;
+    part_month := LEAST(
+        COALESCE(first_month, date_trunc('month', now() AT TIME ZONE 'UTC')::date),
+        date_trunc('month', now() AT TIME ZONE 'UTC')::date
+    );
+    last_month := GREATEST(
+        last_month,
+        (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months')::date
+    );
+    WHILE part_month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF signals_signal FOR VALUES FROM (%L) TO (%L)',
+            'signals_signal_p' || to_char(part_month, 'YYYY_MM'),
+            part_month::timestamp AT TIME ZONE 'UTC',
+            (part_month + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+        );
+        part_month := (part_month + interval '1 month')::date;
+    END LOOP;
+    CREATE TABLE signals_signal_default PARTITION OF signals_signal DEFAULT;
+
+    INSERT INTO signals_signal SELECT * FROM signals_signal_legacy;
+    INSERT INTO signals_signaldedupkey (dedup_hash, occurred_at)
+        SELECT dedup_hash, occurred_at FROM signals_signal_legacy;
+    DROP TABLE signals_signal_legacy;
+    DROP TABLE _signal_indexes, _signal_fks;
+END
+$$;
+
+CREATE FUNCTION signals_signal_claim_dedup_hash() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO signals_signaldedupkey (dedup_hash, occurred_at)
+    VALUES (NEW.dedup_hash, NEW.occurred_at);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION signals_signal_release_dedup_hash() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM signals_signaldedupkey WHERE dedup_hash = OLD.dedup_hash;
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER signals_signal_claim_dedup_hash
+    BEFORE INSERT ON signals_signal
+    FOR EACH ROW EXECUTE FUNCTION signals_signal_claim_dedup_hash();
+CREATE TRIGGER signals_signal_release_dedup_hash
+    AFTER DELETE ON signals_signal
+    FOR EACH ROW EXECUTE FUNCTION signals_signal_release_dedup_hash();
+"""
+
+UNPARTITION_SIGNAL_SQL = """
+DROP TRIGGER signals_signal_claim_dedup_hash ON signals_signal;
+DROP TRIGGER signals_signal_release_dedup_hash ON signals_signal;
+DROP FUNCTION signals_signal_claim_dedup_hash();
+DROP FUNCTION signals_signal_release_dedup_hash();
+
+DO $$
+DECLARE
+    r record;
+BEGIN
+    ALTER TABLE signals_signal RENAME TO signals_signal_partitioned;
+
+    CREATE TEMP TABLE _signal_indexes ON COMMIT DROP AS
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = 'signals_signal_partitioned'
+          AND indexdef NOT LIKE 'CREATE UNIQUE INDEX %';
+    CREATE TEMP TABLE _signal_fks ON COMMIT DROP AS
+        SELECT conname, pg_get_constraintdef(oid) AS condef FROM pg_constraint
+        WHERE conrelid = 'signals_signal_partitioned'::regclass AND contype = 'f';
+
+    FOR r IN SELECT conname FROM pg_constraint
+             WHERE conrelid = 'signals_signal_partitioned'::regclass AND contype IN ('p', 'f') LOOP
+        EXECUTE format('ALTER TABLE signals_signal_partitioned DROP CONSTRAINT %I', r.conname);
+    END LOOP;
+    FOR r IN SELECT indexname FROM _signal_indexes LOOP
+        EXECUTE format('DROP INDEX %I', r.indexname);
+    END LOOP;
+
+    CREATE TABLE signals_signal (
+        LIKE signals_signal_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+    );
+    ALTER TABLE signals_signal ADD CONSTRAINT signals_signal_pkey PRIMARY KEY (id);
+    FOR r IN SELECT * FROM _signal_fks LOOP
+        EXECUTE format('ALTER TABLE signals_signal ADD CONSTRAINT %I %s', r.conname, r.condef);
+    END LOOP;
+    FOR r IN SELECT * FROM _signal_indexes LOOP
+        EXECUTE replace(r.indexdef, 'signals_signal_partitioned', 'signals_signal');
+    END LOOP;
+
+    INSERT INTO signals_signal SELECT * FROM signals_signal_partitioned;
+    DROP TABLE signals_signal_partitioned;
+    DROP TABLE _signal_indexes, _signal_fks;
+END
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SignalDedupKey',
+            fields=[
+                ('dedup_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('occurred_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='signal',
+            name='dedup_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA256 hash of the signal content and location', max_length=64),
+        ),
+        migrations.RunSQL(PARTITION_SIGNAL_SQL, UNPARTITION_SIGNAL_SQL),
+    ]
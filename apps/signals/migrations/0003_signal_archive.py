@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-19 13:36
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sources', '0001_initial'),
+        ('signals', '0002_partition_signal_by_month'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SignalArchive',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('content', models.TextField()),
+                ('signal_type', models.CharField(choices=[('robbery', 'Robbery'), ('assault', 'Assault'), ('burglary', 'Burglary'), ('vehicle_theft', 'Vehicle Theft'), ('harassment', 'Harassment'), ('other', 'Other')], max_length=20)),
+                ('location', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+                ('occurred_at', models.DateTimeField()),
+                ('source_metadata', models.JSONField(blank=True, default=dict, null=True)),
+                ('dedup_hash', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('source', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='archived_signals', to='sources.source')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='signalarchive',
+            index=models.Index(fields=['occurred_at'], name='signals_sig_occurre_25ce88_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2 on 2026-10-19 13:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# search_vector is computed in the database so every insert path (ORM,
+# bulk_create, INSERT ... SELECT, COPY) fills it. The text search
+# configuration must match apps.signals.search.SEARCH_CONFIG. Existing rows
+# are backfilled before the GIN index is built.
+SEARCH_VECTOR_SQL = """
+CREATE FUNCTION signals_signal_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := to_tsvector('english'::regconfig, coalesce(NEW.content, ''));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER signals_signal_search_vector
+    BEFORE INSERT OR UPDATE OF content, search_vector ON signals_signal
+    FOR EACH ROW EXECUTE FUNCTION signals_signal_search_vector();
+UPDATE signals_signal SET search_vector = to_tsvector('english'::regconfig, coalesce(content, ''));
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP TRIGGER signals_signal_search_vector ON signals_signal;
+DROP FUNCTION signals_signal_search_vector();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0003_signal_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signal',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, DROP_SEARCH_VECTOR_SQL),
+        migrations.AddIndex(
+            model_name='signal',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='signals_search_vector_gin'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0004_signal_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='signal',
+            index=models.Index(fields=['source', 'created_at'], name='signals_sig_source__c85ab4_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-19 13:46
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0005_signal_source_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Incident',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('signal_type', models.CharField(choices=[('robbery', 'Robbery'), ('assault', 'Assault'), ('burglary', 'Burglary'), ('vehicle_theft', 'Vehicle Theft'), ('harassment', 'Harassment'), ('other', 'Other')], max_length=20)),
+                ('location', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+                ('first_seen', models.DateTimeField()),
+                ('last_seen', models.DateTimeField()),
+                ('signal_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['last_seen'], name='signals_inc_last_se_9765bb_idx'),
+        ),
+        migrations.AddField(
+            model_name='signal',
+            name='incident',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='signals', to='signals.incident'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-19 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0006_incident'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SignalContentBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band_hash', models.BigIntegerField()),
+                ('signal_id', models.UUIDField()),
+                ('occurred_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SignalContentSignature',
+            fields=[
+                ('signal_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('signal_type', models.CharField(choices=[('robbery', 'Robbery'), ('assault', 'Assault'), ('burglary', 'Burglary'), ('vehicle_theft', 'Vehicle Theft'), ('harassment', 'Harassment'), ('other', 'Other')], max_length=20)),
+                ('occurred_at', models.DateTimeField(db_index=True)),
+                ('signature', models.BinaryField()),
+                ('original_id', models.UUIDField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='signal',
+            name='near_duplicate_of',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='signalcontentband',
+            index=models.Index(fields=['band_hash', 'occurred_at'], name='signals_sig_band_ha_81fca3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signalcontentband',
+            index=models.Index(fields=['occurred_at'], name='signals_sig_occurre_b0e103_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2 on 2026-10-19 15:02
+
+from django.db import migrations
+
+
+# Every committed insert notifies the channel read by
+# apps.signals.stream (STREAM_CHANNEL). Notifications are delivered at
+# commit and never block the inserting transaction. Payloads must stay
+# under 8000 bytes, so content is truncated.
+NOTIFY_SQL = """
+CREATE FUNCTION signals_signal_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('signals_inserted', json_build_object(
+        'id', NEW.id,
+        'signal_type', NEW.signal_type,
+        'lon', ST_X(NEW.location),
+        'lat', ST_Y(NEW.location),
+        'occurred_at', NEW.occurred_at,
+        'source', NEW.source_id,
+        'incident', NEW.incident_id,
+        'near_duplicate_of', NEW.near_duplicate_of,
+        'content', left(NEW.content, 1000)
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER signals_signal_notify
+    AFTER INSERT ON signals_signal
+    FOR EACH ROW EXECUTE FUNCTION signals_signal_notify();
+"""
+
+DROP_NOTIFY_SQL = """
+DROP TRIGGER signals_signal_notify ON signals_signal;
+DROP FUNCTION signals_signal_notify();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0007_content_signatures'),
+    ]
+
+    operations = [
+        migrations.RunSQL(NOTIFY_SQL, DROP_NOTIFY_SQL),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-19 14:15
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0008_signal_notify'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signal',
+            name='trust_breakdown',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='signal',
+            name='trust_score',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='signal',
+            index=models.Index(fields=['occurred_at', 'trust_score'], name='signals_occurred_trust'),
+        ),
+        migrations.AddIndex(
+            model_name='signal',
+            index=django.contrib.postgres.indexes.GistIndex(condition=models.Q(('trust_score__gte', 70)), fields=['location'], name='signals_high_trust_location'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-19 14:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0009_signal_trust'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signalarchive',
+            name='incident',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='archived_signals', to='signals.incident'),
+        ),
+        migrations.AddField(
+            model_name='signalarchive',
+            name='near_duplicate_of',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='signalarchive',
+            name='trust_breakdown',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='signalarchive',
+            name='trust_score',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-19 14:31
+
+from django.db import migrations
+
+
+# Adds trust_score to the notification payload, so live subscribers can
+# be filtered by min_trust like the read endpoints
+NOTIFY_SQL = """
+CREATE OR REPLACE FUNCTION signals_signal_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('signals_inserted', json_build_object(
+        'id', NEW.id,
+        'signal_type', NEW.signal_type,
+        'lon', ST_X(NEW.location),
+        'lat', ST_Y(NEW.location),
+        'occurred_at', NEW.occurred_at,
+        'source', NEW.source_id,
+        'incident', NEW.incident_id,
+        'near_duplicate_of', NEW.near_duplicate_of,
+        'trust_score', NEW.trust_score,
+        'content', left(NEW.content, 1000)
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_NOTIFY_SQL = """
+CREATE OR REPLACE FUNCTION signals_signal_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('signals_inserted', json_build_object(
+        'id', NEW.id,
+        'signal_type', NEW.signal_type,
+        'lon', ST_X(NEW.location),
+        'lat', ST_Y(NEW.location),
+        'occurred_at', NEW.occurred_at,
+        'source', NEW.source_id,
+        'incident', NEW.incident_id,
+        'near_duplicate_of', NEW.near_duplicate_of,
+        'content', left(NEW.content, 1000)
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0010_signal_archive_trust'),
+    ]
+
+    operations = [
+        migrations.RunSQL(NOTIFY_SQL, PREVIOUS_NOTIFY_SQL),
+    ]
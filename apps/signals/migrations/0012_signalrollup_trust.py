@@ -0,0 +1,59 @@
+# Generated by Django 4.2 on 2026-10-19 14:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Existing rollup rows carry no trust score: recount them from the signals,
+# whose scores are known (as rollups.rebuild_rollups does)
+SPLIT_BY_TRUST_SQL = """
+    DELETE FROM signals_signalrollup;
+    INSERT INTO signals_signalrollup (cell_x, cell_y, signal_type, bucket, trust_score, count)
+    SELECT floor(ST_X(location) / %s)::int,
+           floor(ST_Y(location) / %s)::int,
+           signal_type,
+           date_trunc('hour', occurred_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+           COALESCE(trust_score, -1),
+           count(*)
+    FROM signals_signal
+    GROUP BY 1, 2, 3, 4, 5;
+"""
+
+# Sum the rows of each cell back into one before the old constraint returns
+MERGE_TRUST_SQL = """
+    WITH merged AS (
+        DELETE FROM signals_signalrollup
+        RETURNING cell_x, cell_y, signal_type, bucket, count
+    )
+    INSERT INTO signals_signalrollup (cell_x, cell_y, signal_type, bucket, trust_score, count)
+    SELECT cell_x, cell_y, signal_type, bucket, -1, sum(count)
+    FROM merged
+    GROUP BY 1, 2, 3, 4;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0011_signal_notify_trust'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='signalrollup',
+            name='uniq_signal_rollup_cell',
+        ),
+        migrations.AddField(
+            model_name='signalrollup',
+            name='trust_score',
+            field=models.SmallIntegerField(default=-1),
+        ),
+        migrations.AddConstraint(
+            model_name='signalrollup',
+            constraint=models.UniqueConstraint(fields=('cell_x', 'cell_y', 'signal_type', 'bucket', 'trust_score'), name='uniq_signal_rollup_cell_trust'),
+        ),
+        migrations.RunSQL(
+            [(SPLIT_BY_TRUST_SQL, [settings.HEATMAP_CELL_DEGREES, settings.HEATMAP_CELL_DEGREES])],
+            MERGE_TRUST_SQL,
+        ),
+    ]
@@ -1,15 +1,28 @@
 from django.db import models
 import uuid
 from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVectorField
 from apps.sources.models import Source
 from django.utils import timezone
 import hashlib
 import json
 
+# Lowest trust_score covered by the high-trust location index
+HIGH_TRUST_SCORE = 70
+
+# SignalRollup.trust_score of signals not scored yet; below any min_trust
+UNSCORED_TRUST = -1
+
+
 # Create your models here.
 class Signal(models.Model):
     """
     Model representing a signal.
+
+    The table is range partitioned by month on occurred_at (see the
+    partition_signal_by_month migration and apps.signals.partitions), and
+    its database primary key is (id, occurred_at).
     """
     SIGNAL_TYPES = (
         ('robbery', 'Robbery'),
@@ -30,18 +43,52 @@ class Signal(models.Model):
         related_name='signals',
     )
     source_metadata = models.JSONField(default=dict, blank=True, null=True)
+    # Uniqueness is enforced through SignalDedupKey: a partitioned table
+    # cannot carry a unique index that leaves out the partition key.
     dedup_hash = models.CharField(
         max_length=64,
-        unique=True,
+        db_index=True,
         blank=True,
         help_text='SHA256 hash of the signal content and location',
     )
+    # Written by the signals_signal_search_vector trigger on every insert
+    # (bulk ones included) and whenever content changes; see apps.signals.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # No database constraint: incidents are rewritten in bulk by
+    # recluster_incidents and a foreign key check per insert buys nothing
+    incident = models.ForeignKey(
+        'Incident',
+        on_delete=models.SET_NULL,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='signals',
+    )
+    # Earliest stored signal whose content this one nearly repeats
+    # (a plain id: nothing can reference the partitioned signal table)
+    near_duplicate_of = models.UUIDField(null=True, blank=True, editable=False)
+    # Trust score of the signal when it was scored, and the trust rules that
+    # fired as a bitmask (bit i is rule i of apps.ingestion.trust_rules).
+    # Null until scored; see the backfill_signal_trust command.
+    trust_score = models.SmallIntegerField(null=True, blank=True, editable=False)
+    trust_breakdown = models.IntegerField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
             models.Index(fields=['signal_type', 'location']),
             models.Index(fields=['occurred_at']),
+            # Latest signal per source, for trust recalculation
+            models.Index(fields=['source', 'created_at']),
+            GinIndex(fields=['search_vector'], name='signals_search_vector_gin'),
+            # Trust-filtered time ranges
+            models.Index(fields=['occurred_at', 'trust_score'], name='signals_occurred_trust'),
+            # Map queries over trusted signals only
+            GistIndex(
+                fields=['location'],
+                name='signals_high_trust_location',
+                condition=models.Q(trust_score__gte=HIGH_TRUST_SCORE),
+            ),
         ]
         ordering = ['-occurred_at']
 
@@ -91,4 +138,156 @@ class Signal(models.Model):
         }, sort_keys=True)
 
         # Compute the SHA256 hash of the signal data
-        return hashlib.sha256(signal_data.encode('utf-8')).hexdigest()
\ No newline at end of file
+        return hashlib.sha256(signal_data.encode('utf-8')).hexdigest()
+
+
+class SignalDedupKey(models.Model):
+    """
+    Claimed dedup hashes, one row per stored signal.
+
+    Rows are written and removed by triggers on the signal table, so a
+    duplicate insert fails with an IntegrityError on dedup_hash whichever
+    monthly partition the existing signal lives in.
+    """
+    dedup_hash = models.CharField(max_length=64, primary_key=True)
+    occurred_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.dedup_hash
+
+
+class SignalArchive(models.Model):
+    """
+    Signals moved out of the live table by the retention job.
+
+    The source link has no database constraint, so archived history never
+    blocks deleting a Source the way live signals do.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    content = models.TextField()
+    signal_type = models.CharField(max_length=20, choices=Signal.SIGNAL_TYPES)
+    location = gis_models.PointField(srid=4326)
+    occurred_at = models.DateTimeField()
+    source = models.ForeignKey(
+        Source,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='archived_signals',
+    )
+    source_metadata = models.JSONField(default=dict, blank=True, null=True)
+    dedup_hash = models.CharField(max_length=64)
+    incident = models.ForeignKey(
+        'Incident',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='archived_signals',
+    )
+    near_duplicate_of = models.UUIDField(null=True, blank=True, editable=False)
+    trust_score = models.SmallIntegerField(null=True, blank=True, editable=False)
+    trust_breakdown = models.IntegerField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['occurred_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.signal_type} at {self.location} (archived)'
+
+
+class SignalRollup(models.Model):
+    """
+    Signal counts per grid cell, signal type, hour and signal trust score.
+
+    Maintained incrementally by the ingestion coordinator and the trust
+    backfill, and rebuilt with the rebuild_signal_rollups command. Cells
+    are HEATMAP_CELL_DEGREES squares indexed by floor(lon / size),
+    floor(lat / size); changing that setting requires a full rebuild.
+    trust_score is Signal.trust_score, or UNSCORED_TRUST (a NULL would
+    not match itself in the unique constraint the upserts rely on).
+    """
+    cell_x = models.IntegerField()
+    cell_y = models.IntegerField()
+    signal_type = models.CharField(max_length=20, choices=Signal.SIGNAL_TYPES)
+    bucket = models.DateTimeField()
+    trust_score = models.SmallIntegerField(default=UNSCORED_TRUST)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cell_x', 'cell_y', 'signal_type', 'bucket', 'trust_score'],
+                name='uniq_signal_rollup_cell_trust',
+            )
+        ]
+        indexes = [
+            models.Index(fields=['bucket', 'signal_type']),
+        ]
+
+    def __str__(self):
+        return f'{self.signal_type} ({self.cell_x}, {self.cell_y}) @ {self.bucket}: {self.count}'
+
+
+class Incident(models.Model):
+    """
+    A group of signals that report the same event.
+
+    Signals are assigned by apps.signals.incidents: a signal joins the
+    incident of its nearest already clustered neighbour of the same type
+    within the type's distance and time thresholds, or starts a new one.
+    """
+    id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)
+    signal_type = models.CharField(max_length=20, choices=Signal.SIGNAL_TYPES)
+    # Location of the first signal
+    location = gis_models.PointField(srid=4326)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+    signal_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['last_seen']),
+        ]
+
+    def __str__(self):
+        return f'{self.signal_type} incident ({self.signal_count} signals)'
+
+
+class SignalContentSignature(models.Model):
+    """
+    MinHash signature of a signal's content, for near-duplicate detection
+    (see apps.ingestion.minhash). original_id is the earliest signal of the
+    near-duplicate group this signal belongs to.
+    """
+    signal_id = models.UUIDField(primary_key=True)
+    signal_type = models.CharField(max_length=20, choices=Signal.SIGNAL_TYPES)
+    occurred_at = models.DateTimeField(db_index=True)
+    signature = models.BinaryField()
+    original_id = models.UUIDField(null=True, blank=True)
+
+    def __str__(self):
+        return str(self.signal_id)
+
+
+class SignalContentBand(models.Model):
+    """
+    LSH band of a content signature. Signals sharing any band_hash are
+    near-duplicate candidates.
+    """
+    band_hash = models.BigIntegerField()
+    signal_id = models.UUIDField()
+    occurred_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band_hash', 'occurred_at']),
+            models.Index(fields=['occurred_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.band_hash} → {self.signal_id}'
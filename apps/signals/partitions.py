@@ -0,0 +1,146 @@
+"""
+Monthly range partitions of the signal table.
+
+The partitioned table and its first partitions are created by the
+partition_signal_by_month migration. maintain_signal_partitions (run from
+cron) keeps months ahead of time created so inserts never fall back to the
+default partition.
+"""
+
+import logging
+from datetime import date, datetime, time, timezone as dt_timezone
+from typing import List
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = 'signals_signal'
+DEFAULT_PARTITION = 'signals_signal_default'
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f'{PARENT_TABLE}_p{month:%Y_%m}'
+
+
+def partition_month(name: str):
+    """
+    Month covered by a partition name, or None for the default partition.
+    """
+    prefix = f'{PARENT_TABLE}_p'
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix):], '%Y_%m').date()
+    except ValueError:
+        return None
+
+
+def month_bounds(month: date):
+    """
+    [lower, upper) bounds of a monthly partition as aware UTC datetimes.
+    """
+    lower = datetime.combine(month, time.min, tzinfo=dt_timezone.utc)
+    upper = datetime.combine(add_months(month, 1), time.min, tzinfo=dt_timezone.utc)
+    return lower, upper
+
+
+def existing_partitions() -> List[str]:
+    """
+    Names of the partitions currently attached to the signal table.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            ORDER BY child.relname
+            """,
+            [PARENT_TABLE],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def create_partition(month: date) -> int:
+    """
+    Create and attach the partition for one month.
+
+    Rows for that month that landed in the default partition are moved into
+    the new table first; the default partition is locked meanwhile so no
+    new ones can arrive before the attach. Returns the number of rows moved.
+    """
+    name = partition_name(month)
+    lower, upper = month_bounds(month)
+    qn = connection.ops.quote_name
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {qn(DEFAULT_PARTITION)} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(
+            f'CREATE TABLE {qn(name)} '
+            f'(LIKE {qn(PARENT_TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        # A matching CHECK lets ATTACH skip its validation scan
+        cursor.execute(
+            f'ALTER TABLE {qn(name)} ADD CONSTRAINT {qn(name + "_bounds")} '
+            f'CHECK (occurred_at >= %s AND occurred_at < %s)',
+            [lower, upper],
+        )
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {qn(DEFAULT_PARTITION)}
+                WHERE occurred_at >= %s AND occurred_at < %s
+                RETURNING *
+            )
+            INSERT INTO {qn(name)} SELECT * FROM moved
+            """,
+            [lower, upper],
+        )
+        moved = cursor.rowcount
+        if moved:
+            # Deleting from the default partition released the dedup keys
+            cursor.execute(
+                f"""
+                INSERT INTO signals_signaldedupkey (dedup_hash, occurred_at)
+                SELECT dedup_hash, occurred_at FROM {qn(name)}
+                ON CONFLICT DO NOTHING
+                """
+            )
+        cursor.execute(
+            f'ALTER TABLE {qn(PARENT_TABLE)} ATTACH PARTITION {qn(name)} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [lower, upper],
+        )
+        cursor.execute(f'ALTER TABLE {qn(name)} DROP CONSTRAINT {qn(name + "_bounds")}')
+
+    logger.info(f"Created signal partition {name} ({moved} rows moved from default)")
+    return moved
+
+
+def ensure_partitions(months_ahead: int, today: date = None) -> List[str]:
+    """
+    Create any missing partitions from the current month to months_ahead
+    months later. Returns the names of the partitions created.
+    """
+    current = month_start(today or timezone.now().date())
+    existing = set(existing_partitions())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) not in existing:
+            create_partition(month)
+            created.append(partition_name(month))
+    return created
@@ -0,0 +1,210 @@
+"""
+Region-versioned cache for signal read responses.
+
+Responses are cached under a key made of the endpoint, the query shape and
+the version tokens of every region the query can see. A region is a coarse
+spatial cell (RESPONSE_CACHE_CELL_DEGREES) and a UTC day. When the ingestion
+coordinator stores signals it replaces the tokens of the regions they fall
+in, so only cached responses that could contain those signals stop matching.
+
+Every write bumps four levels of region: (cell, day), (cell, any day),
+(any cell, day) and the global region. A query uses the most precise level
+its filters allow: bbox and time range give (cell, day) keys, a bbox alone
+gives (cell, any day) keys, and so on. Queries that would need more than
+RESPONSE_CACHE_MAX_REGIONS keys fall back to a coarser level.
+
+A version token records when it was written. A miss on a region written
+within the replica staleness horizon (REPLICA_MAX_LAG_SECONDS plus
+REPLICA_LAG_CHECK_SECONDS) is computed on the primary: a replica may not
+have replayed that write yet, and its result would be cached under the
+new token until the region is written again.
+
+The backend is the 'responses' Django cache. It must be shared between the
+ingestion process and the web workers (file based or Redis) for
+invalidations to be seen; local memory is only correct in a single process.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import time as time_module
+import uuid
+from contextlib import nullcontext
+from datetime import timedelta, timezone as dt_timezone
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.db_router import replica_reads
+
+logger = logging.getLogger(__name__)
+
+ANY = '*'
+GLOBAL_REGION = 'rv:*'
+HITS_KEY = 'rc-stats:hits'
+MISSES_KEY = 'rc-stats:misses'
+
+
+def _cell(lon: float, lat: float):
+    size = settings.RESPONSE_CACHE_CELL_DEGREES
+    return math.floor(lon / size), math.floor(lat / size)
+
+
+def _day(value) -> str:
+    return value.astimezone(dt_timezone.utc).date().isoformat()
+
+
+def _region_key(cell, day) -> str:
+    cell_part = f'{cell[0]}:{cell[1]}' if cell != ANY else '*:*'
+    return f'rv:{cell_part}:{day}'
+
+
+def _token() -> str:
+    return f'{uuid.uuid4().hex}@{time_module.time():.3f}'
+
+
+def _written_at(token: str) -> Optional[float]:
+    try:
+        return float(token.rpartition('@')[2])
+    except ValueError:
+        return None
+
+
+def _recently_written(versions: List[str]) -> bool:
+    """
+    Whether a replica may not have replayed the latest write to any of
+    the regions. Tokens without a time count as recent.
+    """
+    horizon = settings.REPLICA_MAX_LAG_SECONDS + settings.REPLICA_LAG_CHECK_SECONDS
+    now = time_module.time()
+    for token in versions:
+        written_at = _written_at(token)
+        if written_at is None or now - written_at <= horizon:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Cache of read responses invalidated per spatial cell and day.
+    """
+
+    def __init__(self, alias: str = 'responses'):
+        self.cache = caches[alias]
+
+    def regions_for(self, signal_filter) -> List[str]:
+        """
+        Version keys of the regions a query can see.
+        """
+        limit = settings.RESPONSE_CACHE_MAX_REGIONS
+
+        cells = None
+        if signal_filter.bbox:
+            min_x, min_y = _cell(signal_filter.bbox[0], signal_filter.bbox[1])
+            max_x, max_y = _cell(signal_filter.bbox[2], signal_filter.bbox[3])
+            if (max_x - min_x + 1) * (max_y - min_y + 1) <= limit:
+                cells = [
+                    (x, y)
+                    for x in range(min_x, max_x + 1)
+                    for y in range(min_y, max_y + 1)
+                ]
+
+        days = None
+        if signal_filter.since and signal_filter.until:
+            first = signal_filter.since.astimezone(dt_timezone.utc).date()
+            last = (signal_filter.until - timedelta(microseconds=1)).astimezone(dt_timezone.utc).date()
+            if (last - first).days + 1 <= limit:
+                days = [
+                    (first + timedelta(days=i)).isoformat()
+                    for i in range((last - first).days + 1)
+                ]
+
+        if cells and days and len(cells) * len(days) <= limit:
+            return [_region_key(cell, day) for cell in cells for day in days]
+        if cells:
+            return [_region_key(cell, ANY) for cell in cells]
+        if days:
+            return [_region_key(ANY, day) for day in days]
+        return [GLOBAL_REGION]
+
+    def _versions(self, region_keys: List[str]) -> List[str]:
+        """
+        Current version tokens of the given regions. Missing tokens (never
+        written, or culled) are replaced with fresh ones so a stale entry
+        cached under an older token can never match again.
+        """
+        versions = self.cache.get_many(region_keys)
+        missing = [key for key in region_keys if key not in versions]
+        for key in missing:
+            self.cache.add(key, _token(), timeout=None)
+        if missing:
+            versions.update(self.cache.get_many(missing))
+        return [versions.get(key, '') for key in region_keys]
+
+    def get_or_compute(self, endpoint: str, signal_filter, shape: dict, compute):
+        """
+        Return (data, hit) for a read query, computing and caching on a miss.
+        shape holds any request parameters beyond the signal filters.
+        """
+        regions = self.regions_for(signal_filter)
+        versions = self._versions(regions)
+        payload = json.dumps({
+            'endpoint': endpoint,
+            'filter': signal_filter.cache_key(),
+            'shape': shape,
+            'versions': versions,
+        }, sort_keys=True)
+        key = f'rc:{endpoint}:{hashlib.sha1(payload.encode("utf-8")).hexdigest()}'
+
+        data = self.cache.get(key)
+        if data is not None:
+            self._count(HITS_KEY)
+            return data, True
+
+        self._count(MISSES_KEY)
+        with replica_reads(False) if _recently_written(versions) else nullcontext():
+            data = compute()
+        self.cache.set(key, data, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+        return data, False
+
+    def bump(self, signals: Iterable) -> int:
+        """
+        Replace the version tokens of every region the signals fall in.
+        Returns the number of regions bumped.
+        """
+        keys = {GLOBAL_REGION}
+        for signal in signals:
+            cell = _cell(signal.location.x, signal.location.y)
+            day = _day(signal.occurred_at)
+            keys.add(_region_key(cell, day))
+            keys.add(_region_key(cell, ANY))
+            keys.add(_region_key(ANY, day))
+        self.cache.set_many({key: _token() for key in keys}, timeout=None)
+        return len(keys)
+
+    def _count(self, key):
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, 0, timeout=None)
+            self.cache.incr(key)
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters shared by every process using the backend.
+        Counts are approximate on backends without atomic increments.
+        """
+        counts = self.cache.get_many([HITS_KEY, MISSES_KEY])
+        hits = counts.get(HITS_KEY, 0)
+        misses = counts.get(MISSES_KEY, 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else None,
+        }
+
+    def reset_stats(self):
+        self.cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,194 @@
+"""
+Retention: ageing signals out of the live table.
+
+Two strategies:
+
+rows
+    Move signals older than the cutoff into SignalArchive in small batches,
+    oldest first by (occurred_at, id). Each batch is one short transaction
+    that skips rows locked by other sessions and gives up quickly on lock
+    waits, so it can run next to live ingestion.
+
+partitions
+    Detach whole monthly partitions that end before the cutoff and rename
+    them to signals_signalarchive_pYYYY_MM. The detached tables keep their
+    rows and indexes; no data is copied. The foreign keys they inherited
+    are dropped, so like SignalArchive they never block deleting a Source.
+    The detach itself needs a brief exclusive lock on the signal table and
+    is retried on lock timeouts.
+
+In both cases the dedup keys of the removed signals are released. Heatmap
+rollups are left as they are, so historic heatmaps keep their counts.
+"""
+
+import logging
+import time as time_module
+from dataclasses import dataclass, field
+from typing import List
+
+from django.db import OperationalError, connection, transaction
+
+from apps.signals.partitions import (
+    PARENT_TABLE, existing_partitions, month_bounds, partition_month,
+)
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = (
+    'id, content, signal_type, location, occurred_at, source_id, '
+    'source_metadata, dedup_hash, incident_id, near_duplicate_of, '
+    'trust_score, trust_breakdown, created_at'
+)
+
+
+@dataclass
+class RetentionResult:
+    moved: int = 0
+    batches: int = 0
+    detached: List[str] = field(default_factory=list)
+    keys_released: int = 0
+    finished: bool = True
+
+
+def _set_lock_timeout(cursor, lock_timeout_ms):
+    cursor.execute('SELECT set_config(%s, %s, true)', ['lock_timeout', f'{lock_timeout_ms}ms'])
+
+
+def archive_batch(cutoff, after, batch_size, lock_timeout_ms=2000):
+    """
+    Move one batch of signals older than cutoff and after the (occurred_at, id)
+    keyset position into the archive. Returns (rows moved, last position).
+    """
+    keyset = ''
+    params = [cutoff]
+    if after is not None:
+        keyset = 'AND (occurred_at, id) > (%s, %s)'
+        params.extend(after)
+    params.append(batch_size)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        _set_lock_timeout(cursor, lock_timeout_ms)
+        cursor.execute(
+            f"""
+            WITH batch AS (
+                SELECT id, occurred_at FROM {PARENT_TABLE}
+                WHERE occurred_at < %s {keyset}
+                ORDER BY occurred_at, id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            ), moved AS (
+                DELETE FROM {PARENT_TABLE} s
+                USING batch
+                WHERE s.id = batch.id AND s.occurred_at = batch.occurred_at
+                RETURNING s.*
+            )
+            INSERT INTO signals_signalarchive ({ARCHIVE_COLUMNS}, archived_at)
+            SELECT {ARCHIVE_COLUMNS}, now() FROM moved
+            RETURNING occurred_at, id
+            """,
+            params,
+        )
+        rows = cursor.fetchall()
+
+    if not rows:
+        return 0, after
+    return len(rows), max(rows)
+
+
+def archive_rows(cutoff, batch_size=1000, time_budget=300.0, sleep=0.5,
+                 lock_timeout_ms=2000, progress=None):
+    """
+    Move signals older than cutoff into the archive until none are left or
+    the time budget (seconds) is spent.
+    """
+    result = RetentionResult()
+    deadline = time_module.monotonic() + time_budget
+    position = None
+
+    while True:
+        if time_module.monotonic() >= deadline:
+            result.finished = False
+            break
+        try:
+            moved, position = archive_batch(cutoff, position, batch_size, lock_timeout_ms)
+        except OperationalError:
+            # Lock timeout: back off and retry the same position
+            logger.warning('Retention batch hit a lock timeout; retrying', exc_info=True)
+            time_module.sleep(sleep)
+            continue
+        if not moved:
+            break
+        result.moved += moved
+        result.batches += 1
+        if progress:
+            progress(result)
+        time_module.sleep(sleep)
+
+    return result
+
+
+def release_dedup_keys(lower, upper, batch_size=5000, sleep=0.1):
+    """
+    Delete dedup keys for signals in [lower, upper) in small batches.
+    """
+    released = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM signals_signaldedupkey
+                WHERE dedup_hash IN (
+                    SELECT dedup_hash FROM signals_signaldedupkey
+                    WHERE occurred_at >= %s AND occurred_at < %s
+                    LIMIT %s
+                )
+                """,
+                [lower, upper, batch_size],
+            )
+            count = cursor.rowcount
+        released += count
+        if count < batch_size:
+            return released
+        time_module.sleep(sleep)
+
+
+def detach_partitions(cutoff, lock_timeout_ms=2000, retries=5, sleep=1.0):
+    """
+    Detach every monthly partition that ends on or before cutoff.
+    """
+    result = RetentionResult()
+    qn = connection.ops.quote_name
+
+    for name in existing_partitions():
+        month = partition_month(name)
+        if month is None:
+            continue
+        lower, upper = month_bounds(month)
+        if upper > cutoff:
+            continue
+
+        archive_name = name.replace(f'{PARENT_TABLE}_p', 'signals_signalarchive_p')
+        for attempt in range(1, retries + 1):
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    _set_lock_timeout(cursor, lock_timeout_ms)
+                    cursor.execute(f'ALTER TABLE {qn(PARENT_TABLE)} DETACH PARTITION {qn(name)}')
+                    cursor.execute(f'ALTER TABLE {qn(name)} RENAME TO {qn(archive_name)}')
+                    cursor.execute(
+                        "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+                        [archive_name],
+                    )
+                    for (constraint,) in cursor.fetchall():
+                        cursor.execute(f'ALTER TABLE {qn(archive_name)} DROP CONSTRAINT {qn(constraint)}')
+                break
+            except OperationalError:
+                if attempt == retries:
+                    raise
+                logger.warning(f'Detaching {name} hit a lock timeout (attempt {attempt})')
+                time_module.sleep(sleep * attempt)
+
+        result.detached.append(archive_name)
+        result.keys_released += release_dedup_keys(lower, upper)
+        logger.info(f'Detached signal partition {name} as {archive_name}')
+
+    return result
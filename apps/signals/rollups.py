@@ -0,0 +1,202 @@
+"""
+Heatmap rollups: signal counts per grid cell, signal type, hour and trust
+score.
+
+The raw Signal table is only read when rebuilding; heatmap queries read
+SignalRollup alone, so their cost depends on the number of cells and hours
+requested rather than on the number of signals stored. Counts are kept per
+signal trust score so min_trust filters the rollups as well; the trust
+backfill moves counts between scores as it rescores signals (see
+move_rollups).
+"""
+
+import math
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterable, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from apps.db_router import read_connection
+from apps.signals.models import UNSCORED_TRUST
+
+ROLLUP_TABLE = 'signals_signalrollup'
+
+
+def cell_for_point(lon: float, lat: float) -> Tuple[int, int]:
+    """
+    Grid cell indices of a WGS84 point.
+    Must stay in line with the floor(x / size) expression in rebuild_rollups.
+    """
+    size = settings.HEATMAP_CELL_DEGREES
+    return math.floor(lon / size), math.floor(lat / size)
+
+
+def hour_bucket(value: datetime) -> datetime:
+    """
+    Truncate a timestamp to its UTC hour bucket.
+    Must stay in line with the date_trunc expression in rebuild_rollups.
+    """
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def hour_ceiling(value: datetime) -> datetime:
+    """
+    End of the last hour bucket starting before a timestamp.
+    """
+    bucket = hour_bucket(value)
+    return bucket if bucket == value else bucket + timedelta(hours=1)
+
+
+def _rollup_key(signal, trust_score):
+    cell_x, cell_y = cell_for_point(signal.location.x, signal.location.y)
+    trust = UNSCORED_TRUST if trust_score is None else trust_score
+    return cell_x, cell_y, signal.signal_type, hour_bucket(signal.occurred_at), trust
+
+
+def increment_rollups(signals: Iterable) -> int:
+    """
+    Add stored signals to their rollup rows in one upsert.
+    Call inside the transaction that stored the signals.
+    Returns the number of rollup rows touched.
+    """
+    counts = Counter(_rollup_key(signal, signal.trust_score) for signal in signals)
+    return _add_counts(counts)
+
+
+def move_rollups(changes: Iterable) -> int:
+    """
+    Move rescored signals between trust scores in their rollup rows.
+    changes holds (signal, previous trust score, new trust score); call
+    inside the transaction that updated the scores.
+    Returns the number of rollup rows touched.
+    """
+    counts = Counter()
+    for signal, previous, score in changes:
+        if previous != score:
+            counts[_rollup_key(signal, previous)] -= 1
+            counts[_rollup_key(signal, score)] += 1
+    return _add_counts(counts)
+
+
+def _add_counts(counts: Counter) -> int:
+    rows = sorted((key, count) for key, count in counts.items() if count)
+    if not rows:
+        return 0
+
+    # Sorted keys give concurrent writers the same lock order.
+    values_sql = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(rows))
+    params = []
+    for key, count in rows:
+        params.extend([*key, count])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {ROLLUP_TABLE} (cell_x, cell_y, signal_type, bucket, trust_score, count)
+            VALUES {values_sql}
+            ON CONFLICT (cell_x, cell_y, signal_type, bucket, trust_score)
+            DO UPDATE SET count = {ROLLUP_TABLE}.count + EXCLUDED.count
+            """,
+            params,
+        )
+        if any(count < 0 for _, count in rows):
+            cursor.execute(f'DELETE FROM {ROLLUP_TABLE} WHERE count <= 0 AND bucket = ANY(%s)', [
+                sorted({key[3] for key, count in rows if count < 0}),
+            ])
+    return len(rows)
+
+
+def rebuild_rollups(since: datetime, until: datetime) -> int:
+    """
+    Recompute the rollups for hour buckets overlapping [since, until) from
+    the raw Signal table. The rollup table is locked against concurrent increments
+    for the duration, so rebuild in small windows (see the command).
+    Returns the number of rollup rows written.
+    """
+    size = settings.HEATMAP_CELL_DEGREES
+    since, until = hour_bucket(since), hour_ceiling(until)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {ROLLUP_TABLE} IN SHARE ROW EXCLUSIVE MODE')
+        cursor.execute(
+            f'DELETE FROM {ROLLUP_TABLE} WHERE bucket >= %s AND bucket < %s',
+            [since, until],
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {ROLLUP_TABLE} (cell_x, cell_y, signal_type, bucket, trust_score, count)
+            SELECT floor(ST_X(location) / %s)::int,
+                   floor(ST_Y(location) / %s)::int,
+                   signal_type,
+                   date_trunc('hour', occurred_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                   COALESCE(trust_score, %s),
+                   count(*)
+            FROM signals_signal
+            WHERE occurred_at >= %s AND occurred_at < %s
+            GROUP BY 1, 2, 3, 4, 5
+            """,
+            [size, size, UNSCORED_TRUST, since, until],
+        )
+        return cursor.rowcount
+
+
+def heatmap(signal_filter, resolution: int = 1):
+    """
+    Aggregate rollups into heatmap cells.
+
+    resolution merges resolution x resolution base cells into one output
+    cell. Time filters apply to whole hour buckets. Returns a list of dicts
+    with the cell's south-west corner, size and signal count.
+    """
+    size = settings.HEATMAP_CELL_DEGREES
+    rows = _rollup_heatmap_rows(signal_filter, resolution)
+
+    cell_size = size * resolution
+    return [
+        {
+            'lon': round(gx * cell_size, 6),
+            'lat': round(gy * cell_size, 6),
+            'size': cell_size,
+            'count': total,
+        }
+        for gx, gy, total in rows
+    ]
+
+
+def _rollup_heatmap_rows(signal_filter, resolution):
+    clauses = []
+    params = [resolution, resolution]
+    if signal_filter.types:
+        clauses.append('signal_type = ANY(%s)')
+        params.append(list(signal_filter.types))
+    if signal_filter.since:
+        clauses.append('bucket >= %s')
+        params.append(hour_bucket(signal_filter.since))
+    if signal_filter.until:
+        clauses.append('bucket < %s')
+        params.append(signal_filter.until)
+    if signal_filter.bbox:
+        min_x, min_y = cell_for_point(signal_filter.bbox[0], signal_filter.bbox[1])
+        max_x, max_y = cell_for_point(signal_filter.bbox[2], signal_filter.bbox[3])
+        clauses.append('cell_x BETWEEN %s AND %s AND cell_y BETWEEN %s AND %s')
+        params.extend([min_x, max_x, min_y, max_y])
+    if signal_filter.min_trust is not None:
+        clauses.append('trust_score >= %s')
+        params.append(signal_filter.min_trust)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+    with read_connection().cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT floor(cell_x::float / %s)::int AS gx,
+                   floor(cell_y::float / %s)::int AS gy,
+                   sum(count)::bigint
+            FROM {ROLLUP_TABLE}
+            {where}
+            GROUP BY gx, gy
+            ORDER BY gx, gy
+            """,
+            params,
+        )
+        return cursor.fetchall()
@@ -0,0 +1,58 @@
+"""
+Full-text search over signal content.
+
+Signal.search_vector is maintained by a database trigger (see the
+signal_search_vector migration) and indexed with GIN. Queries use
+websearch_to_tsquery syntax: plain words are ANDed, "quoted phrases",
+``or`` and ``-negation`` are supported.
+
+Ranking every match of a common term on a large table is what makes
+search slow, so only the SIGNAL_SEARCH_MAX_CANDIDATES most recent matches
+(after the type, time and bbox filters) are ranked.
+"""
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery
+
+from apps.signals.models import Signal
+
+# Must match the configuration used by the signals_signal_search_vector trigger
+SEARCH_CONFIG = 'english'
+
+SEARCH_COLUMNS = (
+    's.id, s.content, s.signal_type, s.location, s.occurred_at, s.source_id, '
+    's.incident_id, s.near_duplicate_of, s.trust_score, s.created_at'
+)
+
+
+def search_query(text: str) -> SearchQuery:
+    """
+    SearchQuery for ORM filters on search_vector.
+    """
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def search_signals(text: str, signal_filter, limit: int = 50, offset: int = 0):
+    """
+    Signals whose content matches text, best rank first (ties broken by
+    recency). Each returned Signal carries a ``rank`` attribute.
+    """
+    where, params = signal_filter.as_sql('s')
+    if where:
+        where = f'AND {where}'
+
+    sql = f"""
+        SELECT * FROM (
+            SELECT {SEARCH_COLUMNS}, ts_rank(s.search_vector, q) AS rank
+            FROM signals_signal s, websearch_to_tsquery(%s::regconfig, %s) q
+            WHERE s.search_vector @@ q {where}
+            ORDER BY s.occurred_at DESC
+            LIMIT %s
+        ) candidates
+        ORDER BY rank DESC, occurred_at DESC, id
+        LIMIT %s OFFSET %s
+    """
+    return list(Signal.objects.raw(
+        sql,
+        [SEARCH_CONFIG, text, *params, settings.SIGNAL_SEARCH_MAX_CANDIDATES, limit, offset],
+    ))
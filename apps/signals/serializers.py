@@ -0,0 +1,43 @@
+from rest_framework import serializers
+
+from .models import Signal
+
+
+class SignalSerializer(serializers.ModelSerializer):
+    """
+    Signal representation for the read API.
+    """
+    lon = serializers.SerializerMethodField()
+    lat = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Signal
+        fields = [
+            'id',
+            'signal_type',
+            'content',
+            'occurred_at',
+            'lon',
+            'lat',
+            'source',
+            'incident',
+            'near_duplicate_of',
+            'trust_score',
+            'created_at',
+        ]
+
+    def get_lon(self, obj):
+        return obj.location.x
+
+    def get_lat(self, obj):
+        return obj.location.y
+
+
+class SignalSearchSerializer(SignalSerializer):
+    """
+    Search result: a signal plus its text search rank.
+    """
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(SignalSerializer.Meta):
+        fields = SignalSerializer.Meta.fields + ['rank']
@@ -0,0 +1,280 @@
+"""
+Columnar, memory-mappable snapshots of signals for analytics.
+
+Layout::
+
+    <root>/manifest.json
+    <root>/day=YYYY-MM-DD/id.bin             16-byte UUIDs
+    <root>/day=YYYY-MM-DD/lon.bin            <f8
+    <root>/day=YYYY-MM-DD/lat.bin            <f8
+    <root>/day=YYYY-MM-DD/occurred_at.bin    <i8, microseconds since the epoch (UTC)
+    <root>/day=YYYY-MM-DD/type.bin           u1, index into manifest['signal_types']
+    <root>/day=YYYY-MM-DD/source.bin         <u4, index into manifest['sources']
+    <root>/day=YYYY-MM-DD/trust.bin          <i2
+    <root>/day=YYYY-MM-DD/content_end.bin    <u8, end offset of each row in content.bin
+    <root>/day=YYYY-MM-DD/content.bin        UTF-8 string heap
+
+Days are partitioned by occurred_at. Snapshots are append-only: each run
+exports signals created after the (created_at, id) high-water mark stored
+in the manifest and appends them to their day's files. The manifest records
+the committed row count and heap size of every day; files are truncated back
+to those sizes before appending, so an interrupted run never leaves rows a
+reader can see.
+
+The trust column holds the signal's own trust score (Signal.trust_score),
+or its source's score at export time for signals not yet scored.
+"""
+
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+COLUMNS = {
+    'id': np.dtype('V16'),
+    'lon': np.dtype('<f8'),
+    'lat': np.dtype('<f8'),
+    'occurred_at': np.dtype('<i8'),
+    'type': np.dtype('u1'),
+    'source': np.dtype('<u4'),
+    'trust': np.dtype('<i2'),
+    'content_end': np.dtype('<u8'),
+}
+HEAP = 'content.bin'
+
+
+def _to_micros(value: datetime) -> int:
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_micros(value: int) -> datetime:
+    """
+    Convert an occurred_at column value back to an aware datetime.
+    """
+    return EPOCH + timedelta(microseconds=int(value))
+
+
+def _fsync_directory(path):
+    """
+    Make the entries of files created in a directory durable.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SnapshotWriter:
+    """
+    Appends signal rows to a snapshot directory.
+    """
+
+    def __init__(self, root, signal_types):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.manifest = self._load_manifest(signal_types)
+        self._source_index = {s: i for i, s in enumerate(self.manifest['sources'])}
+        self._type_index = {t: i for i, t in enumerate(self.manifest['signal_types'])}
+
+    def _load_manifest(self, signal_types):
+        path = self.root / MANIFEST
+        if path.exists():
+            manifest = json.loads(path.read_text())
+            if manifest['version'] != FORMAT_VERSION:
+                raise ValueError(f"Unsupported snapshot version {manifest['version']}")
+            # New signal types are appended so existing codes stay valid
+            for signal_type in signal_types:
+                if signal_type not in manifest['signal_types']:
+                    manifest['signal_types'].append(signal_type)
+            return manifest
+        return {
+            'version': FORMAT_VERSION,
+            'signal_types': list(signal_types),
+            'sources': [],
+            'high_water': None,
+            'days': {},
+        }
+
+    @property
+    def high_water(self):
+        """
+        (created_at, id) of the last exported signal, or None.
+        """
+        mark = self.manifest['high_water']
+        if mark is None:
+            return None
+        return datetime.fromisoformat(mark['created_at']), uuid.UUID(mark['id'])
+
+    def _source_code(self, source_id) -> int:
+        key = str(source_id)
+        if key not in self._source_index:
+            self._source_index[key] = len(self.manifest['sources'])
+            self.manifest['sources'].append(key)
+        return self._source_index[key]
+
+    def append(self, rows):
+        """
+        Append a batch of rows and commit the manifest.
+
+        Each row is a tuple of
+        (id, lon, lat, occurred_at, signal_type, source_id, trust, content, created_at)
+        and the batch must be ordered by (created_at, id).
+        """
+        if not rows:
+            return 0
+
+        by_day = defaultdict(list)
+        for row in rows:
+            day = row[3].astimezone(dt_timezone.utc).date().isoformat()
+            by_day[day].append(row)
+
+        for day, day_rows in by_day.items():
+            self._append_day(day, day_rows)
+
+        last = rows[-1]
+        self.manifest['high_water'] = {'created_at': last[8].isoformat(), 'id': str(last[0])}
+        self._write_manifest()
+        return len(rows)
+
+    def _append_day(self, day, rows):
+        directory = self.root / f'day={day}'
+        new_directory = not directory.exists()
+        directory.mkdir(exist_ok=True)
+        state = self.manifest['days'].setdefault(day, {'rows': 0, 'heap_bytes': 0})
+        self._truncate(directory, state)
+
+        encoded = [(row[7] or '').encode('utf-8') for row in rows]
+        lengths = np.fromiter((len(b) for b in encoded), dtype=np.uint64, count=len(rows))
+        columns = {
+            'id': np.frombuffer(b''.join(row[0].bytes for row in rows), dtype=COLUMNS['id']),
+            'lon': np.array([row[1] for row in rows], dtype=COLUMNS['lon']),
+            'lat': np.array([row[2] for row in rows], dtype=COLUMNS['lat']),
+            'occurred_at': np.array([_to_micros(row[3]) for row in rows], dtype=COLUMNS['occurred_at']),
+            'type': np.array([self._type_index[row[4]] for row in rows], dtype=COLUMNS['type']),
+            'source': np.array([self._source_code(row[5]) for row in rows], dtype=COLUMNS['source']),
+            'trust': np.array([row[6] for row in rows], dtype=COLUMNS['trust']),
+            'content_end': (np.cumsum(lengths) + np.uint64(state['heap_bytes'])).astype(COLUMNS['content_end']),
+        }
+
+        # Every file must be durable before the manifest commits its rows
+        for name, values in columns.items():
+            with open(directory / f'{name}.bin', 'ab') as f:
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        with open(directory / HEAP, 'ab') as f:
+            for blob in encoded:
+                f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        if new_directory:
+            _fsync_directory(directory)
+            _fsync_directory(self.root)
+
+        state['rows'] += len(rows)
+        state['heap_bytes'] += int(lengths.sum())
+
+    @staticmethod
+    def _truncate(directory, state):
+        """
+        Drop bytes past the last committed row left by an interrupted run.
+        """
+        for name, dtype in COLUMNS.items():
+            path = directory / f'{name}.bin'
+            if path.exists():
+                os.truncate(path, state['rows'] * dtype.itemsize)
+        heap = directory / HEAP
+        if heap.exists():
+            os.truncate(heap, state['heap_bytes'])
+
+    def _write_manifest(self):
+        path = self.root / MANIFEST
+        tmp = path.with_suffix('.json.tmp')
+        # The rename must not reach the disk before the new contents, and is
+        # itself only durable once the directory entry is
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.manifest, indent=2, sort_keys=True))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        _fsync_directory(self.root)
+
+
+class SnapshotDay:
+    """
+    Zero-copy view of one day partition. Columns are numpy memmaps.
+    """
+
+    def __init__(self, directory, rows, manifest):
+        self.directory = Path(directory)
+        self.rows = rows
+        self.signal_types = manifest['signal_types']
+        self.sources = manifest['sources']
+        self._columns = {}
+        self._heap = None
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """
+        Memory-mapped column; occurred_at is in microseconds since the epoch.
+        """
+        if name not in self._columns:
+            if self.rows == 0:
+                self._columns[name] = np.empty(0, dtype=COLUMNS[name])
+            else:
+                self._columns[name] = np.memmap(
+                    self.directory / f'{name}.bin',
+                    dtype=COLUMNS[name],
+                    mode='r',
+                    shape=(self.rows,),
+                )
+        return self._columns[name]
+
+    def __getattr__(self, name):
+        if name in COLUMNS:
+            return self.column(name)
+        raise AttributeError(name)
+
+    def content(self, index) -> str:
+        """
+        Content string of one row, sliced from the heap.
+        """
+        ends = self.column('content_end')
+        if self._heap is None:
+            # Only the committed bytes; numpy cannot map an empty file
+            size = int(ends[-1]) if self.rows else 0
+            if size == 0:
+                self._heap = np.empty(0, dtype=np.uint8)
+            else:
+                self._heap = np.memmap(self.directory / HEAP, dtype=np.uint8, mode='r', shape=(size,))
+        start = int(ends[index - 1]) if index > 0 else 0
+        return bytes(self._heap[start:int(ends[index])]).decode('utf-8')
+
+
+class SnapshotReader:
+    """
+    Read-only access to a snapshot directory.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.manifest = json.loads((self.root / MANIFEST).read_text())
+
+    def days(self):
+        return sorted(self.manifest['days'])
+
+    def day(self, day) -> SnapshotDay:
+        state = self.manifest['days'][day]
+        return SnapshotDay(self.root / f'day={day}', state['rows'], self.manifest)
@@ -0,0 +1,263 @@
+"""
+Live signal stream fed by Postgres LISTEN/NOTIFY.
+
+Inserting a signal notifies STREAM_CHANNEL with a compact JSON payload
+(see the signal_notify migration). Each worker's event loop holds one
+SignalBroadcaster with a single LISTEN connection, read without blocking
+through the loop's add_reader, which fans every notification out to the
+matching subscribers. The payload is framed as a Server-Sent Event once
+and the same bytes are queued for every subscriber.
+
+Subscribers are indexed by signal type, so a notification only visits
+those that asked for its type (or for every type) before the bbox check.
+
+Backpressure: each subscriber has a bounded queue. When it is full the
+event is dropped for that subscriber only and counted; the client then
+receives a ``resync`` event carrying the number dropped, and should
+re-read the list endpoint. The listener never waits on a client, and
+Postgres queues notifications independently of the inserting
+transaction, so a slow client cannot slow ingestion. Losing the LISTEN
+connection also produces a ``resync`` (dropped: null) once it reconnects.
+
+Streams end after SIGNAL_STREAM_MAX_SECONDS; EventSource clients
+reconnect on their own. This bounds subscriptions left behind by clients
+that disconnected without the server noticing.
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+from collections import defaultdict
+from typing import Optional
+
+import psycopg2
+import psycopg2.extensions
+from django.conf import settings
+from django.db import connections
+
+from apps.signals.filters import SignalFilter
+
+logger = logging.getLogger(__name__)
+
+# Must match the channel notified by the signals_signal_notify trigger
+STREAM_CHANNEL = 'signals_inserted'
+
+# Client reconnection delay, in milliseconds
+RETRY_MS = 3000
+
+_ALL_TYPES = None
+
+
+class StreamFull(Exception):
+    """
+    Raised when a worker already serves SIGNAL_STREAM_MAX_SUBSCRIBERS.
+    """
+
+
+def sse_frame(event: str, data: str, event_id: Optional[str] = None) -> bytes:
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in data.splitlines() or [''])
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class Subscription:
+    """
+    One client's bounded queue of encoded events.
+    """
+
+    def __init__(self, broadcaster, signal_filter: SignalFilter, maxsize: int):
+        self.broadcaster = broadcaster
+        self.filter = signal_filter
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.lost = False
+
+    def offer(self, frame: bytes):
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def close(self):
+        self.broadcaster.unsubscribe(self)
+
+
+class SignalBroadcaster:
+    """
+    Shares one LISTEN connection between every subscriber of an event loop.
+    """
+
+    def __init__(self, using='default'):
+        self.using = using
+        self._by_type = defaultdict(set)
+        self._count = 0
+        self._conn = None
+        self._loop = None
+        self._start_lock = asyncio.Lock()
+        self._reconnect_delay = 1.0
+        self.received = 0
+
+    def __len__(self):
+        return self._count
+
+    async def subscribe(self, signal_filter: SignalFilter) -> Subscription:
+        """
+        Add a subscriber, connecting the listener first if needed.
+        """
+        if self._count >= settings.SIGNAL_STREAM_MAX_SUBSCRIBERS:
+            raise StreamFull()
+        subscription = self.add(signal_filter)
+        try:
+            await self._ensure_listening()
+        except Exception:
+            self.unsubscribe(subscription)
+            raise
+        return subscription
+
+    def add(self, signal_filter: SignalFilter) -> Subscription:
+        subscription = Subscription(self, signal_filter, settings.SIGNAL_STREAM_QUEUE_SIZE)
+        for signal_type in signal_filter.types or (_ALL_TYPES,):
+            self._by_type[signal_type].add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        removed = False
+        for signal_type in subscription.filter.types or (_ALL_TYPES,):
+            subscribers = self._by_type.get(signal_type)
+            if subscribers and subscription in subscribers:
+                subscribers.discard(subscription)
+                removed = True
+                if not subscribers:
+                    del self._by_type[signal_type]
+        if removed:
+            self._count -= 1
+        if self._count == 0:
+            self._stop()
+
+    def dispatch(self, payload: str):
+        """
+        Queue one notification payload for every matching subscriber.
+        """
+        self.received += 1
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f'Ignoring malformed signal notification: {payload[:200]}')
+            return
+
+        targets = self._by_type.get(_ALL_TYPES, set()) | self._by_type.get(event.get('signal_type'), set())
+        frame = None
+        for subscription in targets:
+            if subscription.filter.matches(
+                event.get('signal_type'), event.get('lon'), event.get('lat'), event.get('trust_score'),
+            ):
+                if frame is None:
+                    frame = sse_frame('signal', payload, event.get('id'))
+                subscription.offer(frame)
+
+    async def _ensure_listening(self):
+        async with self._start_lock:
+            if self._conn is not None:
+                return
+            loop = asyncio.get_running_loop()
+            self._conn = await loop.run_in_executor(None, self._connect)
+            self._loop = loop
+            loop.add_reader(self._conn.fileno(), self._on_readable)
+            self._reconnect_delay = 1.0
+            logger.info(f'Listening for signal notifications on {STREAM_CHANNEL}')
+
+    def _connect(self):
+        params = connections[self.using].get_connection_params()
+        conn = psycopg2.connect(**params)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN {STREAM_CHANNEL}')
+        return conn
+
+    def _on_readable(self):
+        try:
+            self._conn.poll()
+        except psycopg2.Error:
+            logger.warning('Signal notification connection lost', exc_info=True)
+            self._lost()
+            return
+        notifies = self._conn.notifies
+        while notifies:
+            self.dispatch(notifies.pop(0).payload)
+
+    def _lost(self):
+        self._stop()
+        for subscribers in list(self._by_type.values()):
+            for subscription in subscribers:
+                subscription.lost = True
+        if self._count:
+            asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        while self._count and self._conn is None:
+            await asyncio.sleep(self._reconnect_delay)
+            self._reconnect_delay = min(self._reconnect_delay * 2, 30.0)
+            try:
+                await self._ensure_listening()
+            except psycopg2.Error:
+                logger.warning('Reconnecting signal notification listener failed', exc_info=True)
+
+    def _stop(self):
+        if self._conn is None:
+            return
+        try:
+            self._loop.remove_reader(self._conn.fileno())
+        except (ValueError, OSError):
+            pass
+        try:
+            self._conn.close()
+        except psycopg2.Error:
+            pass
+        self._conn = None
+
+
+_broadcasters = weakref.WeakKeyDictionary()
+
+
+def get_broadcaster() -> SignalBroadcaster:
+    """
+    The broadcaster of the running event loop (one per worker).
+    """
+    loop = asyncio.get_running_loop()
+    broadcaster = _broadcasters.get(loop)
+    if broadcaster is None:
+        broadcaster = _broadcasters[loop] = SignalBroadcaster()
+    return broadcaster
+
+
+async def event_stream(subscription: Subscription, heartbeat: float = None, max_seconds: float = None):
+    """
+    Encoded SSE frames for one subscription, with keepalive comments
+    while idle. Closes the subscription when the stream ends.
+    """
+    heartbeat = heartbeat or settings.SIGNAL_STREAM_HEARTBEAT
+    max_seconds = max_seconds or settings.SIGNAL_STREAM_MAX_SECONDS
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    try:
+        yield f'retry: {RETRY_MS}\n\n'.encode('utf-8')
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            if subscription.dropped or subscription.lost:
+                dropped = None if subscription.lost else subscription.dropped
+                subscription.dropped = 0
+                subscription.lost = False
+                yield sse_frame('resync', json.dumps({'dropped': dropped}))
+            try:
+                yield await asyncio.wait_for(subscription.queue.get(), min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+    finally:
+        subscription.close()
@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, override_settings
+
+from apps.admin_utils import CachedDatesQuerySet, EstimatedCountPaginator
+from apps.signals.models import Signal
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'admin-tests',
+    },
+}
+
+
+@override_settings(ADMIN_EXACT_COUNT_LIMIT=10000)
+class EstimatedCountPaginatorTestCase(SimpleTestCase):
+    """
+    Test case for the planner-estimate paginator.
+    """
+    def test_unfiltered_count_uses_estimate(self):
+        """
+        Test that an unfiltered large table is counted from reltuples.
+        """
+        with mock.patch('apps.admin_utils.estimated_row_count', return_value=2_500_000), \
+                mock.patch.object(QuerySet, 'count', side_effect=AssertionError('COUNT(*) ran')):
+            paginator = EstimatedCountPaginator(Signal.objects.all(), 100)
+            self.assertEqual(paginator.count, 2_500_000)
+            self.assertEqual(paginator.num_pages, 25_000)
+
+    def test_lists_are_counted_exactly(self):
+        """
+        Test that plain sequences keep the default count.
+        """
+        paginator = EstimatedCountPaginator(list(range(250)), 100)
+        self.assertEqual(paginator.count, 250)
+
+
+@override_settings(CACHES=TEST_CACHES, ADMIN_DATE_HIERARCHY_CACHE_SECONDS=60)
+class CachedDatesQuerySetTestCase(SimpleTestCase):
+    """
+    Test case for the cached date hierarchy lookups.
+    """
+    def setUp(self):
+        cache.clear()
+        self.months = [datetime(2024, 4, 1, tzinfo=timezone.utc), datetime(2024, 5, 1, tzinfo=timezone.utc)]
+
+    def queryset(self):
+        return CachedDatesQuerySet(model=Signal).filter(signal_type='robbery')
+
+    def test_datetimes_are_cached_per_query(self):
+        """
+        Test that repeated date hierarchy lookups hit the database once.
+        """
+        with mock.patch.object(QuerySet, 'datetimes', return_value=self.months) as datetimes:
+            self.assertEqual(self.queryset().datetimes('occurred_at', 'month'), self.months)
+            self.assertEqual(self.queryset().datetimes('occurred_at', 'month'), self.months)
+            self.assertEqual(datetimes.call_count, 1)
+
+            self.queryset().datetimes('occurred_at', 'year')
+            self.queryset().filter(signal_type='assault').datetimes('occurred_at', 'month')
+            self.assertEqual(datetimes.call_count, 3)
@@ -0,0 +1,74 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from apps.signals.export import _buffered, _geojson_parts, _ndjson_lines
+
+
+class ExportEncodingTestCase(SimpleTestCase):
+    """
+    Test case for the streaming export encoders.
+    """
+    def setUp(self):
+        now = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+        self.rows = [
+            {
+                'id': uuid.uuid4(),
+                'signal_type': 'robbery',
+                'content': f'Report {i}',
+                'occurred_at': now,
+                'source_id': uuid.uuid4(),
+                'created_at': now,
+                'lon': 3.38 + i,
+                'lat': 6.52,
+            }
+            for i in range(3)
+        ]
+
+    def test_ndjson_one_record_per_line(self):
+        """
+        Test that every row becomes one JSON line with coordinates.
+        """
+        lines = ''.join(_ndjson_lines(iter(self.rows))).splitlines()
+        self.assertEqual(len(lines), 3)
+        record = json.loads(lines[1])
+        self.assertEqual(record['content'], 'Report 1')
+        self.assertEqual(record['lon'], 4.38)
+
+    def test_geojson_is_a_valid_feature_collection(self):
+        """
+        Test that the streamed parts join into one FeatureCollection.
+        """
+        collection = json.loads(''.join(_geojson_parts(iter(self.rows))))
+        self.assertEqual(collection['type'], 'FeatureCollection')
+        self.assertEqual(len(collection['features']), 3)
+        self.assertEqual(collection['features'][2]['geometry']['coordinates'], [5.38, 6.52])
+
+    def test_geojson_empty(self):
+        """
+        Test that an empty export is still a valid FeatureCollection.
+        """
+        collection = json.loads(''.join(_geojson_parts(iter([]))))
+        self.assertEqual(collection['features'], [])
+
+    def test_buffered_groups_parts(self):
+        """
+        Test that small parts are grouped into larger chunks without loss.
+        """
+        chunks = list(_buffered(iter(['ab', 'cd', 'ef', 'g']), 4))
+        self.assertEqual(chunks, ['abcd', 'efg'])
+
+
+class ExportCommandTestCase(SimpleTestCase):
+    """
+    Test case for the export_signals command arguments.
+    """
+    def test_min_trust_is_parsed_as_a_filter(self):
+        """
+        Test that --min-trust goes through the list API filter validation.
+        """
+        with self.assertRaisesMessage(CommandError, "'min_trust' must be between 0 and 100"):
+            call_command('export_signals', '--min-trust', '150')
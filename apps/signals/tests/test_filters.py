@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.signals.filters import SignalFilter
+from apps.signals.models import Signal
+from apps.signals.rollups import cell_for_point, heatmap, increment_rollups
+from apps.sources.models import Source
+
+
+class MinTrustParsingTestCase(SimpleTestCase):
+    """
+    Test case for the min_trust filter parameter.
+    """
+
+    def test_parse_and_validate(self):
+        """
+        Test that min_trust is parsed as an integer from 0 to 100.
+        """
+        self.assertEqual(SignalFilter.from_params({'min_trust': '70'}).min_trust, 70)
+        self.assertIsNone(SignalFilter.from_params({}).min_trust)
+        for value in ('high', '101', '-1'):
+            with self.assertRaises(ValueError):
+                SignalFilter.from_params({'min_trust': value})
+
+    def test_cache_key_and_live_matching(self):
+        """
+        Test that min_trust changes the cache key and live signals below it, or unscored, do not match.
+        """
+        trusted = SignalFilter(min_trust=70)
+        self.assertNotEqual(trusted.cache_key(), SignalFilter().cache_key())
+        self.assertTrue(trusted.matches('robbery', 3.38, 6.52, 85))
+        self.assertFalse(trusted.matches('robbery', 3.38, 6.52, 60))
+        self.assertFalse(trusted.matches('robbery', 3.38, 6.52, None))
+        self.assertTrue(SignalFilter().matches('robbery', 3.38, 6.52))
+
+    def test_as_sql(self):
+        """
+        Test that min_trust renders as a trust_score bound.
+        """
+        self.assertEqual(SignalFilter(min_trust=70).as_sql('s'), ('s.trust_score >= %s', [70]))
+
+
+class MinTrustQueryTestCase(TestCase):
+    """
+    Test case for filtering stored signals by trust.
+    """
+    def setUp(self):
+        source = Source.objects.create(platform='test', external_identifier='filters', trust_score=95)
+        now = timezone.now() - timedelta(hours=1)
+        self.trusted = self.create(source, now, 85, 3.381)
+        low = self.create(source, now + timedelta(minutes=1), 55, 3.382)
+        unscored = self.create(source, now + timedelta(minutes=2), None, 3.383)
+        increment_rollups([self.trusted, low, unscored])
+
+    def create(self, source, occurred_at, trust_score, lon):
+        return Signal.objects.create(
+            content='Robbery at the market',
+            signal_type='robbery',
+            location=Point(lon, 6.52, srid=4326),
+            occurred_at=occurred_at,
+            source=source,
+            trust_score=trust_score,
+        )
+
+    def test_apply_filters_by_signal_trust(self):
+        """
+        Test that only signals whose own score reaches min_trust match, whatever their source's score.
+        """
+        queryset = SignalFilter(min_trust=70).apply(Signal.objects.all())
+        self.assertEqual(list(queryset.values_list('id', flat=True)), [self.trusted.id])
+
+    def test_heatmap_counts_trusted_signals(self):
+        """
+        Test that a min_trust heatmap counts only trusted signals from the rollups.
+        """
+        with self.assertNumQueries(1):
+            trusted = heatmap(SignalFilter(min_trust=70, bbox=(3.0, 6.0, 4.0, 7.0)))
+        size = settings.HEATMAP_CELL_DEGREES
+        cell_x, cell_y = cell_for_point(3.381, 6.52)
+        self.assertEqual(
+            [(cell['lon'], cell['lat'], cell['count']) for cell in trusted],
+            [(round(cell_x * size, 6), round(cell_y * size, 6), 1)],
+        )
@@ -0,0 +1,175 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.signals.incidents import IncidentClusterer, IncidentIndex, assign_incident, distance_m, recluster
+from apps.signals.models import Incident, Signal
+from apps.sources.models import Source
+
+THRESHOLDS = {
+    'robbery': (500, 30),
+    'burglary': (200, 120),
+    'other': (250, 30),
+}
+T0 = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+
+
+@override_settings(INCIDENT_THRESHOLDS=THRESHOLDS)
+class IncidentIndexTestCase(SimpleTestCase):
+    """
+    Test case for the grid-bucketed neighbour index.
+    """
+    def setUp(self):
+        self.index = IncidentIndex()
+        self.incident = uuid.uuid4()
+        # Lagos
+        self.lon, self.lat = 3.3792, 6.5244
+
+    def test_neighbour_within_thresholds(self):
+        """
+        Test that a signal 300 m and 10 minutes away joins the incident.
+        """
+        self.index.add('robbery', self.lon, self.lat, T0, self.incident)
+        found = self.index.nearest('robbery', self.lon, self.lat + 0.0027, T0 + timedelta(minutes=10))
+        self.assertEqual(found, self.incident)
+
+    def test_thresholds_are_per_type(self):
+        """
+        Test that distance, time and type all have to match.
+        """
+        self.index.add('robbery', self.lon, self.lat, T0, self.incident)
+        self.index.add('burglary', self.lon, self.lat, T0, self.incident)
+
+        self.assertIsNone(self.index.nearest('robbery', self.lon, self.lat, T0 + timedelta(minutes=45)))
+        self.assertIsNotNone(self.index.nearest('burglary', self.lon, self.lat, T0 + timedelta(minutes=45)))
+        self.assertIsNone(self.index.nearest('burglary', self.lon, self.lat + 0.0027, T0))
+        self.assertIsNone(self.index.nearest('assault', self.lon, self.lat, T0))
+
+    def test_nearest_incident_wins(self):
+        """
+        Test that the closest neighbour's incident is chosen.
+        """
+        near, far = uuid.uuid4(), uuid.uuid4()
+        self.index.add('robbery', self.lon, self.lat + 0.004, T0, far)
+        self.index.add('robbery', self.lon, self.lat + 0.001, T0, near)
+        self.assertEqual(self.index.nearest('robbery', self.lon, self.lat, T0), near)
+
+    def test_matches_brute_force(self):
+        """
+        Test that grid lookups find exactly the neighbours a full scan finds,
+        including at high latitudes.
+        """
+        rng = random.Random(7)
+        for base_lat in (6.5, 59.9):
+            index = IncidentIndex()
+            points = []
+            for i in range(400):
+                lon = 3.0 + rng.uniform(0, 0.05)
+                lat = base_lat + rng.uniform(0, 0.03)
+                at = T0 + timedelta(minutes=rng.uniform(0, 180))
+                points.append((lon, lat, at, i))
+                index.add('robbery', lon, lat, at, i)
+
+            for _ in range(200):
+                lon = 3.0 + rng.uniform(0, 0.05)
+                lat = base_lat + rng.uniform(0, 0.03)
+                at = T0 + timedelta(minutes=rng.uniform(0, 180))
+                candidates = [
+                    (distance_m(lon, lat, p_lon, p_lat), abs((p_at - at).total_seconds()), i)
+                    for p_lon, p_lat, p_at, i in points
+                    if abs((p_at - at).total_seconds()) <= 1800
+                ]
+                candidates = [c for c in candidates if c[0] <= 500]
+                expected = min(candidates)[2] if candidates else None
+                self.assertEqual(index.nearest('robbery', lon, lat, at), expected)
+
+    def test_prune_drops_only_stale_entries(self):
+        """
+        Test that pruning keeps entries that can still match.
+        """
+        self.index.add('robbery', self.lon, self.lat, T0, self.incident)
+        self.index.prune(T0 + timedelta(minutes=20))
+        self.assertEqual(len(self.index), 1)
+        self.index.prune(T0 + timedelta(hours=3))
+        self.assertEqual(len(self.index), 0)
+
+
+@override_settings(INCIDENT_THRESHOLDS=THRESHOLDS)
+class ReclusterTestCase(TestCase):
+    """
+    Test case for bulk reclustering.
+    """
+    def setUp(self):
+        self.sources = [
+            Source.objects.create(platform="test_platform", external_identifier=f"source_{i}")
+            for i in range(3)
+        ]
+
+    def create_signal(self, source, lat_offset, minutes):
+        return Signal.objects.create(
+            content="Robbery at the junction",
+            signal_type='robbery',
+            location=Point(3.3792, 6.5244 + lat_offset),
+            occurred_at=T0 + timedelta(minutes=minutes),
+            source=source,
+        )
+
+    def test_reports_of_one_event_share_an_incident(self):
+        """
+        Test that nearby reports from different sources form one incident.
+        """
+        for i, source in enumerate(self.sources):
+            self.create_signal(source, 0.001 * i, 5 * i)
+        self.create_signal(self.sources[0], 0.05, 0)
+
+        result = recluster(batch_size=2)
+
+        self.assertEqual(result.signals, 4)
+        self.assertEqual(Incident.objects.count(), 2)
+        incident = Incident.objects.get(signal_count=3)
+        self.assertEqual(incident.first_seen, T0)
+        self.assertEqual(incident.last_seen, T0 + timedelta(minutes=10))
+
+    def test_recluster_replaces_stale_incidents(self):
+        """
+        Test that rerunning removes incidents no signal refers to.
+        """
+        self.create_signal(self.sources[0], 0, 0)
+        recluster()
+        recluster()
+        self.assertEqual(Incident.objects.count(), 1)
+        self.assertEqual(Signal.objects.filter(incident__isnull=True).count(), 0)
+
+
+@override_settings(INCIDENT_THRESHOLDS=THRESHOLDS)
+class AssignIncidentTestCase(TestCase):
+    """
+    Test case for assigning incidents from several clusterers.
+    """
+
+    def test_clusterers_share_incidents_stored_by_others(self):
+        """
+        Test that a clusterer loaded before another stored an incident still joins that incident.
+        """
+        source = Source.objects.create(platform="test_platform", external_identifier="worker")
+        first, second = IncidentClusterer(), IncidentClusterer()
+        location = Point(3.3792, 6.5244, srid=4326)
+        # Both workers have loaded the time range while it was empty
+        self.assertIsNone(second.match('robbery', location.x, location.y, T0))
+
+        incident_id = assign_incident(first, 'robbery', location, T0)
+        Signal.objects.create(
+            content="Robbery at the junction",
+            signal_type='robbery',
+            location=location,
+            occurred_at=T0,
+            source=source,
+            incident_id=incident_id,
+        )
+
+        nearby = Point(3.3792, 6.5262, srid=4326)
+        self.assertEqual(assign_incident(second, 'robbery', nearby, T0 + timedelta(minutes=5)), incident_id)
+        self.assertEqual(Incident.objects.get().signal_count, 2)
@@ -0,0 +1,98 @@
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.gis.geos import Point
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase
+
+from apps.signals.models import Signal
+from apps.signals.partitions import (
+    add_months, create_partition, existing_partitions, month_bounds, month_start, partition_month, partition_name,
+)
+from apps.sources.models import Source
+
+
+class PartitionNamingTestCase(SimpleTestCase):
+    """
+    Test case for the monthly partition helpers.
+    """
+    def test_add_months_across_years(self):
+        """
+        Test that month arithmetic wraps around the year.
+        """
+        self.assertEqual(add_months(date(2024, 11, 1), 3), date(2025, 2, 1))
+        self.assertEqual(add_months(date(2024, 1, 1), -1), date(2023, 12, 1))
+
+    def test_partition_name(self):
+        """
+        Test that partitions are named after their month.
+        """
+        self.assertEqual(partition_name(date(2024, 5, 1)), 'signals_signal_p2024_05')
+
+    def test_month_bounds_are_utc_half_open(self):
+        """
+        Test that bounds cover exactly one UTC month.
+        """
+        lower, upper = month_bounds(date(2024, 12, 1))
+        self.assertEqual(lower, datetime(2024, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(upper, datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+    def test_partition_month_round_trip(self):
+        """
+        Test that partition names parse back to their month.
+        """
+        self.assertEqual(partition_month('signals_signal_p2024_05'), date(2024, 5, 1))
+        self.assertIsNone(partition_month('signals_signal_default'))
+
+
+class CreatePartitionTestCase(TestCase):
+    """
+    Test case for creating partitions and routing queries to them.
+    """
+    def setUp(self):
+        self.source = Source.objects.create(platform='test', external_identifier='partitions')
+
+    def create_signal(self, occurred_at):
+        return Signal.objects.create(
+            content='Robbery at the market',
+            signal_type='robbery',
+            location=Point(3.38, 6.52, srid=4326),
+            occurred_at=occurred_at,
+            source=self.source,
+        )
+
+    def partitions_scanned(self, lower, upper):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'EXPLAIN SELECT count(*) FROM signals_signal WHERE occurred_at >= %s AND occurred_at < %s',
+                [lower, upper],
+            )
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        return set(re.findall(r'signals_signal_(?:p\d{4}_\d{2}|default)', plan))
+
+    def test_rows_move_out_of_default_partition(self):
+        """
+        Test that a new partition takes its month's rows from the default partition and keeps them deduplicated.
+        """
+        month = add_months(month_start(date.today()), -20)
+        lower, _ = month_bounds(month)
+        stored = self.create_signal(lower + timedelta(days=3))
+
+        self.assertEqual(create_partition(month), 1)
+
+        self.assertIn(partition_name(month), existing_partitions())
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM {partition_name(month)}')
+            self.assertEqual(cursor.fetchall(), [(stored.id,)])
+            cursor.execute('SELECT count(*) FROM signals_signal_default')
+            self.assertEqual(cursor.fetchone()[0], 0)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_signal(stored.occurred_at)
+
+    def test_month_query_reads_one_partition(self):
+        """
+        Test that a query bounded to one month is pruned to that month's partition.
+        """
+        month = month_start(date.today())
+        lower, upper = month_bounds(month)
+        self.assertEqual(self.partitions_scanned(lower, upper), {partition_name(month)})
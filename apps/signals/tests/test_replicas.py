@@ -0,0 +1,131 @@
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.db import DEFAULT_DB_ALIAS
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps import db_router
+from apps.db_router import ReplicaLagMonitor, ReplicaReadMiddleware, read_alias, replica_reads
+from apps.signals.models import Signal
+from apps.sources.models import Source
+
+
+class FakeMonitor(ReplicaLagMonitor):
+    def __init__(self, lags, **kwargs):
+        super().__init__(aliases=sorted(lags), max_lag=5, check_interval=60, **kwargs)
+        self.lags = lags
+        self.checks = 0
+
+    def measure(self, alias):
+        self.checks += 1
+        return self.lags[alias]
+
+
+class ReplicaRoutingTestCase(SimpleTestCase):
+    """
+    Test case for replica selection and fallback.
+    """
+
+    def _use(self, monitor):
+        patcher = mock.patch.object(db_router, '_monitor', monitor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_primary_unless_replica_reads_allowed(self):
+        """
+        Test that reads stay on the primary outside replica_reads.
+        """
+        self._use(FakeMonitor({'replica_1': 0.0}))
+        self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+        with replica_reads():
+            self.assertEqual(read_alias(), 'replica_1')
+            with replica_reads(False):
+                self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_stale_and_failing_replicas_are_skipped(self):
+        """
+        Test that lagging or unreachable replicas are not used and healthy ones alternate.
+        """
+        self._use(FakeMonitor({'replica_1': 0.5, 'replica_2': 30.0, 'replica_3': None, 'replica_4': 1.0}))
+        with replica_reads():
+            picks = {read_alias() for _ in range(4)}
+        self.assertEqual(picks, {'replica_1', 'replica_4'})
+
+    def test_fallback_to_primary(self):
+        """
+        Test that reads fall back to the primary when every replica is stale.
+        """
+        self._use(FakeMonitor({'replica_1': 60.0}))
+        with replica_reads():
+            self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_lag_is_cached(self):
+        """
+        Test that lag is measured at most once per check interval.
+        """
+        monitor = FakeMonitor({'replica_1': 0.0})
+        for _ in range(10):
+            monitor.pick()
+        self.assertEqual(monitor.checks, 1)
+        monitor.reset()
+        monitor.pick()
+        self.assertEqual(monitor.checks, 2)
+
+    def test_middleware_allows_only_safe_api_requests(self):
+        """
+        Test that the middleware enables replica reads for API GETs only.
+        """
+        self._use(FakeMonitor({'replica_1': 0.0}))
+        middleware = ReplicaReadMiddleware(lambda request: read_alias())
+        factory = RequestFactory()
+        self.assertEqual(middleware(factory.get('/api/v2/signals/')), 'replica_1')
+        self.assertEqual(middleware(factory.post('/api/v2/sources/trust/as-of/')), DEFAULT_DB_ALIAS)
+        self.assertEqual(middleware(factory.get('/admin/signals/signal/')), DEFAULT_DB_ALIAS)
+        self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+
+
+@unittest.skipUnless('replica_1' in settings.DATABASES, 'Set DB_REPLICA_HOSTS to a second local Postgres')
+class ReplicaDatabaseTestCase(TransactionTestCase):
+    """
+    Test case for routing against a second Postgres instance.
+
+    The test databases on the two servers are independent, so a row
+    written to the primary is only visible when reads go to the primary.
+    """
+    databases = {'default', 'replica_1'}
+
+    def setUp(self):
+        self.monitor = ReplicaLagMonitor(aliases=['replica_1'], max_lag=5, check_interval=60)
+        patcher = mock.patch.object(db_router, '_monitor', self.monitor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        source = Source.objects.create(platform='test', external_identifier='replica')
+        Signal.objects.create(
+            content='Written to the primary',
+            signal_type='robbery',
+            location=Point(3.39, 6.45, srid=4326),
+            occurred_at=timezone.now(),
+            source=source,
+        )
+
+    def test_reads_go_to_replica(self):
+        """
+        Test that allowed reads use the replica and writes stay on the primary.
+        """
+        self.assertEqual(self.monitor.lag('replica_1'), 0.0)
+        with replica_reads():
+            self.assertEqual(Signal.objects.count(), 0)
+            self.assertEqual(Signal.objects.db_manager(DEFAULT_DB_ALIAS).count(), 1)
+        self.assertEqual(Signal.objects.count(), 1)
+
+    def test_stale_replica_falls_back_to_primary(self):
+        """
+        Test that reads return to the primary when the replica's lag is too high.
+        """
+        with mock.patch.object(self.monitor, 'measure', return_value=120.0), replica_reads():
+            self.monitor.reset()
+            self.assertEqual(Signal.objects.count(), 1)
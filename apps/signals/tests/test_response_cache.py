@@ -0,0 +1,106 @@
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, override_settings
+
+from apps import db_router
+from apps.db_router import ReplicaLagMonitor, read_alias, replica_reads
+from apps.signals.filters import SignalFilter
+from apps.signals.response_cache import GLOBAL_REGION, ResponseCache
+
+TEST_CACHES = {
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'response-cache-tests',
+    },
+}
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    RESPONSE_CACHE_CELL_DEGREES=0.1,
+    RESPONSE_CACHE_MAX_REGIONS=16,
+    RESPONSE_CACHE_TIMEOUT=60,
+)
+class ResponseCacheTestCase(SimpleTestCase):
+    """
+    Test case for the region-versioned response cache.
+    """
+    def setUp(self):
+        self.cache = ResponseCache()
+        self.cache.cache.clear()
+        self.filter = SignalFilter(
+            since=datetime(2024, 5, 1, tzinfo=timezone.utc),
+            until=datetime(2024, 5, 2, tzinfo=timezone.utc),
+            bbox=(3.31, 6.41, 3.39, 6.49),
+        )
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return {'results': self.calls}
+
+    def signal_at(self, lon, lat, when):
+        return SimpleNamespace(location=Point(lon, lat, srid=4326), occurred_at=when)
+
+    def test_regions_for_bbox_and_day(self):
+        """
+        Test that a small bbox and one day map to one (cell, day) region.
+        """
+        self.assertEqual(self.cache.regions_for(self.filter), ['rv:33:64:2024-05-01'])
+
+    def test_unbounded_query_uses_global_region(self):
+        """
+        Test that a query without filters depends on the global version.
+        """
+        self.assertEqual(self.cache.regions_for(SignalFilter()), [GLOBAL_REGION])
+
+    def test_hit_then_miss_after_bump_in_region(self):
+        """
+        Test that a write inside the queried region expires the response.
+        """
+        self.cache.get_or_compute('list', self.filter, {}, self.compute)
+        _, hit = self.cache.get_or_compute('list', self.filter, {}, self.compute)
+        self.assertTrue(hit)
+
+        self.cache.bump([self.signal_at(3.35, 6.45, datetime(2024, 5, 1, 12, tzinfo=timezone.utc))])
+        data, hit = self.cache.get_or_compute('list', self.filter, {}, self.compute)
+        self.assertFalse(hit)
+        self.assertEqual(data, {'results': 2})
+
+    def test_bump_outside_region_keeps_response(self):
+        """
+        Test that writes to another cell or day do not expire the response.
+        """
+        self.cache.get_or_compute('list', self.filter, {}, self.compute)
+        self.cache.bump([
+            self.signal_at(4.35, 6.45, datetime(2024, 5, 1, 12, tzinfo=timezone.utc)),
+            self.signal_at(3.35, 6.45, datetime(2024, 5, 3, 12, tzinfo=timezone.utc)),
+        ])
+        _, hit = self.cache.get_or_compute('list', self.filter, {}, self.compute)
+        self.assertTrue(hit)
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=5, REPLICA_LAG_CHECK_SECONDS=2)
+    def test_miss_after_recent_write_is_computed_on_primary(self):
+        """
+        Test that a miss on a region written within the replica lag horizon reads the primary, and later misses a replica.
+        """
+        monitor = ReplicaLagMonitor(aliases=['replica_1'], max_lag=5, check_interval=60)
+        aliases = []
+
+        def compute():
+            aliases.append(read_alias())
+            return {}
+
+        self.cache.bump([self.signal_at(3.35, 6.45, datetime(2024, 5, 1, 12, tzinfo=timezone.utc))])
+        later = time.time() + 60
+        with mock.patch.object(db_router, '_monitor', monitor), mock.patch.object(monitor, 'measure', return_value=0.0):
+            with replica_reads():
+                self.cache.get_or_compute('list', self.filter, {'page': 1}, compute)
+                with mock.patch('apps.signals.response_cache.time_module.time', return_value=later):
+                    self.cache.get_or_compute('list', self.filter, {'page': 2}, compute)
+        self.assertEqual(aliases, ['default', 'replica_1'])
@@ -0,0 +1,151 @@
+import threading
+from datetime import date, timedelta
+
+from django.contrib.gis.geos import Point
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.signals.models import Signal, SignalArchive, SignalDedupKey
+from apps.signals.partitions import add_months, create_partition, month_bounds, month_start
+from apps.signals.retention import archive_rows, detach_partitions
+from apps.sources.models import Source
+
+
+def create_signal(source, occurred_at, content='Robbery at the market', **fields):
+    return Signal.objects.create(
+        content=content,
+        signal_type='robbery',
+        location=Point(3.38, 6.52, srid=4326),
+        occurred_at=occurred_at,
+        source=source,
+        **fields,
+    )
+
+
+class ArchiveRowsTestCase(TestCase):
+    """
+    Test case for moving old signals into the archive.
+    """
+    def setUp(self):
+        self.now = timezone.now()
+        self.cutoff = self.now - timedelta(days=365)
+        self.source = Source.objects.create(platform='test', external_identifier='retention')
+
+    def test_archived_rows_keep_trust_and_links(self):
+        """
+        Test that archived signals keep their trust score, breakdown, incident and near-duplicate link.
+        """
+        old = create_signal(
+            self.source,
+            self.now - timedelta(days=400),
+            near_duplicate_of=self.source.id,
+            trust_score=85,
+            trust_breakdown=0b10111,
+        )
+        create_signal(self.source, self.now, content='Robbery at the station')
+
+        result = archive_rows(self.cutoff, sleep=0)
+
+        self.assertEqual(result.moved, 1)
+        self.assertEqual(Signal.objects.count(), 1)
+        archived = SignalArchive.objects.get(id=old.id)
+        self.assertEqual(
+            (archived.trust_score, archived.trust_breakdown, archived.near_duplicate_of, archived.incident_id),
+            (85, 0b10111, self.source.id, old.incident_id),
+        )
+
+    def test_batches_move_old_rows_and_release_their_keys(self):
+        """
+        Test that old signals move in batches, newer ones stay, and the dedup keys of moved signals are released.
+        """
+        old = [create_signal(self.source, self.now - timedelta(days=400, minutes=i)) for i in range(3)]
+        recent = create_signal(self.source, self.now)
+
+        result = archive_rows(self.cutoff, batch_size=2, sleep=0)
+
+        self.assertEqual((result.moved, result.batches, result.finished), (3, 2, True))
+        self.assertEqual(list(Signal.objects.values_list('id', flat=True)), [recent.id])
+        self.assertEqual(SignalArchive.objects.count(), 3)
+        self.assertEqual(
+            list(SignalDedupKey.objects.values_list('dedup_hash', flat=True)), [recent.dedup_hash],
+        )
+        # A released key can be claimed again
+        create_signal(self.source, old[0].occurred_at)
+
+    def test_spent_time_budget_stops_before_finishing(self):
+        """
+        Test that a run out of time stops and reports it is not finished.
+        """
+        create_signal(self.source, self.now - timedelta(days=400))
+
+        result = archive_rows(self.cutoff, time_budget=0, sleep=0)
+
+        self.assertEqual((result.moved, result.finished), (0, False))
+        self.assertEqual(Signal.objects.count(), 1)
+
+
+class ArchiveLockedRowsTestCase(TransactionTestCase):
+    """
+    Test case for archiving next to sessions holding row locks.
+    """
+
+    def test_locked_rows_are_skipped(self):
+        """
+        Test that a batch skips signals locked by another session and moves the rest.
+        """
+        now = timezone.now()
+        source = Source.objects.create(platform='test', external_identifier='locked')
+        locked = create_signal(source, now - timedelta(days=400))
+        free = create_signal(source, now - timedelta(days=401))
+        holding, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    Signal.objects.select_for_update().get(id=locked.id, occurred_at=locked.occurred_at)
+                    holding.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        holding.wait(10)
+
+        result = archive_rows(now - timedelta(days=365), sleep=0)
+
+        self.assertEqual(result.moved, 1)
+        self.assertEqual(list(SignalArchive.objects.values_list('id', flat=True)), [free.id])
+        self.assertTrue(Signal.objects.filter(id=locked.id).exists())
+
+
+class DetachPartitionsTestCase(TestCase):
+    """
+    Test case for archiving whole monthly partitions.
+    """
+
+    def test_detached_partition_releases_keys_and_source(self):
+        """
+        Test that a detached month keeps its rows, releases their dedup keys and does not block deleting its source.
+        """
+        month = add_months(month_start(date.today()), -14)
+        lower, upper = month_bounds(month)
+        source = Source.objects.create(platform='test', external_identifier='detach')
+        signals = [create_signal(source, lower + timedelta(days=1, minutes=i)) for i in range(2)]
+        create_partition(month)
+
+        result = detach_partitions(upper, sleep=0)
+
+        archive_name = f'signals_signalarchive_p{month:%Y_%m}'
+        self.assertEqual((result.detached, result.keys_released), ([archive_name], 2))
+        self.assertFalse(Signal.objects.exists())
+        self.assertFalse(SignalDedupKey.objects.filter(dedup_hash__in=[s.dedup_hash for s in signals]).exists())
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {archive_name}')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+        source.delete()
+        self.assertFalse(Source.objects.filter(id=source.id).exists())
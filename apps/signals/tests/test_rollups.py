@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.signals.rollups import cell_for_point, hour_bucket, hour_ceiling
+
+
+@override_settings(HEATMAP_CELL_DEGREES=0.01)
+class RollupCellTestCase(SimpleTestCase):
+    """
+    Test case for the heatmap rollup keys.
+    """
+    def test_cell_for_point(self):
+        """
+        Test that points map to floor(coordinate / size) cells.
+        """
+        self.assertEqual(cell_for_point(3.3792, 6.5244), (337, 652))
+
+    def test_negative_coordinates_round_down(self):
+        """
+        Test that cells west/south of the origin are not truncated towards zero.
+        """
+        self.assertEqual(cell_for_point(-0.001, -0.001), (-1, -1))
+
+    def test_hour_bucket(self):
+        """
+        Test that timestamps are truncated to the hour.
+        """
+        value = datetime(2024, 5, 1, 13, 47, 12, 500, tzinfo=timezone.utc)
+        self.assertEqual(
+            hour_bucket(value),
+            datetime(2024, 5, 1, 13, tzinfo=timezone.utc)
+        )
+
+    def test_hour_bucket_is_utc(self):
+        """
+        Test that a timestamp in a half-hour offset zone is bucketed by its UTC hour.
+        """
+        kolkata = timezone(timedelta(hours=5, minutes=30))
+        value = datetime(2024, 5, 1, 19, 17, tzinfo=kolkata)
+        self.assertEqual(hour_bucket(value), datetime(2024, 5, 1, 13, tzinfo=timezone.utc))
+
+    def test_hour_ceiling(self):
+        """
+        Test that a timestamp inside an hour rounds up to its end, and an hour boundary is kept.
+        """
+        self.assertEqual(
+            hour_ceiling(datetime(2024, 5, 1, 13, 47, tzinfo=timezone.utc)),
+            datetime(2024, 5, 1, 14, tzinfo=timezone.utc),
+        )
+        self.assertEqual(
+            hour_ceiling(datetime(2024, 5, 1, 13, tzinfo=timezone.utc)),
+            datetime(2024, 5, 1, 13, tzinfo=timezone.utc),
+        )
@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.signals.filters import SignalFilter
+from apps.signals.models import Signal
+from apps.signals.search import search_query, search_signals
+from apps.signals.serializers import SignalSearchSerializer
+from apps.sources.models import Source
+
+
+class SignalSearchTestCase(TestCase):
+    """
+    Test case for full-text search over signal content.
+    """
+    def setUp(self):
+        self.source = Source.objects.create(
+            platform="test_platform",
+            external_identifier="test_id",
+        )
+        self.now = timezone.now()
+        self.lagos = Point(3.3792, 6.5244)
+        self.abuja = Point(7.4951, 9.0579)
+
+    def create_signal(self, content, signal_type='robbery', location=None, minutes_ago=0):
+        return Signal.objects.create(
+            content=content,
+            signal_type=signal_type,
+            location=location or self.lagos,
+            occurred_at=self.now - timedelta(minutes=minutes_ago),
+            source=self.source,
+        )
+
+    def test_search_vector_filled_on_insert(self):
+        """
+        Test that the trigger fills search_vector for ORM and bulk inserts.
+        """
+        self.create_signal("Armed robbers attacked a bus stop")
+        Signal.objects.bulk_create([
+            Signal(
+                content="Car stolen outside the market",
+                signal_type='vehicle_theft',
+                location=self.lagos,
+                occurred_at=self.now,
+                source=self.source,
+                dedup_hash='bulk-1',
+            ),
+        ])
+        self.assertEqual(Signal.objects.filter(search_vector__isnull=True).count(), 0)
+        self.assertEqual(Signal.objects.filter(search_vector=search_query("stolen cars")).count(), 1)
+
+    def test_ranked_results(self):
+        """
+        Test that denser matches rank first and every result carries a rank.
+        """
+        self.create_signal("Robbery reported near the market", minutes_ago=2)
+        self.create_signal("Robbery at the market, second robbery this week", minutes_ago=1)
+        self.create_signal("Traffic is heavy on the bridge")
+
+        results = search_signals("robbery", SignalFilter())
+        self.assertEqual(len(results), 2)
+        self.assertIn("second robbery", results[0].content)
+        self.assertGreaterEqual(results[0].rank, results[1].rank)
+
+    def test_search_combines_with_filters(self):
+        """
+        Test that type, time and bbox filters narrow the matches.
+        """
+        self.create_signal("Gunshots heard at the junction", location=self.lagos)
+        self.create_signal("Gunshots heard near the stadium", location=self.abuja)
+        self.create_signal("Gunshots and a robbery", signal_type='assault', minutes_ago=120)
+
+        lagos_only = SignalFilter(bbox=(3.0, 6.0, 4.0, 7.0))
+        self.assertEqual(len(search_signals("gunshots", lagos_only)), 2)
+
+        recent = SignalFilter(since=self.now - timedelta(minutes=30))
+        self.assertEqual(len(search_signals("gunshots", recent)), 2)
+
+        assaults = SignalFilter(types=('assault',))
+        self.assertEqual(len(search_signals("gunshots", assaults)), 1)
+
+    def test_results_serialize_in_one_query(self):
+        """
+        Test that serializing a page of results loads no deferred fields row by row.
+        """
+        for minutes_ago in range(3):
+            signal = self.create_signal("Robbery reported near the market", minutes_ago=minutes_ago)
+            Signal.objects.filter(id=signal.id).update(trust_score=70 + minutes_ago)
+
+        with self.assertNumQueries(1):
+            data = SignalSearchSerializer(search_signals("robbery", SignalFilter()), many=True).data
+        self.assertEqual(sorted(row['trust_score'] for row in data), [70, 71, 72])
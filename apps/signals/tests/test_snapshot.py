@@ -0,0 +1,105 @@
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.signals import snapshot
+from apps.signals.snapshot import SnapshotReader, SnapshotWriter, from_micros
+
+SIGNAL_TYPES = ['robbery', 'assault', 'other']
+
+
+class SnapshotTestCase(SimpleTestCase):
+    """
+    Test case for the columnar signal snapshot.
+    """
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        start = datetime(2024, 5, 1, 22, tzinfo=timezone.utc)
+        self.source = uuid.uuid4()
+        self.rows = [
+            (
+                uuid.uuid4(), 3.3 + i, 6.5, start + timedelta(hours=i),
+                SIGNAL_TYPES[i % 3], self.source, 50 + i, f'Report {i} ✓',
+                start + timedelta(seconds=i),
+            )
+            for i in range(4)
+        ]
+
+    def test_round_trip_by_day(self):
+        """
+        Test that rows are partitioned by day and read back from memmaps.
+        """
+        SnapshotWriter(self.root, SIGNAL_TYPES).append(self.rows)
+        reader = SnapshotReader(self.root)
+        self.assertEqual(reader.days(), ['2024-05-01', '2024-05-02'])
+
+        day = reader.day('2024-05-02')
+        self.assertEqual(len(day), 2)
+        self.assertEqual(list(day.lon), [5.3, 6.3])
+        self.assertEqual(list(day.trust), [52, 53])
+        self.assertEqual([day.signal_types[code] for code in day.type], ['other', 'robbery'])
+        self.assertEqual(day.content(1), 'Report 3 ✓')
+        self.assertEqual(from_micros(day.occurred_at[0]), self.rows[2][3])
+
+    def test_incremental_append(self):
+        """
+        Test that a second run appends after the high-water mark.
+        """
+        SnapshotWriter(self.root, SIGNAL_TYPES).append(self.rows[:3])
+        writer = SnapshotWriter(self.root, SIGNAL_TYPES)
+        self.assertEqual(writer.high_water, (self.rows[2][8], self.rows[2][0]))
+        writer.append(self.rows[3:])
+
+        day = SnapshotReader(self.root).day('2024-05-02')
+        self.assertEqual(len(day), 2)
+        self.assertEqual([day.content(0), day.content(1)], ['Report 2 ✓', 'Report 3 ✓'])
+
+    def test_manifest_is_durable_before_and_after_rename(self):
+        """
+        Test that the manifest is fsynced before it replaces the old one and the rename is fsynced after.
+        """
+        calls = []
+        fsync, replace = snapshot.os.fsync, snapshot.os.replace
+
+        def record_fsync(fd):
+            calls.append('fsync')
+            fsync(fd)
+
+        def record_replace(src, dst):
+            calls.append('replace')
+            replace(src, dst)
+
+        with mock.patch.object(snapshot.os, 'fsync', record_fsync), \
+                mock.patch.object(snapshot.os, 'replace', record_replace), \
+                mock.patch.object(snapshot, '_fsync_directory', side_effect=lambda path: calls.append(Path(path))):
+            SnapshotWriter(self.root, SIGNAL_TYPES).append(self.rows)
+
+        self.assertEqual(calls[-3:], ['fsync', 'replace', Path(self.root)])
+
+    def test_uncommitted_bytes_are_discarded(self):
+        """
+        Test that bytes left by an interrupted run are truncated on append.
+        """
+        SnapshotWriter(self.root, SIGNAL_TYPES).append(self.rows[:3])
+        with open(f'{self.root}/day=2024-05-02/lon.bin', 'ab') as f:
+            f.write(b'\x00' * 8)
+        SnapshotWriter(self.root, SIGNAL_TYPES).append(self.rows[3:])
+
+        day = SnapshotReader(self.root).day('2024-05-02')
+        self.assertEqual(list(day.lon), [5.3, 6.3])
+
+    def test_day_without_content_bytes(self):
+        """
+        Test that a day whose rows all have empty content reads back empty strings.
+        """
+        rows = [row[:7] + ('',) + row[8:] for row in self.rows[:2]]
+        SnapshotWriter(self.root, SIGNAL_TYPES).append(rows)
+
+        day = SnapshotReader(self.root).day('2024-05-01')
+        self.assertEqual([day.content(0), day.content(1)], ['', ''])
@@ -0,0 +1,87 @@
+import json
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.signals.filters import SignalFilter
+from apps.signals.stream import SignalBroadcaster, event_stream, sse_frame
+
+
+def payload(signal_type='robbery', lon=3.39, lat=6.45, signal_id='a'):
+    return json.dumps({'id': signal_id, 'signal_type': signal_type, 'lon': lon, 'lat': lat})
+
+
+@override_settings(SIGNAL_STREAM_QUEUE_SIZE=2, SIGNAL_STREAM_MAX_SUBSCRIBERS=3)
+class SignalBroadcasterTestCase(SimpleTestCase):
+    """
+    Test case for notification fan-out to stream subscribers.
+    """
+
+    def setUp(self):
+        self.broadcaster = SignalBroadcaster()
+
+    def test_dispatch_respects_type_and_bbox(self):
+        """
+        Test that subscribers only receive signals matching their filters.
+        """
+        everything = self.broadcaster.add(SignalFilter())
+        robbery = self.broadcaster.add(SignalFilter(types=('robbery',)))
+        far_away = self.broadcaster.add(SignalFilter(bbox=(10.0, 10.0, 11.0, 11.0)))
+
+        self.broadcaster.dispatch(payload('robbery'))
+        self.broadcaster.dispatch(payload('assault'))
+
+        self.assertEqual(everything.queue.qsize(), 2)
+        self.assertEqual(robbery.queue.qsize(), 1)
+        self.assertEqual(far_away.queue.qsize(), 0)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """
+        Test that a slow subscriber loses events without affecting others.
+        """
+        slow = self.broadcaster.add(SignalFilter())
+        fast = self.broadcaster.add(SignalFilter())
+        for i in range(5):
+            self.broadcaster.dispatch(payload(signal_id=str(i)))
+            fast.queue.get_nowait()
+
+        self.assertEqual(slow.queue.qsize(), 2)
+        self.assertEqual(slow.dropped, 3)
+        self.assertEqual(fast.dropped, 0)
+
+    def test_unsubscribe(self):
+        """
+        Test that closed subscriptions stop receiving events.
+        """
+        subscription = self.broadcaster.add(SignalFilter(types=('robbery', 'assault')))
+        self.assertEqual(len(self.broadcaster), 1)
+        subscription.close()
+        self.assertEqual(len(self.broadcaster), 0)
+        self.broadcaster.dispatch(payload('robbery'))
+        self.assertEqual(subscription.queue.qsize(), 0)
+
+    def test_malformed_payload_is_ignored(self):
+        """
+        Test that a payload that is not JSON is skipped.
+        """
+        subscription = self.broadcaster.add(SignalFilter())
+        self.broadcaster.dispatch('not json')
+        self.assertEqual(subscription.queue.qsize(), 0)
+
+    async def test_event_stream_reports_drops(self):
+        """
+        Test that the stream emits a resync event after dropped events.
+        """
+        subscription = self.broadcaster.add(SignalFilter())
+        for i in range(3):
+            self.broadcaster.dispatch(payload(signal_id=str(i)))
+
+        stream = event_stream(subscription, heartbeat=0.01, max_seconds=5)
+        frames = [await stream.__anext__() for _ in range(5)]
+        await stream.aclose()
+
+        self.assertTrue(frames[0].startswith(b'retry:'))
+        self.assertEqual(frames[1], sse_frame('resync', json.dumps({'dropped': 1})))
+        self.assertIn(b'id: 0\nevent: signal\n', frames[2])
+        self.assertIn(b'id: 1\nevent: signal\n', frames[3])
+        self.assertEqual(frames[4], b': keepalive\n\n')
+        self.assertEqual(len(self.broadcaster), 0)
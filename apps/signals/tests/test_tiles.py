@@ -0,0 +1,92 @@
+import unittest
+from unittest import mock
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, override_settings
+
+from apps.signals.filters import SignalFilter
+from apps.signals.tiles import WEB_MERCATOR_HALF, TileCache, tile_bounds, tile_for_point
+
+
+class TileMathTestCase(unittest.TestCase):
+    """
+    Test case for the tile coordinate helpers.
+    """
+    def test_world_tile(self):
+        """
+        Test that zoom 0 covers the whole web mercator square.
+        """
+        self.assertEqual(tile_for_point(3.3792, 6.5244, 0), (0, 0))
+        xmin, ymin, xmax, ymax = tile_bounds(0, 0, 0)
+        self.assertAlmostEqual(xmin, -WEB_MERCATOR_HALF)
+        self.assertAlmostEqual(ymax, WEB_MERCATOR_HALF)
+        self.assertAlmostEqual(xmax, WEB_MERCATOR_HALF)
+        self.assertAlmostEqual(ymin, -WEB_MERCATOR_HALF)
+
+    def test_known_tile(self):
+        """
+        Test a known tile for Lagos at zoom 10.
+        """
+        self.assertEqual(tile_for_point(3.3792, 6.5244, 10), (521, 493))
+
+    def test_quadrants(self):
+        """
+        Test that zoom 1 splits the world into four quadrants.
+        """
+        self.assertEqual(tile_for_point(-10, 10, 1), (0, 0))
+        self.assertEqual(tile_for_point(10, 10, 1), (1, 0))
+        self.assertEqual(tile_for_point(-10, -10, 1), (0, 1))
+        self.assertEqual(tile_for_point(10, -10, 1), (1, 1))
+
+    def test_edges_are_clamped(self):
+        """
+        Test that points on the antimeridian and poles stay in range.
+        """
+        self.assertEqual(tile_for_point(180, 90, 2), (3, 0))
+        self.assertEqual(tile_for_point(-180, -90, 2), (0, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+@override_settings(
+    CACHES={'tiles': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tile-tests'}},
+    TILE_MAX_ZOOM=18,
+    TILE_GENERATION_MAX_ZOOM=12,
+)
+class TileCacheTestCase(SimpleTestCase):
+    """
+    Test case for tile cache invalidation.
+    """
+    def setUp(self):
+        self.cache = TileCache()
+        self.cache.cache.clear()
+        self.renders = 0
+
+    def render(self):
+        self.renders += 1
+        return b'tile'
+
+    def test_deep_tile_is_invalidated_through_its_ancestor(self):
+        """
+        Test that a signal stored inside a tile deeper than the generation zoom invalidates it.
+        """
+        x, y = tile_for_point(3.3792, 6.5244, 18)
+        self.cache.get_or_render(18, x, y, SignalFilter(), self.render)
+        self.cache.get_or_render(18, x, y, SignalFilter(), self.render)
+        self.assertEqual(self.renders, 1)
+
+        self.cache.invalidate_points([Point(3.3792, 6.5244)])
+        self.cache.get_or_render(18, x, y, SignalFilter(), self.render)
+        self.assertEqual(self.renders, 2)
+
+    def test_chunk_writes_each_token_once(self):
+        """
+        Test that nearby points of one chunk are invalidated with one write of their shared tokens.
+        """
+        points = [Point(3.3792 + i / 100000, 6.5244) for i in range(50)]
+        with mock.patch.object(self.cache.cache, 'set_many', wraps=self.cache.cache.set_many) as set_many:
+            replaced = self.cache.invalidate_points(points)
+        self.assertEqual(set_many.call_count, 1)
+        self.assertEqual(replaced, 13)
@@ -0,0 +1,200 @@
+"""
+Mapbox Vector Tile rendering and caching for signals.
+
+Tiles are rendered in PostGIS with ST_AsMVT. Below CLUSTER_MAX_ZOOM points are
+grouped into a fixed grid of cells per tile, so a tile never carries more than
+TILE_CLUSTER_GRID² features no matter how dense the city is.
+
+Rendered tiles are cached in the 'tiles' cache. Each tile has a generation token;
+storing a signal inside a tile replaces the token for every zoom level, which
+orphans all cached variants (filters) of that tile at once. Tiles deeper than
+TILE_GENERATION_MAX_ZOOM share the token of their ancestor at that zoom, so a
+stored signal replaces at most TILE_GENERATION_MAX_ZOOM + 1 tokens, and the
+signals of one ingestion chunk share most of them: each token write to a file
+based cache scans the cache directory.
+"""
+
+import logging
+import math
+import uuid
+from typing import Iterable, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.db_router import read_connection
+
+logger = logging.getLogger(__name__)
+
+# Half the width of the EPSG:3857 world square, in metres.
+WEB_MERCATOR_HALF = 20037508.342789244
+MVT_EXTENT = 4096
+LAYER_NAME = 'signals'
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """
+    EPSG:3857 bounds (xmin, ymin, xmax, ymax) of a tile.
+    """
+    size = 2 * WEB_MERCATOR_HALF / (1 << z)
+    xmin = -WEB_MERCATOR_HALF + x * size
+    ymax = WEB_MERCATOR_HALF - y * size
+    return xmin, ymax - size, xmin + size, ymax
+
+
+def tile_for_point(lon: float, lat: float, z: int) -> Tuple[int, int]:
+    """
+    (x, y) of the tile containing a WGS84 point at zoom z.
+    """
+    n = 1 << z
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    """
+    Check tile coordinates against the configured zoom range.
+    """
+    if z < 0 or z > settings.TILE_MAX_ZOOM:
+        return False
+    n = 1 << z
+    return 0 <= x < n and 0 <= y < n
+
+
+class TileRenderer:
+    """
+    Renders signal tiles with ST_AsMVT.
+    """
+
+    def render(self, z: int, x: int, y: int, signal_filter) -> bytes:
+        """
+        Render one tile for the given filters.
+        """
+        if z < settings.TILE_CLUSTER_MAX_ZOOM:
+            sql, params = self._clustered_sql(z, x, y, signal_filter)
+        else:
+            sql, params = self._points_sql(z, x, y, signal_filter)
+
+        with read_connection().cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        return bytes(row[0]) if row and row[0] is not None else b''
+
+    def _source_sql(self, z, x, y, signal_filter):
+        """
+        Signals inside the tile, projected to EPSG:3857.
+        The && test against the 4326 envelope uses the location GiST index.
+        """
+        where, params = signal_filter.as_sql('s')
+        sql = f"""
+            SELECT s.id, s.signal_type, s.occurred_at,
+                   ST_Transform(s.location, 3857) AS geom
+            FROM signals_signal s
+            WHERE s.location && ST_Transform(ST_TileEnvelope(%s, %s, %s), 4326)
+            {'AND ' + where if where else ''}
+        """
+        return sql, [z, x, y] + params
+
+    def _points_sql(self, z, x, y, signal_filter):
+        source_sql, params = self._source_sql(z, x, y, signal_filter)
+        sql = f"""
+            SELECT ST_AsMVT(tile, %s, %s, 'geom') FROM (
+                SELECT ST_AsMVTGeom(pts.geom, ST_TileEnvelope(%s, %s, %s), %s, 0, true) AS geom,
+                       pts.id::text AS id,
+                       pts.signal_type,
+                       extract(epoch FROM pts.occurred_at)::bigint AS occurred_at,
+                       1 AS count
+                FROM ({source_sql}) pts
+            ) tile
+            WHERE tile.geom IS NOT NULL
+        """
+        return sql, [LAYER_NAME, MVT_EXTENT, z, x, y, MVT_EXTENT] + params
+
+    def _clustered_sql(self, z, x, y, signal_filter):
+        source_sql, params = self._source_sql(z, x, y, signal_filter)
+        xmin, ymin, xmax, _ = tile_bounds(z, x, y)
+        cell = (xmax - xmin) / settings.TILE_CLUSTER_GRID
+        sql = f"""
+            SELECT ST_AsMVT(tile, %s, %s, 'geom') FROM (
+                SELECT ST_AsMVTGeom(ST_Centroid(ST_Collect(pts.geom)),
+                                    ST_TileEnvelope(%s, %s, %s), %s, 0, true) AS geom,
+                       count(*) AS count,
+                       mode() WITHIN GROUP (ORDER BY pts.signal_type) AS signal_type,
+                       extract(epoch FROM max(pts.occurred_at))::bigint AS occurred_at
+                FROM ({source_sql}) pts
+                GROUP BY floor((ST_X(pts.geom) - %s) / %s),
+                         floor((ST_Y(pts.geom) - %s) / %s)
+            ) tile
+            WHERE tile.geom IS NOT NULL
+        """
+        return sql, (
+            [LAYER_NAME, MVT_EXTENT, z, x, y, MVT_EXTENT]
+            + params
+            + [xmin, cell, ymin, cell]
+        )
+
+
+class TileCache:
+    """
+    Bounded cache of rendered tiles with per-tile invalidation.
+
+    The size bound comes from the backing cache's MAX_ENTRIES option.
+    """
+
+    def __init__(self, alias: str = 'tiles'):
+        self.cache = caches[alias]
+
+    @staticmethod
+    def _generation_key(z, x, y):
+        shift = z - settings.TILE_GENERATION_MAX_ZOOM
+        if shift > 0:
+            z, x, y = settings.TILE_GENERATION_MAX_ZOOM, x >> shift, y >> shift
+        return f'tile-gen:{z}:{x}:{y}'
+
+    def _generation(self, z, x, y) -> str:
+        """
+        Current generation token of a tile. A missing token (never set, or
+        culled from the cache) is replaced by a fresh one so that entries
+        cached under an older token can never be served again.
+        """
+        key = self._generation_key(z, x, y)
+        token = self.cache.get(key)
+        if token is None:
+            self.cache.add(key, uuid.uuid4().hex, timeout=None)
+            token = self.cache.get(key)
+        return token
+
+    def get_or_render(self, z, x, y, signal_filter, render) -> bytes:
+        """
+        Return the cached tile or render and cache it.
+        """
+        key = f'tile:{z}:{x}:{y}:{self._generation(z, x, y)}:{signal_filter.cache_key()}'
+        tile = self.cache.get(key)
+        if tile is None:
+            tile = render()
+            self.cache.set(key, tile, timeout=settings.TILE_CACHE_TIMEOUT)
+        return tile
+
+    def invalidate_points(self, points: Iterable) -> int:
+        """
+        Invalidate every cached tile, at every zoom level, that contains one of
+        the given WGS84 points, with one write per generation token however
+        many points share it. Returns the number of tokens replaced.
+        """
+        max_zoom = min(settings.TILE_MAX_ZOOM, settings.TILE_GENERATION_MAX_ZOOM)
+        tiles: Set[Tuple[int, int, int]] = set()
+        for point in points:
+            if point is None:
+                continue
+            for z in range(max_zoom + 1):
+                tiles.add((z, *tile_for_point(point.x, point.y, z)))
+
+        if tiles:
+            self.cache.set_many(
+                {self._generation_key(*tile): uuid.uuid4().hex for tile in tiles},
+                timeout=None,
+            )
+        return len(tiles)
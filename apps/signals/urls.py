@@ -2,5 +2,19 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    # Add your signal URL patterns here
+    path('', views.SignalListView.as_view(), name='signal-list'),
+    path('search/', views.SignalSearchView.as_view(), name='signal-search'),
+    path('stream/', views.signal_stream, name='signal-stream'),
+    path(
+        'export.<str:export_format>',
+        views.SignalExportView.as_view(),
+        name='signal-export',
+    ),
+    path(
+        'tiles/<int:z>/<int:x>/<int:y>.mvt',
+        views.SignalTileView.as_view(),
+        name='signal-tiles',
+    ),
+    path('heatmap/', views.SignalHeatmapView.as_view(), name='signal-heatmap'),
+    path('cache/stats/', views.ResponseCacheStatsView.as_view(), name='signal-cache-stats'),
 ]
@@ -1,3 +1,183 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .export import EXPORT_FORMATS, content_type_for, stream_export
+from .filters import SignalFilter
+from .models import Signal
+from .response_cache import ResponseCache
+from .rollups import heatmap
+from .search import search_signals
+from .serializers import SignalSearchSerializer, SignalSerializer
+from .stream import StreamFull, event_stream, get_broadcaster
+from .tiles import TileCache, TileRenderer, is_valid_tile
+
+
+def parse_filter(request):
+    """
+    Parse the shared signal filters, reporting bad input as a 400.
+    """
+    try:
+        return SignalFilter.from_params(request.query_params)
+    except ValueError as e:
+        raise ValidationError({'detail': str(e)})
+
+
+def parse_int(request, name, default, minimum, maximum):
+    """
+    Parse a bounded integer query parameter, reporting bad input as a 400.
+    """
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        raise ValidationError({'detail': f"'{name}' must be an integer"})
+    if not minimum <= value <= maximum:
+        raise ValidationError({
+            'detail': f"'{name}' must be between {minimum} and {maximum}"
+        })
+    return value
+
+
+def cached_response(endpoint, signal_filter, shape, compute):
+    """
+    Serve a read response through the region-versioned response cache.
+    """
+    data, hit = ResponseCache().get_or_compute(endpoint, signal_filter, shape, compute)
+    response = Response(data)
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+
+class SignalListView(APIView):
+    """
+    Most recent signals matching the shared signal filters.
+    Paginated with ``limit`` and ``offset``.
+    """
+
+    def get(self, request):
+        signal_filter = parse_filter(request)
+        limit = parse_int(request, 'limit', 100, 1, settings.SIGNAL_LIST_MAX_LIMIT)
+        offset = parse_int(request, 'offset', 0, 0, 10 ** 6)
+
+        def compute():
+            queryset = signal_filter.apply(Signal.objects.defer('search_vector'))[offset:offset + limit]
+            return {'results': SignalSerializer(queryset, many=True).data}
+
+        return cached_response('list', signal_filter, {'limit': limit, 'offset': offset}, compute)
+
+
+class SignalSearchView(APIView):
+    """
+    Full-text search over signal content, ranked by relevance.
+    Takes ``q`` (websearch syntax), the shared signal filters, ``limit``
+    and ``offset``.
+    """
+
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            raise ValidationError({'detail': "'q' is required"})
+        signal_filter = parse_filter(request)
+        limit = parse_int(request, 'limit', 50, 1, settings.SIGNAL_LIST_MAX_LIMIT)
+        offset = parse_int(request, 'offset', 0, 0, settings.SIGNAL_SEARCH_MAX_CANDIDATES)
+
+        def compute():
+            results = search_signals(text, signal_filter, limit, offset)
+            return {'results': SignalSearchSerializer(results, many=True).data}
+
+        shape = {'q': text, 'limit': limit, 'offset': offset}
+        return cached_response('search', signal_filter, shape, compute)
+
+
+class SignalExportView(APIView):
+    """
+    Streaming NDJSON or GeoJSON export of the signals matching the shared
+    signal filters (the same filters as the list endpoint).
+    """
+
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            raise NotFound(f"Unknown export format: {export_format}")
+        signal_filter = parse_filter(request)
+
+        response = StreamingHttpResponse(
+            stream_export(signal_filter, export_format),
+            content_type=content_type_for(export_format),
+        )
+        response['Content-Disposition'] = f'attachment; filename="signals.{export_format}"'
+        return response
+
+
+class SignalTileView(APIView):
+    """
+    Mapbox Vector Tile of signals for z/x/y.
+    Accepts the shared signal filters (type, since, until).
+    """
+    renderer = TileRenderer()
+
+    def get(self, request, z, x, y):
+        if not is_valid_tile(z, x, y):
+            raise NotFound('Tile out of range')
+        signal_filter = parse_filter(request)
+
+        tile = TileCache().get_or_render(
+            z, x, y, signal_filter,
+            lambda: self.renderer.render(z, x, y, signal_filter),
+        )
+        response = HttpResponse(tile, content_type='application/vnd.mapbox-vector-tile')
+        response['Cache-Control'] = 'public, max-age=60'
+        return response
+
+
+class SignalHeatmapView(APIView):
+    """
+    Signal counts per grid cell, read from the heatmap rollups.
+    Accepts the shared signal filters plus ``resolution``, the number of
+    base cells merged along each axis.
+    """
+
+    def get(self, request):
+        signal_filter = parse_filter(request)
+        resolution = parse_int(request, 'resolution', 1, 1, settings.HEATMAP_MAX_RESOLUTION)
+
+        def compute():
+            return {
+                'cell_size': settings.HEATMAP_CELL_DEGREES * resolution,
+                'cells': heatmap(signal_filter, resolution),
+            }
+
+        return cached_response('heatmap', signal_filter, {'resolution': resolution}, compute)
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    Hit/miss counters of the read response cache.
+    """
+
+    def get(self, request):
+        return Response(ResponseCache().stats())
+
+
+async def signal_stream(request):
+    """
+    Server-Sent Events stream of newly stored signals matching the
+    ``type`` and ``bbox`` filters. Needs an ASGI server; DRF views are
+    synchronous, so this is a plain async Django view.
+    """
+    if not hasattr(request, 'scope'):
+        return JsonResponse({'detail': 'Streaming requires an ASGI server'}, status=501)
+    try:
+        signal_filter = SignalFilter.from_params(request.GET)
+    except ValueError as e:
+        return JsonResponse({'detail': str(e)}, status=400)
+    try:
+        subscription = await get_broadcaster().subscribe(signal_filter)
+    except StreamFull:
+        return JsonResponse({'detail': 'Too many streams, retry later'}, status=503)
+
+    response = StreamingHttpResponse(event_stream(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
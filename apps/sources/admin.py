@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.contrib.admin import SimpleListFilter
+
+from apps.admin_utils import LargeTableAdminMixin
 from .models import Source, SourceTrustHistory
 
 
@@ -48,12 +50,12 @@ class SourceAdmin(admin.ModelAdmin):
         TrustTierFilter,
     ]
     search_fields = [
-        'external_identifier'
+        '^external_identifier'
     ]
 
 
 @admin.register(SourceTrustHistory)
-class SourceTrustHistoryAdmin(admin.ModelAdmin):
+class SourceTrustHistoryAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = [
         'source_display',
         'trust_score',
@@ -64,10 +66,11 @@ class SourceTrustHistoryAdmin(admin.ModelAdmin):
     list_filter = [
         'changed_by',
     ]
+    list_select_related = ['source']
     date_hierarchy = 'valid_from'
     search_fields = [
-        'source__external_identifier',
-        'source__platform',
+        '^source__external_identifier',
+        '=source__platform',
     ]
     readonly_fields = [
         'valid_from',
@@ -0,0 +1,62 @@
+# Generated by Django 4.2 on 2026-10-19 13:34
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Source',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('platform', models.CharField(max_length=50)),
+                ('external_identifier', models.CharField(max_length=255)),
+                ('trust_score', models.SmallIntegerField(default=50, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('verified', models.BooleanField(default=False)),
+                ('active', models.BooleanField(default=True)),
+                ('last_fetched_at', models.DateTimeField(blank=True, null=True)),
+                ('consecutive_errors', models.IntegerField(default=0)),
+                ('metadata', models.JSONField(blank=True, default=dict, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SourceTrustHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trust_score', models.SmallIntegerField(validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('reason', models.TextField()),
+                ('changed_by', models.CharField(max_length=100)),
+                ('valid_from', models.DateTimeField(auto_now_add=True)),
+                ('valid_to', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trust_history', to='sources.source')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='source',
+            index=models.Index(fields=['platform', 'active'], name='sources_sou_platfor_578399_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='source',
+            unique_together={('platform', 'external_identifier')},
+        ),
+        migrations.AddIndex(
+            model_name='sourcetrusthistory',
+            index=models.Index(fields=['source', 'valid_from'], name='sources_sou_source__1b112d_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='sourcetrusthistory',
+            constraint=models.CheckConstraint(check=models.Q(('valid_to__isnull', True), ('valid_to__gt', models.F('valid_from')), _connector='OR'), name='chk_valid_trust_period'),
+        ),
+    ]
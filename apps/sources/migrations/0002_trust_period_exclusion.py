@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-19 13:44
+
+import apps.sources.models
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+# Rows written before periods were kept disjoint may overlap the next row
+# of the same source; end each of them where the next one starts.
+CLOSE_OVERLAPPING_PERIODS_SQL = """
+UPDATE sources_sourcetrusthistory h
+SET valid_to = n.next_from
+FROM (
+    SELECT id, lead(valid_from) OVER (PARTITION BY source_id ORDER BY valid_from, id) AS next_from
+    FROM sources_sourcetrusthistory
+) n
+WHERE h.id = n.id
+  AND n.next_from > h.valid_from
+  AND (h.valid_to IS NULL OR h.valid_to > n.next_from);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sources', '0001_initial'),
+    ]
+
+    operations = [
+        # Needed for the uuid equality part of the exclusion constraint
+        BtreeGistExtension(),
+        migrations.RunSQL(CLOSE_OVERLAPPING_PERIODS_SQL, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='sourcetrusthistory',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('source', '='), (apps.sources.models.TsTzRange('valid_from', 'valid_to', django.contrib.postgres.fields.ranges.RangeBoundary()), '&&')], name='excl_trust_period_overlap'),
+        ),
+    ]
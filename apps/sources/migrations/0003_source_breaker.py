@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sources', '0002_trust_period_exclusion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='source',
+            name='breaker_retry_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
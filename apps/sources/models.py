@@ -1,8 +1,18 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeBoundary, RangeOperators
 from django.db.models import Q
 import uuid
 
+
+class TsTzRange(models.Func):
+    """
+    tstzrange(lower, upper, '[)') expression.
+    """
+    function = 'TSTZRANGE'
+    output_field = DateTimeRangeField()
+
 # Create your models here.
 class Source(models.Model):
     """
@@ -19,6 +29,9 @@ class Source(models.Model):
     active = models.BooleanField(default=True)
     last_fetched_at = models.DateTimeField(null=True, blank=True)
     consecutive_errors = models.IntegerField(default=0)
+    # Circuit breaker: once consecutive_errors reaches the threshold, fetches
+    # are skipped until this time (see apps.ingestion.fetch_guard)
+    breaker_retry_at = models.DateTimeField(null=True, blank=True)
     metadata = models.JSONField(null=True, blank=True, default=dict)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -52,6 +65,11 @@ class Source(models.Model):
 class SourceTrustHistory(models.Model):
     """
     Model representing the trust history of a source.
+
+    Each row holds the score over [valid_from, valid_to); the open row has
+    no valid_to. Periods of one source never overlap, which the exclusion
+    constraint enforces and whose GiST index serves as-of lookups (see
+    apps.sources.trust_history).
     """
     source = models.ForeignKey(
         Source,
@@ -75,7 +93,14 @@ class SourceTrustHistory(models.Model):
             models.CheckConstraint(
                 check=Q(valid_to__isnull=True) | Q(valid_to__gt=models.F('valid_from')),
                 name='chk_valid_trust_period'
-            )
+            ),
+            ExclusionConstraint(
+                name='excl_trust_period_overlap',
+                expressions=[
+                    ('source', RangeOperators.EQUAL),
+                    (TsTzRange('valid_from', 'valid_to', RangeBoundary()), RangeOperators.OVERLAPS),
+                ],
+            ),
         ]
 
     def __str__(self):
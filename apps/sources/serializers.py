@@ -0,0 +1,24 @@
+from django.conf import settings
+from rest_framework import serializers
+
+
+class TrustLookupSerializer(serializers.Serializer):
+    """
+    One (source, time) pair of an as-of trust lookup.
+    """
+    source = serializers.UUIDField()
+    at = serializers.DateTimeField()
+
+
+class TrustAsOfRequestSerializer(serializers.Serializer):
+    """
+    Body of an as-of trust lookup request.
+    """
+    lookups = TrustLookupSerializer(many=True, allow_empty=False)
+
+    def validate_lookups(self, value):
+        if len(value) > settings.TRUST_ASOF_MAX_BATCH:
+            raise serializers.ValidationError(
+                f'At most {settings.TRUST_ASOF_MAX_BATCH} lookups per request'
+            )
+        return value
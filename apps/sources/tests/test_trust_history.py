@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone as dj_timezone
+
+from apps.sources.models import Source, SourceTrustHistory
+from apps.sources.trust_history import TrustAsOf, record_trust_changes
+
+
+def at(hour):
+    return datetime(2024, 5, 1, hour, tzinfo=timezone.utc)
+
+
+class TrustAsOfCacheTestCase(SimpleTestCase):
+    """
+    Test case for the hot-source cache of TrustAsOf.
+    """
+    def setUp(self):
+        self.source = uuid.uuid4()
+        self.rows = []
+        patcher = mock.patch('apps.sources.trust_history.connection')
+        connection = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cursor = connection.cursor.return_value.__enter__.return_value
+        self.cursor.fetchall.side_effect = lambda: self.rows
+        self.lookup = TrustAsOf(max_sources=2, open_ttl=60)
+
+    def test_closed_period_served_from_cache(self):
+        """
+        Test that a resolved closed period answers later lookups without a query.
+        """
+        self.rows = [(1, at(0), at(6), 70)]
+        self.assertEqual(self.lookup.lookup([(self.source, at(2))]), [70])
+        self.assertEqual(self.lookup.lookup([(self.source, at(5)), (self.source, at(3))]), [70, 70])
+        self.assertEqual(self.cursor.execute.call_count, 1)
+        self.assertEqual(self.lookup.hits, 2)
+
+    def test_uncovered_time_is_none(self):
+        """
+        Test that a time outside every period resolves to None.
+        """
+        self.rows = []
+        self.assertEqual(self.lookup.lookup([(self.source, at(2))]), [None])
+
+    def test_open_period_expires(self):
+        """
+        Test that the open period is only cached for the TTL.
+        """
+        self.rows = [(1, at(0), None, 55)]
+        with mock.patch('apps.sources.trust_history.time_module.monotonic', return_value=0):
+            self.lookup.lookup([(self.source, at(2))])
+            self.lookup.lookup([(self.source, at(3))])
+        self.assertEqual(self.cursor.execute.call_count, 1)
+
+        with mock.patch('apps.sources.trust_history.time_module.monotonic', return_value=61):
+            self.lookup.lookup([(self.source, at(3))])
+        self.assertEqual(self.cursor.execute.call_count, 2)
+
+    def test_least_recently_used_source_evicted(self):
+        """
+        Test that the cache keeps at most max_sources sources.
+        """
+        sources = [uuid.uuid4() for _ in range(3)]
+        for source in sources:
+            self.rows = [(1, at(0), at(6), 60)]
+            self.lookup.lookup([(source, at(1))])
+        self.assertEqual(list(self.lookup._periods), sources[1:])
+
+
+class TrustHistoryTestCase(TestCase):
+    """
+    Test case for recording and looking up trust history.
+    """
+    def setUp(self):
+        self.source = Source.objects.create(
+            platform="test_platform", external_identifier="test_id",
+        )
+
+    def test_changes_close_previous_period(self):
+        """
+        Test that each change closes the open period where the new one starts.
+        """
+        record_trust_changes([(self.source.id, 60)], 'first', 'test')
+        record_trust_changes([(self.source.id, 75)], 'second', 'test')
+
+        first, second = SourceTrustHistory.objects.order_by('valid_from')
+        self.assertEqual(first.valid_to, second.valid_from)
+        self.assertIsNone(second.valid_to)
+
+    def test_batch_lookup(self):
+        """
+        Test that a batch of (source, time) pairs resolves in one query.
+        """
+        before = dj_timezone.now() - timedelta(days=1)
+        record_trust_changes([(self.source.id, 60)], 'first', 'test')
+        SourceTrustHistory.objects.update(valid_from=before - timedelta(hours=1))
+
+        lookup = TrustAsOf()
+        with self.assertNumQueries(1):
+            scores = lookup.lookup([
+                (self.source.id, before),
+                (self.source.id, before - timedelta(days=1)),
+                (uuid.uuid4(), before),
+            ])
+        self.assertEqual(scores, [60, None, None])
@@ -0,0 +1,152 @@
+"""
+Source trust history: recording score changes and as-of lookups.
+
+History rows cover [valid_from, valid_to) and never overlap per source
+(excl_trust_period_overlap). A change closes the source's open row and
+opens a new one starting exactly where it ends.
+
+TrustAsOf resolves many (source, time) pairs with one query against the
+GiST index behind the exclusion constraint. Resolved periods are kept in a
+small per-process LRU of hot sources: closed periods never change, so they
+are cached until evicted; the open period is cached for
+TRUST_ASOF_OPEN_TTL seconds since a later change closes it.
+"""
+
+import threading
+import time as time_module
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+RECORD_SQL = """
+    WITH changed AS (
+        SELECT * FROM unnest(%(ids)s::uuid[], %(scores)s::smallint[]) AS c(source_id, score)
+    ), closed AS (
+        UPDATE sources_sourcetrusthistory h
+        SET valid_to = GREATEST(now(), h.valid_from + interval '1 microsecond')
+        FROM changed
+        WHERE h.source_id = changed.source_id AND h.valid_to IS NULL
+        RETURNING h.source_id, h.valid_to
+    )
+    INSERT INTO sources_sourcetrusthistory
+        (source_id, trust_score, reason, changed_by, valid_from, created_at)
+    SELECT changed.source_id, changed.score, %(reason)s, %(changed_by)s,
+           COALESCE(closed.valid_to, now()), now()
+    FROM changed
+    LEFT JOIN closed USING (source_id)
+"""
+
+AS_OF_SQL = """
+    SELECT q.idx, h.valid_from, h.valid_to, h.trust_score
+    FROM unnest(%s::uuid[], %s::timestamptz[]) WITH ORDINALITY AS q(source_id, at, idx)
+    JOIN LATERAL (
+        SELECT valid_from, valid_to, trust_score
+        FROM sources_sourcetrusthistory h
+        WHERE h.source_id = q.source_id
+          AND tstzrange(h.valid_from, h.valid_to, '[)') @> q.at
+        LIMIT 1
+    ) h ON true
+"""
+
+
+def record_trust_changes(changes: Sequence[Tuple], reason: str, changed_by: str) -> int:
+    """
+    Record new trust scores for (source_id, score) pairs in one statement.
+    Callers update Source.trust_score themselves, in the same transaction.
+    """
+    if not changes:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(RECORD_SQL, {
+            'ids': [source_id for source_id, _ in changes],
+            'scores': [score for _, score in changes],
+            'reason': reason,
+            'changed_by': changed_by,
+        })
+        return cursor.rowcount
+
+
+class TrustAsOf:
+    """
+    Batch as-of trust lookups with a per-process cache of hot sources.
+    """
+
+    def __init__(self, max_sources: int = None, open_ttl: float = None, max_periods: int = 64):
+        self.max_sources = max_sources or settings.TRUST_ASOF_CACHE_SOURCES
+        self.open_ttl = settings.TRUST_ASOF_OPEN_TTL if open_ttl is None else open_ttl
+        self.max_periods = max_periods
+        # source_id -> [(valid_from, valid_to, score, expires_at)]
+        self._periods = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, pairs: Iterable[Tuple]) -> List[Optional[int]]:
+        """
+        Trust score of each (source_id, at) pair, or None where the source
+        has no history covering that time. Times must be timezone-aware.
+        """
+        pairs = list(pairs)
+        results = [None] * len(pairs)
+        pending = {}
+
+        now = time_module.monotonic()
+        with self._lock:
+            for i, (source_id, at) in enumerate(pairs):
+                score = self._cached(source_id, at, now)
+                if score is not None:
+                    results[i] = score
+                    self.hits += 1
+                else:
+                    pending.setdefault((source_id, at), []).append(i)
+                    self.misses += 1
+
+        if pending:
+            keys = list(pending)
+            with connection.cursor() as cursor:
+                cursor.execute(AS_OF_SQL, [
+                    [source_id for source_id, _ in keys],
+                    [at for _, at in keys],
+                ])
+                rows = cursor.fetchall()
+
+            now = time_module.monotonic()
+            with self._lock:
+                for idx, valid_from, valid_to, score in rows:
+                    source_id, _ = keys[idx - 1]
+                    for i in pending[keys[idx - 1]]:
+                        results[i] = score
+                    self._store(source_id, valid_from, valid_to, score, now)
+
+        return results
+
+    def _cached(self, source_id, at, now):
+        periods = self._periods.get(source_id)
+        if not periods:
+            return None
+        for valid_from, valid_to, score, expires_at in periods:
+            if expires_at is not None and expires_at <= now:
+                continue
+            if valid_from <= at and (valid_to is None or at < valid_to):
+                self._periods.move_to_end(source_id)
+                return score
+        return None
+
+    def _store(self, source_id, valid_from, valid_to, score, now):
+        expires_at = now + self.open_ttl if valid_to is None else None
+        periods = [
+            p for p in self._periods.get(source_id, [])
+            if p[0] != valid_from and (p[3] is None or p[3] > now)
+        ]
+        periods.append((valid_from, valid_to, score, expires_at))
+        self._periods[source_id] = periods[-self.max_periods:]
+        self._periods.move_to_end(source_id)
+        while len(self._periods) > self.max_sources:
+            self._periods.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._periods.clear()
+            self.hits = self.misses = 0
@@ -2,5 +2,5 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    # Add your source URL patterns here
+    path('trust/as-of/', views.TrustAsOfView.as_view(), name='source-trust-as-of'),
 ]
@@ -1,3 +1,32 @@
-from django.shortcuts import render
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .serializers import TrustAsOfRequestSerializer
+from .trust_history import TrustAsOf
+
+
+class TrustAsOfView(APIView):
+    """
+    Trust scores of sources as of given times, from their trust history.
+
+    POST ``{"lookups": [{"source": "<uuid>", "at": "<ISO 8601>"}, ...]}``.
+    ``trust_score`` is null where no history period covers the time.
+    """
+    lookup = TrustAsOf()
+
+    def post(self, request):
+        serializer = TrustAsOfRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lookups = serializer.validated_data['lookups']
+
+        scores = self.lookup.lookup((item['source'], item['at']) for item in lookups)
+        return Response({
+            'results': [
+                {
+                    'source': str(item['source']),
+                    'at': item['at'].isoformat(),
+                    'trust_score': score,
+                }
+                for item, score in zip(lookups, scores)
+            ]
+        })
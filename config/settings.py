@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'apps.signals',
     'apps.sources',
     'apps.ingestion',
+    'apps.geofences',
 ]
 
 MIDDLEWARE = [
@@ -56,6 +57,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.db_router.ReplicaReadMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -93,6 +95,26 @@ DATABASES = {
     }
 }
 
+# Read replicas: comma-separated host[:port] list, added as replica_1,
+# replica_2, ... with the primary's name and credentials. Read API requests
+# use them while their replication lag stays under REPLICA_MAX_LAG_SECONDS
+# (see apps/db_router.py).
+for _index, _replica in enumerate(
+    config('DB_REPLICA_HOSTS', default='', cast=lambda v: [h.strip() for h in v.split(',') if h.strip()]),
+    start=1,
+):
+    _host, _, _port = _replica.partition(':')
+    DATABASES[f'replica_{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': _port or DATABASES['default']['PORT'],
+    }
+
+DATABASE_ROUTERS = ['apps.db_router.ReplicaRouter']
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=5, cast=float)
+REPLICA_LAG_CHECK_SECONDS = config('REPLICA_LAG_CHECK_SECONDS', default=2, cast=float)
+REPLICA_READ_PATH_PREFIXES = ['/api/']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -135,6 +157,182 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# 'tiles' and 'responses' are file based by default so that the ingestion
+# command and the web workers see the same invalidations. Either can be
+# pointed at django.core.cache.backends.redis.RedisCache. 'geocode' holds
+# resolved feed entry places across ingestion runs.
+CACHE_DIR = BASE_DIR / 'cache'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tiles': {
+        'BACKEND': config(
+            'TILE_CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': config('TILE_CACHE_LOCATION', default=str(CACHE_DIR / 'tiles')),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('TILE_CACHE_MAX_ENTRIES', default=20000, cast=int),
+        },
+    },
+    'responses': {
+        'BACKEND': config(
+            'RESPONSE_CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': config('RESPONSE_CACHE_LOCATION', default=str(CACHE_DIR / 'responses')),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('RESPONSE_CACHE_MAX_ENTRIES', default=20000, cast=int),
+        },
+    },
+    'geocode': {
+        'BACKEND': config(
+            'GEOCODE_CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': config('GEOCODE_CACHE_LOCATION', default=str(CACHE_DIR / 'geocode')),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('GEOCODE_CACHE_MAX_ENTRIES', default=50000, cast=int),
+        },
+    },
+}
+
+# Vector tiles
+TILE_MAX_ZOOM = config('TILE_MAX_ZOOM', default=18, cast=int)
+TILE_CLUSTER_MAX_ZOOM = config('TILE_CLUSTER_MAX_ZOOM', default=15, cast=int)
+TILE_CLUSTER_GRID = config('TILE_CLUSTER_GRID', default=64, cast=int)
+TILE_CACHE_TIMEOUT = config('TILE_CACHE_TIMEOUT', default=3600, cast=int)
+# Deeper tiles are invalidated together with their ancestor at this zoom
+TILE_GENERATION_MAX_ZOOM = config('TILE_GENERATION_MAX_ZOOM', default=12, cast=int)
+
+# Heatmap rollups (changing the cell size requires rebuild_signal_rollups)
+HEATMAP_CELL_DEGREES = config('HEATMAP_CELL_DEGREES', default=0.005, cast=float)
+HEATMAP_MAX_RESOLUTION = config('HEATMAP_MAX_RESOLUTION', default=64, cast=int)
+
+# Read API and response cache
+SIGNAL_LIST_MAX_LIMIT = config('SIGNAL_LIST_MAX_LIMIT', default=1000, cast=int)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+RESPONSE_CACHE_CELL_DEGREES = config('RESPONSE_CACHE_CELL_DEGREES', default=0.1, cast=float)
+RESPONSE_CACHE_MAX_REGIONS = config('RESPONSE_CACHE_MAX_REGIONS', default=256, cast=int)
+
+# Full-text search ranks at most this many of the most recent matches
+SIGNAL_SEARCH_MAX_CANDIDATES = config('SIGNAL_SEARCH_MAX_CANDIDATES', default=1000, cast=int)
+
+# Live signal stream (SSE): per-client queue length before events are
+# dropped, keepalive interval, stream lifetime and streams per worker
+SIGNAL_STREAM_QUEUE_SIZE = config('SIGNAL_STREAM_QUEUE_SIZE', default=100, cast=int)
+SIGNAL_STREAM_HEARTBEAT = config('SIGNAL_STREAM_HEARTBEAT', default=15, cast=float)
+SIGNAL_STREAM_MAX_SECONDS = config('SIGNAL_STREAM_MAX_SECONDS', default=300, cast=float)
+SIGNAL_STREAM_MAX_SUBSCRIBERS = config('SIGNAL_STREAM_MAX_SUBSCRIBERS', default=5000, cast=int)
+
+# JSON list of declarative trust rules (see apps/ingestion/trust_rules.py);
+# empty uses the TrustCalculator rules
+TRUST_RULES_FILE = config('TRUST_RULES_FILE', default='')
+
+# Keyword rules used to type feed entries (see apps/ingestion/classifier.py)
+SIGNAL_CLASSIFIER_RULES = config(
+    'SIGNAL_CLASSIFIER_RULES',
+    default=str(BASE_DIR / 'apps' / 'ingestion' / 'classifier_rules.json'),
+)
+
+# Offline geocoding of feed entries (see apps/ingestion/geocoder.py)
+GAZETTEER_PATH = config(
+    'GAZETTEER_PATH',
+    default=str(BASE_DIR / 'apps' / 'ingestion' / 'gazetteer.tsv'),
+)
+GEOCODER_LRU_SIZE = config('GEOCODER_LRU_SIZE', default=10000, cast=int)
+GEOCODE_CACHE_TIMEOUT = config('GEOCODE_CACHE_TIMEOUT', default=30 * 24 * 3600, cast=int)
+
+# Comma-separated RSS feed URLs ingested by RssAdapter (none by default)
+RSS_FEED_URLS = config('RSS_FEED_URLS', default='', cast=lambda v: [u.strip() for u in v.split(',') if u.strip()])
+
+# Source adapters by name (see apps/ingestion/adapters/registry.py). Disabled
+# ones only serve as templates for Source rows with metadata {'adapter': name}
+INGESTION_ADAPTERS = {
+    'mock': {
+        'BACKEND': 'apps.ingestion.adapters.mock.MockAdapter',
+        'ENABLED': config('MOCK_ADAPTER_ENABLED', default=True, cast=bool),
+    },
+    'rss': {
+        'BACKEND': 'apps.ingestion.adapters.rss.RssAdapter',
+        'ENABLED': bool(RSS_FEED_URLS),
+    },
+}
+
+# Source fetches: circuit breaker opening after this many consecutive
+# failures, first and longest wait before a probe fetch, and per-host
+# token bucket (fetches per second, burst)
+SOURCE_BREAKER_THRESHOLD = config('SOURCE_BREAKER_THRESHOLD', default=3, cast=int)
+SOURCE_BREAKER_BASE_SECONDS = config('SOURCE_BREAKER_BASE_SECONDS', default=300, cast=float)
+SOURCE_BREAKER_MAX_SECONDS = config('SOURCE_BREAKER_MAX_SECONDS', default=6 * 3600, cast=float)
+FETCH_RATE_PER_HOST = config('FETCH_RATE_PER_HOST', default=1, cast=float)
+FETCH_BURST_PER_HOST = config('FETCH_BURST_PER_HOST', default=2, cast=float)
+
+# Seconds between stack samples of ingest_signals --profile
+INGESTION_PROFILE_INTERVAL = config('INGESTION_PROFILE_INTERVAL', default=0.005, cast=float)
+
+# Work queue between fetchers and store workers (see apps/ingestion/queue.py):
+# backend, signals per batch, seconds a claimed batch stays hidden before
+# redelivery, deliveries before a batch is given up, seconds before a
+# failed batch is retried and idle workers poll again
+INGESTION_QUEUE_BACKEND = config('INGESTION_QUEUE_BACKEND', default='apps.ingestion.queue.PostgresQueue')
+INGESTION_QUEUE_BATCH_SIZE = config('INGESTION_QUEUE_BATCH_SIZE', default=100, cast=int)
+INGESTION_QUEUE_VISIBILITY_SECONDS = config('INGESTION_QUEUE_VISIBILITY_SECONDS', default=300, cast=float)
+INGESTION_QUEUE_MAX_ATTEMPTS = config('INGESTION_QUEUE_MAX_ATTEMPTS', default=5, cast=int)
+INGESTION_QUEUE_RETRY_SECONDS = config('INGESTION_QUEUE_RETRY_SECONDS', default=30, cast=float)
+INGESTION_QUEUE_POLL_SECONDS = config('INGESTION_QUEUE_POLL_SECONDS', default=1, cast=float)
+
+# Near-duplicate content (MinHash/LSH): estimated Jaccard similarity above
+# which a signal is linked to an earlier one of the same type, searched
+# within this many days either side of it
+CONTENT_DEDUP_THRESHOLD = config('CONTENT_DEDUP_THRESHOLD', default=0.8, cast=float)
+CONTENT_DEDUP_WINDOW_DAYS = config('CONTENT_DEDUP_WINDOW_DAYS', default=7, cast=int)
+CONTENT_DEDUP_MIN_SHINGLES = config('CONTENT_DEDUP_MIN_SHINGLES', default=5, cast=int)
+CONTENT_DEDUP_MAX_CANDIDATES = config('CONTENT_DEDUP_MAX_CANDIDATES', default=20, cast=int)
+
+# Incident clustering: (radius in metres, window in minutes) per signal
+# type. Signals of a type join an incident when another of its signals is
+# within both. Run recluster_incidents after changing these.
+INCIDENT_THRESHOLDS = {
+    'robbery': (500, 30),
+    'assault': (300, 30),
+    'burglary': (200, 120),
+    'vehicle_theft': (1000, 60),
+    'harassment': (300, 60),
+    'other': (250, 30),
+}
+
+# Geofence matching: index cell size in degrees, fences spanning more
+# cells than this are tested directly, and how often matchers pick up
+# changed fences
+GEOFENCE_CELL_DEGREES = config('GEOFENCE_CELL_DEGREES', default=0.05, cast=float)
+GEOFENCE_MAX_CELLS_PER_FENCE = config('GEOFENCE_MAX_CELLS_PER_FENCE', default=1024, cast=int)
+GEOFENCE_REFRESH_SECONDS = config('GEOFENCE_REFRESH_SECONDS', default=5, cast=float)
+
+# Monthly signal partitions kept ahead of time by maintain_signal_partitions
+SIGNAL_PARTITION_MONTHS_AHEAD = config('SIGNAL_PARTITION_MONTHS_AHEAD', default=3, cast=int)
+
+# Signals older than this are archived by archive_signals
+SIGNAL_RETENTION_DAYS = config('SIGNAL_RETENTION_DAYS', default=365, cast=int)
+
+# Streaming export
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+EXPORT_BUFFER_BYTES = config('EXPORT_BUFFER_BYTES', default=64 * 1024, cast=int)
+
+# As-of trust lookups: per-process cache of hot sources' history periods
+TRUST_ASOF_CACHE_SOURCES = config('TRUST_ASOF_CACHE_SOURCES', default=1024, cast=int)
+TRUST_ASOF_OPEN_TTL = config('TRUST_ASOF_OPEN_TTL', default=60, cast=float)
+TRUST_ASOF_MAX_BATCH = config('TRUST_ASOF_MAX_BATCH', default=1000, cast=int)
+
+# Admin changelists over large tables
+ADMIN_EXACT_COUNT_LIMIT = config('ADMIN_EXACT_COUNT_LIMIT', default=10000, cast=int)
+ADMIN_COUNT_TIMEOUT_MS = config('ADMIN_COUNT_TIMEOUT_MS', default=200, cast=int)
+ADMIN_DATE_HIERARCHY_CACHE_SECONDS = config('ADMIN_DATE_HIERARCHY_CACHE_SECONDS', default=600, cast=int)
+
 # Logging Configuration
 LOGS_DIR = BASE_DIR / 'logs'
 LOGS_DIR.mkdir(exist_ok=True)  # Create logs directory if it doesn't exist